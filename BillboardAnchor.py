@@ -0,0 +1,166 @@
+"""Billboard Anchor - billboards that follow another object's geometry.
+
+A billboard's Anchor links to an object, or to one of its vertices, edges or
+faces, and its Placement.Base is kept at that point plus AnchorOffset:
+
+* object - the center of its shape's bounding box, or its Placement.Base if
+  it has no shape
+* VertexN - the vertex
+* EdgeN, FaceN - the center of mass of the edge or face
+
+An index maps every source object to the billboards anchored to it. The
+shared document observer (BillboardShared) looks up the source whenever a Placement or Shape changes
+and moves only the billboards in its entry, so moving or recomputing one
+part costs in proportion to its own labels, not to all labels in the
+document. Points are taken in the source's document coordinates; the
+placement of a containing App::Part is not followed.
+"""
+
+import FreeCAD
+
+import BillboardShared
+
+
+# Source properties whose change moves the anchor point
+SOURCE_PROPERTIES = ("Placement", "Shape")
+
+# (document name, source name) -> set of anchored billboard names
+_dependents = {}
+# (document name, billboard name) -> source name
+_sources = {}
+# Billboards being moved, to stop anchor cycles
+_updating = set()
+
+
+def anchor_point(obj):
+    """Return the world-space point obj's Anchor refers to, or None."""
+    link = getattr(obj, "Anchor", None)
+    if not link or link[0] is None:
+        return None
+    source, subs = link
+    sub = subs[0] if subs else ""
+
+    shape = getattr(source, "Shape", None)
+    if shape is not None and not shape.isNull():
+        try:
+            if not sub:
+                return shape.BoundBox.Center
+            element = shape.getElement(sub)
+        except Exception as e:
+            FreeCAD.Console.PrintWarning(
+                f"Billboard {obj.Name}: cannot anchor to {source.Name}.{sub}: {e}\n"
+            )
+            return None
+        if sub.startswith("Vertex"):
+            return element.Point
+        return element.CenterOfMass
+
+    placement = getattr(source, "Placement", None)
+    return placement.Base if placement is not None else None
+
+
+def update(obj):
+    """Move obj to its anchor point plus AnchorOffset, if it changed."""
+    point = anchor_point(obj)
+    if point is None:
+        return
+    base = point + getattr(obj, "AnchorOffset", FreeCAD.Vector())
+    placement = obj.Placement
+    if placement.Base != base:
+        placement.Base = base
+        obj.Placement = placement
+
+
+def link(obj):
+    """Index obj under its Anchor's source object and move it there."""
+    key = (obj.Document.Name, obj.Name)
+    anchor = getattr(obj, "Anchor", None)
+    source = anchor[0].Name if anchor and anchor[0] is not None else None
+
+    old = _sources.get(key)
+    if old != source:
+        if old is not None:
+            _discard(obj.Document.Name, old, obj.Name)
+        if source is None:
+            _sources.pop(key, None)
+        else:
+            _sources[key] = source
+            _dependents.setdefault((obj.Document.Name, source), set()).add(obj.Name)
+    if source is not None:
+        update(obj)
+
+
+def unlink(document, name):
+    """Drop a billboard from the index."""
+    source = _sources.pop((document, name), None)
+    if source is not None:
+        _discard(document, source, name)
+
+
+def _discard(document, source, name):
+    names = _dependents.get((document, source))
+    if names is not None:
+        names.discard(name)
+        if not names:
+            del _dependents[(document, source)]
+
+
+def dependents(source):
+    """Return the billboards anchored to source."""
+    doc = source.Document
+    names = _dependents.get((doc.Name, source.Name), ())
+    return [obj for obj in map(doc.getObject, names) if obj is not None]
+
+
+def source_changed(source):
+    """Move the billboards anchored to source."""
+    for obj in dependents(source):
+        key = (obj.Document.Name, obj.Name)
+        if key in _updating:
+            continue
+        _updating.add(key)
+        try:
+            update(obj)
+        finally:
+            _updating.discard(key)
+
+
+def forget_document(document):
+    """Drop all index entries of a document."""
+    for key in [k for k in _sources if k[0] == document]:
+        del _sources[key]
+    for key in [k for k in _dependents if k[0] == document]:
+        del _dependents[key]
+
+
+def _object_changed(obj, prop):
+    """Move the billboards anchored to obj when its placement or shape changes."""
+    if prop in SOURCE_PROPERTIES and (obj.Document.Name, obj.Name) in _dependents:
+        source_changed(obj)
+
+
+def _object_deleted(obj):
+    unlink(obj.Document.Name, obj.Name)
+
+
+def create_for_selection(selection, doc=None):
+    """Create one billboard per selected object or sub-element, anchored to it.
+
+    selection is a list of selection objects (FreeCADGui.Selection.getSelectionEx()).
+    Returns the number of billboards created.
+    """
+    import BillboardObject
+
+    items = []
+    for sel in selection:
+        for sub in sel.SubElementNames or [""]:
+            items.append({
+                "Text": f"{sel.Object.Label}.{sub}" if sub else sel.Object.Label,
+                "Anchor": (sel.Object, [sub] if sub else []),
+            })
+    return BillboardObject.create_many(items, doc=doc)
+
+
+BillboardShared.connect("slotChangedObject", _object_changed)
+BillboardShared.connect("slotDeletedObject", _object_deleted)
+BillboardShared.on_close(forget_document)
@@ -0,0 +1,330 @@
+"""Billboard Atlas - shared glyph texture atlases for texture-mode billboards.
+
+Glyphs are rasterized once per (font name, pixel size) into an RGBA atlas
+image, uploaded to a single SoTexture2 that every billboard using that font
+shares, and drawn as one textured quad per character. Changing a billboard's
+text only recomputes quad coordinates; nothing is re-tessellated.
+
+Rasterization uses Qt and runs on a worker thread where possible. Finished
+atlases are picked up on the GUI thread by a timer sensor, whether or not
+they are still cached. The atlas cache evicts the least recently used
+atlases while the images of all atlases alive exceed MAX_CACHE_BYTES.
+Evicted atlases that billboards still use count until they are released,
+and are cached again when asked for, so the cap is only exceeded by the
+atlases in use.
+"""
+
+import collections
+import concurrent.futures
+import math
+import weakref
+
+import FreeCAD
+from pivy import coin
+
+
+# Characters every new atlas contains; others are added on demand
+BASE_CHARSET = "".join(chr(c) for c in range(32, 127))
+
+# Upper bound for the total size of atlas images, unless billboards use more
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Rasterize off the GUI thread (set False if the platform's font backend
+# is not thread safe)
+RASTERIZE_IN_THREAD = True
+
+ATLAS_WIDTH = 1024
+GLYPH_PADDING = 2
+POLL_INTERVAL = 0.05  # seconds
+
+Glyph = collections.namedtuple("Glyph", "u0 v0 u1 v1 advance")
+
+_cache = collections.OrderedDict()
+_cache_bytes = 0  # of the cached atlases
+_evicted = weakref.WeakValueDictionary()  # evicted atlases still in use
+_pending = set()  # atlases with a rasterization in flight
+_executor = None
+_poll_sensor = None
+
+
+def raster_size(font_size):
+    """Return the atlas pixel size used for a world-space font size."""
+    size = 1 << max(0, int(math.ceil(math.log2(max(font_size, 1.0)))))
+    return min(128, max(16, size))
+
+
+class GlyphAtlas:
+    """One rasterized font at one pixel size, shared through a SoTexture2."""
+
+    def __init__(self, font_name, pixel_size):
+        """Create an empty atlas; call request() to rasterize glyphs."""
+        self.font_name = font_name
+        self.pixel_size = pixel_size
+        self.glyphs = {}
+        self.ascent = 0.0
+        self.descent = 0.0
+        self.nbytes = 0
+
+        self.texture = coin.SoTexture2()
+        self.texture.model = coin.SoTexture2.MODULATE
+
+        self._charset = ""
+        self._pending = None
+        self._listeners = weakref.WeakSet()
+
+    @property
+    def ready(self):
+        """True once glyphs are available for layout."""
+        return bool(self.glyphs)
+
+    def add_listener(self, listener):
+        """Call listener.on_atlas_ready(atlas) whenever the atlas is updated."""
+        self._listeners.add(listener)
+
+    def covers(self, text):
+        """Return True if every character of text is in the atlas."""
+        return all(ch in self.glyphs or ch == "\n" for ch in text)
+
+    def request(self, text=""):
+        """Make sure the atlas contains the characters of text.
+
+        Rasterization is asynchronous; listeners are notified when the new
+        image has been uploaded.
+        """
+        missing = set(text) - set(self._charset) - {"\n"}
+        if self._charset and not missing:
+            return
+        self._charset = "".join(sorted(set(self._charset or BASE_CHARSET) | missing))
+
+        charset = self._charset
+        if RASTERIZE_IN_THREAD:
+            self._pending = _get_executor().submit(
+                _rasterize, self.font_name, self.pixel_size, charset
+            )
+            _pending.add(self)
+            _start_polling()
+        else:
+            self._apply(_rasterize(self.font_name, self.pixel_size, charset))
+
+    def _poll(self):
+        """Apply a finished rasterization; return True while still pending."""
+        if self._pending is None:
+            return False
+        if not self._pending.done():
+            return True
+        future, self._pending = self._pending, None
+        try:
+            self._apply(future.result())
+        except Exception as e:
+            FreeCAD.Console.PrintWarning(
+                f"Billboard: could not rasterize font {self.font_name}: {e}\n"
+            )
+        return False
+
+    def _apply(self, result):
+        """Upload a rasterization result on the GUI thread."""
+        width, height, data, glyphs, ascent, descent = result
+        self.texture.image.setValue(coin.SbVec2s(width, height), 4, data)
+        self.glyphs = glyphs
+        self.ascent = ascent
+        self.descent = descent
+        _account(self, len(data))
+        for listener in list(self._listeners):
+            listener.on_atlas_ready(self)
+
+    def layout(self, text, font_size, alignment="CENTER", spacing=1.0):
+        """Lay out text as quads.
+
+        Lines are separated by newlines and spacing * font_size apart, each
+        justified about x=0. Returns (coords, texcoords, quad_count, width)
+        in world units, with the first baseline at y=0 like SoText3; width
+        is that of the widest line.
+        """
+        scale = font_size / self.pixel_size
+        step = spacing * font_size
+
+        coords = []
+        texcoords = []
+        width = 0.0
+        for row, line in enumerate(text.split("\n")):
+            bottom = -self.descent * scale - row * step
+            top = self.ascent * scale - row * step
+            first = len(coords)
+            pen = 0.0
+            for ch in line:
+                glyph = self.glyphs.get(ch)
+                if glyph is None:
+                    continue
+                advance = glyph.advance * scale
+                if not ch.isspace():
+                    coords.extend((
+                        (pen, bottom, 0.0),
+                        (pen + advance, bottom, 0.0),
+                        (pen + advance, top, 0.0),
+                        (pen, top, 0.0),
+                    ))
+                    texcoords.extend((
+                        (glyph.u0, glyph.v0),
+                        (glyph.u1, glyph.v0),
+                        (glyph.u1, glyph.v1),
+                        (glyph.u0, glyph.v1),
+                    ))
+                pen += advance
+            width = max(width, pen)
+
+            if alignment == "CENTER":
+                shift = -pen / 2
+            elif alignment == "RIGHT":
+                shift = -pen
+            else:
+                shift = 0.0
+            if shift:
+                coords[first:] = [(x + shift, y, z) for x, y, z in coords[first:]]
+
+        return coords, texcoords, len(coords) // 4, width
+
+
+def get_atlas(font_name, font_size):
+    """Return the shared atlas for a font, creating it on first use."""
+    global _cache_bytes
+    key = (font_name, raster_size(font_size))
+    atlas = _cache.get(key)
+    if atlas is None:
+        # An evicted atlas still in use is cached again, not rasterized twice
+        atlas = _evicted.pop(key, None) or GlyphAtlas(*key)
+        _cache[key] = atlas
+        _cache_bytes += atlas.nbytes
+    else:
+        _cache.move_to_end(key)
+    return atlas
+
+
+def cache_info():
+    """Return (cached atlases, bytes of all atlas images alive, byte limit)."""
+    return len(_cache), _cache_bytes + _evicted_bytes(), MAX_CACHE_BYTES
+
+
+def _evicted_bytes():
+    """Return the image bytes of evicted atlases that are still in use."""
+    return sum(atlas.nbytes for atlas in list(_evicted.values()))
+
+
+def _account(atlas, nbytes):
+    """Record an atlas' new image size and evict old atlases over the cap."""
+    global _cache_bytes
+    if _cache.get((atlas.font_name, atlas.pixel_size)) is atlas:
+        _cache_bytes += nbytes - atlas.nbytes
+    atlas.nbytes = nbytes
+
+    # Evict least recently used atlases. Billboards that still use one keep
+    # it alive, and its image counts until they release it.
+    in_use = _evicted_bytes()
+    while _cache_bytes + in_use > MAX_CACHE_BYTES and len(_cache) > 1:
+        key, evicted = next(iter(_cache.items()))
+        if evicted is atlas:
+            break
+        del _cache[key]
+        _cache_bytes -= evicted.nbytes
+        _evicted[key] = evicted
+        del evicted
+        if key in _evicted:
+            in_use += _evicted[key].nbytes
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="BillboardAtlas"
+        )
+    return _executor
+
+
+def _start_polling():
+    """Poll pending atlases from the GUI thread until all are applied."""
+    global _poll_sensor
+    if _poll_sensor is None:
+        _poll_sensor = coin.SoTimerSensor(lambda data, sensor: _poll_all(), None)
+        _poll_sensor.setInterval(coin.SbTime(POLL_INTERVAL))
+    if not _poll_sensor.isScheduled():
+        _poll_sensor.schedule()
+
+
+def _poll_all():
+    # Evicted atlases are applied too: billboards may still wait for them.
+    # One at a time, so the others do not look in use while one is applied.
+    waiting = []
+    while _pending:
+        atlas = _pending.pop()
+        if atlas._poll():
+            waiting.append(atlas)
+    _pending.update(waiting)
+    if not _pending:
+        _poll_sensor.unschedule()
+
+
+def _rasterize(font_name, pixel_size, charset):
+    """Rasterize charset into an RGBA image (thread safe, no Coin calls).
+
+    Returns (width, height, bytes, glyphs, ascent, descent); texture
+    coordinates use Coin's bottom-left image origin.
+    """
+    from PySide import QtCore, QtGui
+
+    font = QtGui.QFont(font_name)
+    font.setPixelSize(pixel_size)
+    metrics = QtGui.QFontMetricsF(font)
+    ascent = metrics.ascent()
+    descent = metrics.descent()
+    cell_height = int(math.ceil(ascent + descent)) + 2 * GLYPH_PADDING
+
+    def advance_of(ch):
+        if hasattr(metrics, "horizontalAdvance"):
+            return metrics.horizontalAdvance(ch)
+        return metrics.width(ch)
+
+    # Shelf packing, left to right, top to bottom
+    placements = []
+    x = y = 0
+    for ch in charset:
+        advance = advance_of(ch)
+        cell_width = int(math.ceil(advance)) + 2 * GLYPH_PADDING
+        if x + cell_width > ATLAS_WIDTH:
+            x = 0
+            y += cell_height
+        placements.append((ch, x, y, advance))
+        x += cell_width
+    height = 1 << max(0, int(math.ceil(math.log2(y + cell_height))))
+
+    image = QtGui.QImage(ATLAS_WIDTH, height, QtGui.QImage.Format_RGBA8888)
+    image.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(image)
+    painter.setFont(font)
+    painter.setPen(QtGui.QColor(255, 255, 255, 255))
+
+    glyphs = {}
+    for ch, gx, gy, advance in placements:
+        left = gx + GLYPH_PADDING
+        top = gy + GLYPH_PADDING
+        painter.drawText(QtCore.QPointF(left, top + ascent), ch)
+        # Flip v: the image is uploaded bottom row first
+        glyphs[ch] = Glyph(
+            u0=left / ATLAS_WIDTH,
+            v0=1.0 - (top + ascent + descent) / height,
+            u1=(left + advance) / ATLAS_WIDTH,
+            v1=1.0 - top / height,
+            advance=advance,
+        )
+    painter.end()
+
+    image = image.mirrored(False, True)
+    data = _image_bytes(image)
+    return ATLAS_WIDTH, height, data, glyphs, ascent, descent
+
+
+def _image_bytes(image):
+    """Return the raw pixel bytes of a QImage across PySide versions."""
+    bits = image.constBits()
+    if hasattr(bits, "tobytes"):
+        return bits.tobytes()
+    return bytes(bits)
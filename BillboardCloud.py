@@ -0,0 +1,414 @@
+"""Billboard Cloud - one document object holding many text labels.
+
+A cloud stores positions and colors as list properties, which FreeCAD
+writes as binary arrays inside the document file. Texts are a string list,
+which FreeCAD would write as one XML element per label; with compact saving
+on (the default, preference "CompactSave") they are saved instead as one
+zlib-compressed, NUL-separated string in the cloud's proxy state. A cloud
+restored without the GUI keeps that string and only splits it into a list
+of texts when they are needed; texts() reads them either way.
+
+from_billboards() moves TextBillboards into clouds, one per style and font
+setup they share, so each label only keeps the fields that differ between
+labels. A cloud links the BillboardStyle of its billboards, if any, and
+like them reads its font and text color from it.
+Billboards using a field a cloud has no place for (see lost_fields) are
+kept unless the loss is asked for.
+"""
+
+import base64
+import zlib
+
+import FreeCAD
+
+import BillboardShared
+import BillboardStyle
+
+
+# TextBillboard properties a cloud does not keep, with their defaults
+LOST_PROPERTIES = (
+    ("ShowBackground", False),
+    ("ShowFrame", False),
+    ("ScaleMode", "World"),
+    ("RenderMode", "Polygon"),
+    ("Priority", 0),
+    ("LodMinPixelHeight", 0.0),
+    ("LodFallback", "Marker"),
+    ("MaxWidth", 0.0),
+    ("LineSpacing", 1.0),
+)
+
+
+class TextBillboardCloud:
+    """A collection of camera-facing text labels sharing one font setup.
+
+    Positions, texts and per-item colors are stored as parallel list
+    properties, so document size scales with the data instead of with the
+    number of FeaturePython objects. A missing or shorter Colors list falls
+    back to TextColor.
+
+    Texts of a cloud restored from a compact file without the GUI are empty
+    until unpack() is called; the item methods below and texts() unpack
+    first, so scripts should use them rather than read Texts directly.
+    Assigning Texts replaces the packed texts.
+    """
+
+    def __init__(self, obj):
+        """Initialize the cloud object with properties."""
+        obj.Proxy = self
+        self.Type = "TextBillboardCloud"
+        # Texts packed for saving (None once they change), and whether the
+        # Texts property still has to be filled from them after a restore
+        self.packed = None
+        self.lazy = False
+
+        # Position of the whole cloud in 3D space
+        obj.addProperty(
+            "App::PropertyPlacement", "Placement", "Base",
+            "Position and orientation of the cloud"
+        )
+
+        # Items
+        obj.addProperty(
+            "App::PropertyVectorList", "Positions", "Cloud",
+            "Label anchor positions, relative to Placement"
+        )
+
+        obj.addProperty(
+            "App::PropertyStringList", "Texts", "Cloud",
+            "Label texts, one per position"
+        )
+
+        obj.addProperty(
+            "App::PropertyColorList", "Colors", "Cloud",
+            "Per-label text colors (optional, defaults to TextColor)"
+        )
+
+        # Font settings shared by all labels
+        obj.addProperty(
+            "App::PropertyFloat", "FontSize", "Font",
+            "Font size in points"
+        ).FontSize = 24.0
+
+        obj.addProperty(
+            "App::PropertyString", "FontName", "Font",
+            "Font family name"
+        ).FontName = "Arial"
+
+        obj.addProperty(
+            "App::PropertyColor", "TextColor", "Font",
+            "Default text color"
+        ).TextColor = (1.0, 1.0, 1.0, 0.0)  # White
+
+        obj.addProperty(
+            "App::PropertyEnumeration", "Alignment", "Font",
+            "Text alignment"
+        )
+        obj.Alignment = ["LEFT", "CENTER", "RIGHT"]
+        obj.Alignment = "CENTER"
+
+        self._ensure_properties(obj)
+
+    def _ensure_properties(self, obj):
+        """Add properties introduced after the first cloud version that obj lacks."""
+        if "Style" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyLink", "Style", "Font",
+                "Shared BillboardStyle; overrides font and text color when set"
+            )
+
+    def onDocumentRestored(self, obj):
+        """Called after the object has been restored from a file."""
+        self._ensure_properties(obj)
+        if "Transient" in obj.getPropertyStatus("Texts"):
+            obj.setPropertyStatus("Texts", "-Transient")
+        if FreeCAD.GuiUp:
+            # The view and the property editor show the texts
+            self.unpack(obj)
+
+    def execute(self, obj):
+        """Called when the object needs to be recomputed."""
+        pass
+
+    def onChanged(self, obj, prop):
+        """Called when a property changes."""
+        if "Restore" in getattr(obj, "State", ()):
+            return
+        if prop == "Texts":
+            # The assigned texts replace the packed ones
+            self.packed = None
+            self.lazy = False
+
+    def is_packed(self):
+        """Return True if the texts are only held packed, as restored."""
+        return self.lazy
+
+    def unpack(self, obj):
+        """Fill Texts from the packed texts of a restored cloud.
+
+        Texts only gets the values that were saved, so the cloud is not
+        touched and the document not marked modified.
+        """
+        if not self.lazy:
+            return
+        self.lazy = False
+        packed = self.packed
+        if packed is None:
+            return
+        status = obj.getPropertyStatus("Texts")
+        silent = [bit for bit in ("Output", "NoModify") if bit not in status]
+        obj.setPropertyStatus("Texts", silent)
+        try:
+            obj.Texts = unpack_texts(packed)
+        finally:
+            obj.setPropertyStatus("Texts", ["-" + bit for bit in silent])
+        self.packed = packed  # still matches, no need to pack again on save
+
+    def add_items(self, obj, positions, texts, colors=None):
+        """Append labels; colors may be omitted to use TextColor."""
+        self.unpack(obj)
+        positions = [FreeCAD.Vector(*p) for p in positions]
+        texts = [str(t) for t in texts]
+        if len(positions) != len(texts):
+            raise ValueError("positions and texts must have the same length")
+
+        if colors is not None or obj.Colors:
+            obj.Colors = self._padded_colors(obj, len(obj.Positions)) + list(
+                colors if colors is not None
+                else [BillboardStyle.source(obj).TextColor] * len(positions)
+            )
+        obj.Positions = obj.Positions + positions
+        obj.Texts = obj.Texts + texts
+
+    def remove_item(self, obj, index):
+        """Remove the label at index."""
+        self.unpack(obj)
+        positions = obj.Positions
+        texts = obj.Texts
+        del positions[index]
+        del texts[index]
+        if obj.Colors:
+            colors = self._padded_colors(obj, len(texts) + 1)
+            del colors[index]
+            obj.Colors = colors
+        obj.Positions = positions
+        obj.Texts = texts
+
+    def set_item(self, obj, index, position=None, text=None, color=None):
+        """Change the position, text and/or color of one label."""
+        self.unpack(obj)
+        if color is not None:
+            colors = self._padded_colors(obj, len(obj.Positions))
+            colors[index] = color
+            obj.Colors = colors
+        if position is not None:
+            positions = obj.Positions
+            positions[index] = FreeCAD.Vector(*position)
+            obj.Positions = positions
+        if text is not None:
+            texts = obj.Texts
+            texts[index] = str(text)
+            obj.Texts = texts
+
+    @staticmethod
+    def _padded_colors(obj, count):
+        """Return Colors extended with the (style's) TextColor to count entries."""
+        colors = list(obj.Colors)[:count]
+        colors.extend([BillboardStyle.source(obj).TextColor] * (count - len(colors)))
+        return colors
+
+    def dumps(self):
+        """Serialize for saving."""
+        state = {"Type": self.Type}
+        if self.packed is not None:
+            state["Texts"] = self.packed
+        return state
+
+    def loads(self, state):
+        """Deserialize when loading."""
+        self.packed = None
+        if state:
+            self.Type = state.get("Type", "TextBillboardCloud")
+            self.packed = state.get("Texts")
+        self.lazy = self.packed is not None
+
+
+def compact_enabled():
+    """Return True if cloud texts are saved packed."""
+    return BillboardShared.params().GetBool("CompactSave", True)
+
+
+def set_compact_enabled(flag):
+    """Choose packed texts or a plain string list for the next saves."""
+    BillboardShared.params().SetBool("CompactSave", bool(flag))
+
+
+def pack_texts(texts):
+    """Return texts as {"Count", "Data"}: one compressed, base64-encoded string."""
+    data = zlib.compress("\0".join(texts).encode("utf-8"))
+    return {"Count": len(texts), "Data": base64.b64encode(data).decode("ascii")}
+
+
+def unpack_texts(packed):
+    """Return the list of texts packed by pack_texts()."""
+    if not packed["Count"]:
+        return []
+    return zlib.decompress(base64.b64decode(packed["Data"])).decode("utf-8").split("\0")
+
+
+def texts(obj):
+    """Return the texts of cloud obj, unpacking them if it was restored packed."""
+    obj.Proxy.unpack(obj)
+    return obj.Texts
+
+
+def is_cloud(obj):
+    """Return True if obj is a TextBillboardCloud."""
+    return getattr(getattr(obj, "Proxy", None), "Type", None) == "TextBillboardCloud"
+
+
+def _make(doc, name):
+    """Add a TextBillboardCloud (and its view provider, if the GUI is up) to doc."""
+    obj = doc.addObject("App::FeaturePython", name)
+    TextBillboardCloud(obj)
+
+    # Add view provider if GUI is available
+    if FreeCAD.GuiUp:
+        import BillboardCloudViewProvider
+        BillboardCloudViewProvider.ViewProviderTextBillboardCloud(obj.ViewObject)
+    return obj
+
+
+def create(name: str = "BillboardCloud", positions=(), texts=(),
+           colors=None) -> "FreeCAD.DocumentObject":
+    """Create a new TextBillboardCloud object in the active document."""
+    if FreeCAD.ActiveDocument is None:
+        FreeCAD.Console.PrintError("No active document\n")
+        return None
+
+    obj = _make(FreeCAD.ActiveDocument, name)
+    if positions:
+        obj.Proxy.add_items(obj, positions, texts, colors)
+
+    FreeCAD.ActiveDocument.recompute()
+    return obj
+
+
+def lost_fields(obj):
+    """Return the fields of billboard obj that a cloud would not keep.
+
+    Those are the LOST_PROPERTIES not at their default, "Label" if it is not
+    the object's name, "Rotation" if the placement is rotated and
+    "Visibility" if the billboard is hidden, since every cloud label is shown.
+    """
+    lost = [
+        prop for prop, default in LOST_PROPERTIES
+        if getattr(obj, prop, default) != default
+    ]
+    if obj.Label != obj.Name:
+        lost.append("Label")
+    if tuple(obj.Placement.Rotation.Q) != (0.0, 0.0, 0.0, 1.0):
+        lost.append("Rotation")
+    vobj = getattr(obj, "ViewObject", None)
+    if not (vobj.Visibility if vobj is not None else getattr(obj, "Visibility", True)):
+        lost.append("Visibility")
+    return lost
+
+
+def from_billboards(billboards, name="BillboardCloud", doc=None, lossy=False) -> list:
+    """Replace TextBillboards by clouds, one per font setup; return the clouds.
+
+    Billboards are grouped by their Style link and their effective FontSize,
+    FontName and Alignment (font values of a linked style count). Each cloud
+    links that style and stores those values once, its labels' positions and
+    texts, and per-label colors only if they differ within the group. Billboards with an Anchor or a TextTemplate are
+    kept, since a cloud does not follow other objects. So are billboards
+    with lost_fields(), unless lossy is True; either way a warning lists
+    the fields and how many billboards use them.
+    """
+    import BillboardObject
+
+    doc = doc or FreeCAD.ActiveDocument
+    if doc is None:
+        FreeCAD.Console.PrintError("No active document\n")
+        return []
+
+    groups = {}
+    lost = {}  # field -> number of billboards using it
+    for obj in billboards:
+        if not BillboardObject.is_billboard(obj) or obj.Anchor or obj.TextTemplate:
+            continue
+        fields = lost_fields(obj)
+        for field in fields:
+            lost[field] = lost.get(field, 0) + 1
+        if fields and not lossy:
+            continue
+        style = BillboardStyle.source(obj)
+        linked = style if style is not obj else None
+        key = (linked, style.FontSize, style.FontName, obj.Alignment)
+        groups.setdefault(key, []).append((obj, tuple(style.TextColor)))
+
+    clouds = []
+    doc.openTransaction("Convert billboards to clouds")
+    try:
+        for (linked, font_size, font_name, alignment), members in groups.items():
+            cloud = _make(doc, name)
+            # Own values too, in case the style is unlinked later
+            cloud.Style = linked
+            cloud.FontSize = font_size
+            cloud.FontName = font_name
+            cloud.Alignment = alignment
+            colors = [color for _obj, color in members]
+            cloud.TextColor = colors[0]
+            cloud.Proxy.add_items(
+                cloud,
+                [obj.Placement.Base for obj, _color in members],
+                [obj.Text for obj, _color in members],
+                colors if any(color != colors[0] for color in colors) else None,
+            )
+            for obj, _color in members:
+                doc.removeObject(obj.Name)
+            clouds.append(cloud)
+    except Exception:
+        doc.abortTransaction()
+        raise
+    doc.commitTransaction()
+
+    if lost:
+        listed = ", ".join(f"{field} ({n})" for field, n in sorted(lost.items()))
+        if lossy:
+            FreeCAD.Console.PrintWarning(f"Dropped from converted billboards: {listed}\n")
+        else:
+            FreeCAD.Console.PrintWarning(
+                f"Kept billboards using fields a cloud cannot hold: {listed}\n"
+            )
+    doc.recompute()
+    return clouds
+
+
+def _saving(doc, filename):
+    """Save cloud texts packed, or as a plain list if compact saving is off."""
+    compact = compact_enabled()
+    for obj in doc.Objects:
+        if not is_cloud(obj):
+            continue
+        proxy = obj.Proxy
+        if compact:
+            if proxy.packed is None:
+                proxy.packed = pack_texts(obj.Texts)
+            # Keep name and type of the property, but not its value
+            obj.setPropertyStatus("Texts", "Transient")
+        else:
+            proxy.unpack(obj)
+            proxy.packed = None
+
+
+def _saved(doc, filename):
+    # Copies and undo store the property again
+    for obj in doc.Objects:
+        if is_cloud(obj) and "Transient" in obj.getPropertyStatus("Texts"):
+            obj.setPropertyStatus("Texts", "-Transient")
+
+
+BillboardShared.connect("slotStartSaveDocument", _saving)
+BillboardShared.connect("slotFinishSaveDocument", _saved)
@@ -0,0 +1,257 @@
+"""Billboard Cloud ViewProvider - batched Coin3D visualization for label clouds."""
+
+from pivy import coin
+
+import BillboardInstrumentation
+import BillboardOrientation
+import BillboardStyle
+
+
+def _set_text(text_node, text):
+    """Show text on an SoText3, one string per line."""
+    lines = text.split("\n")
+    text_node.string.setValues(0, len(lines), lines)
+    text_node.string.setNum(len(lines))
+
+
+class ViewProviderTextBillboardCloud:
+    """ViewProvider for TextBillboardCloud.
+
+    Font, light model, camera-facing rotation and vertical offset are single
+    nodes shared by every label; each label only owns a separator, a
+    translation, a color and its text. Property changes are coalesced and
+    diffed against the applied items so that editing, adding or removing one
+    entry only touches that entry's nodes.
+    """
+
+    def __init__(self, vobj):
+        """Initialize the view provider."""
+        vobj.Proxy = self
+        self.ViewObject = vobj
+
+    def attach(self, vobj):
+        """Called when the view provider is attached to the object."""
+        with BillboardInstrumentation.timed("cloud.attach"):
+            self._attach(vobj)
+
+    def _attach(self, vobj):
+        """Build the cloud scene graph."""
+        self.ViewObject = vobj
+
+        self.root = coin.SoSeparator()
+        self.root.setName("BillboardCloudRoot")
+        # Labels hold the shared rotation, whose value depends on the view
+        # being rendered, so neither the root nor the separators above it
+        # may cache
+        self.root.renderCaching = coin.SoSeparator.OFF
+        self.root.addChild(BillboardOrientation.cache_guard())
+
+        # Shared setup, inherited by every label below
+        self.translation = coin.SoTranslation()
+        self.light_model = coin.SoLightModel()
+        self.light_model.model = coin.SoLightModel.BASE_COLOR
+        self.font = coin.SoFont()
+        self.rotation = BillboardOrientation.rotation_node()
+        self.vertical_offset = coin.SoTranslation()
+        self.items = coin.SoGroup()
+
+        self.root.addChild(self.translation)
+        self.root.addChild(self.light_model)
+        self.root.addChild(self.font)
+        self.root.addChild(self.items)
+
+        # Applied (position, text, color) tuples and their nodes, by index
+        self._applied = []
+        self._item_nodes = []
+        self._justification = coin.SoText3.CENTER
+
+        self._flush_sensor = coin.SoOneShotSensor(
+            lambda data, sensor: self.flush(), None
+        )
+
+        vobj.addDisplayMode(self.root, "Standard")
+
+        obj = vobj.Object
+        self._update_position(obj)
+        self._update_font(obj)
+        self._update_alignment(obj)
+        self._sync_items(obj)
+
+    def _make_item_nodes(self, item):
+        """Build the per-label subgraph for a (position, text, color) tuple."""
+        position, text, color = item
+        sep = coin.SoSeparator()
+        sep.renderCaching = coin.SoSeparator.OFF
+        translation = coin.SoTranslation()
+        translation.translation.setValue(*position)
+        base_color = coin.SoBaseColor()
+        base_color.rgb.setValue(*color)
+        text_node = coin.SoText3()
+        text_node.parts = coin.SoText3.FRONT | coin.SoText3.BACK
+        text_node.justification = self._justification
+        _set_text(text_node, text)
+
+        sep.addChild(translation)
+        sep.addChild(self.rotation)  # shared node
+        sep.addChild(self.vertical_offset)  # shared node
+        sep.addChild(base_color)
+        sep.addChild(text_node)
+        return sep, translation, base_color, text_node
+
+    def _collect_items(self, obj):
+        """Return the object's labels as comparable (position, text, color) tuples."""
+        positions = getattr(obj, "Positions", [])
+        texts = getattr(obj, "Texts", [])
+        colors = getattr(obj, "Colors", [])
+        default = tuple(getattr(BillboardStyle.source(obj), "TextColor", (1.0, 1.0, 1.0))[:3])
+
+        items = []
+        for i, pos in enumerate(positions):
+            text = texts[i] if i < len(texts) else ""
+            color = tuple(colors[i][:3]) if i < len(colors) else default
+            items.append(((pos.x, pos.y, pos.z), text, color))
+        return items
+
+    def _sync_items(self, obj):
+        """Apply the object's labels, touching only entries that changed."""
+        old = self._applied
+        new = self._collect_items(obj)
+
+        # Unchanged common prefix and suffix
+        start = 0
+        limit = min(len(old), len(new))
+        while start < limit and old[start] == new[start]:
+            start += 1
+        end_old, end_new = len(old), len(new)
+        while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+
+        # Edit in place where both ranges overlap
+        common = min(end_old, end_new) - start
+        for i in range(start, start + common):
+            if old[i] != new[i]:
+                self._set_item(i, old[i], new[i])
+
+        # Remove surplus old entries, then insert new ones
+        for i in range(end_old - 1, start + common - 1, -1):
+            self.items.removeChild(i)
+            del self._item_nodes[i]
+        for i in range(start + common, end_new):
+            nodes = self._make_item_nodes(new[i])
+            self.items.insertChild(nodes[0], i)
+            self._item_nodes.insert(i, nodes)
+
+        self._applied = new
+
+    def _set_item(self, index, old, new):
+        """Update the fields of one label that differ between old and new."""
+        sep, translation, base_color, text_node = self._item_nodes[index]
+        if old[0] != new[0]:
+            translation.translation.setValue(*new[0])
+        if old[1] != new[1]:
+            _set_text(text_node, new[1])
+        if old[2] != new[2]:
+            base_color.rgb.setValue(*new[2])
+
+    def _update_position(self, obj):
+        """Update cloud position from object Placement."""
+        if hasattr(obj, "Placement"):
+            pos = obj.Placement.Base
+            self.translation.translation.setValue(pos.x, pos.y, pos.z)
+
+    def _update_font(self, obj):
+        """Update the shared font settings, from the linked style if any."""
+        source = BillboardStyle.source(obj)
+        if hasattr(source, "FontName"):
+            self.font.name.setValue(source.FontName)
+        if hasattr(source, "FontSize"):
+            self.font.size.setValue(source.FontSize)
+            # Shift text for better centering
+            self.vertical_offset.translation.setValue(0, source.FontSize * 0.2, 0)
+
+    def style_changed(self, prop):
+        """Called by a linked BillboardStyle after its font or text color changed."""
+        if prop == "TextColor":
+            if not self._flush_sensor.isScheduled():
+                self._flush_sensor.schedule()
+        else:
+            self._update_font(self.ViewObject.Object)
+
+    def _update_alignment(self, obj):
+        """Update justification of every label."""
+        alignment_map = {
+            "LEFT": coin.SoText3.LEFT,
+            "CENTER": coin.SoText3.CENTER,
+            "RIGHT": coin.SoText3.RIGHT,
+        }
+        justification = alignment_map.get(
+            getattr(obj, "Alignment", "CENTER"), coin.SoText3.CENTER
+        )
+        if justification == self._justification:
+            return
+        self._justification = justification
+        for nodes in self._item_nodes:
+            nodes[3].justification = justification
+
+    def flush(self):
+        """Apply pending item changes now."""
+        if self._flush_sensor.isScheduled():
+            self._flush_sensor.unschedule()
+        with BillboardInstrumentation.timed("cloud.flush"):
+            self._sync_items(self.ViewObject.Object)
+
+    def updateData(self, fp, prop):
+        """Called when a data property of the object changes."""
+        if not hasattr(self, "items"):
+            return
+        if prop in ("Positions", "Texts", "Colors", "TextColor"):
+            # Lists are usually edited together; diff once per event loop turn
+            if not self._flush_sensor.isScheduled():
+                self._flush_sensor.schedule()
+        elif prop in ("FontSize", "FontName"):
+            self._update_font(fp)
+        elif prop == "Style":
+            self._update_font(fp)
+            if not self._flush_sensor.isScheduled():
+                self._flush_sensor.schedule()
+        elif prop == "Alignment":
+            self._update_alignment(fp)
+        elif prop == "Placement":
+            self._update_position(fp)
+
+    def onChanged(self, vp, prop):
+        """Called when a view property changes."""
+        pass
+
+    def getDisplayModes(self, vobj):
+        """Return available display modes."""
+        return ["Standard"]
+
+    def getDefaultDisplayMode(self):
+        """Return the default display mode."""
+        return "Standard"
+
+    def setDisplayMode(self, mode):
+        """Set the display mode."""
+        return mode
+
+    def getIcon(self):
+        """Return the icon for this object."""
+        return ""
+
+    def claimChildren(self):
+        """Return child objects."""
+        return []
+
+    def onDelete(self, vobj, subelements):
+        """Called when the object is about to be deleted."""
+        return True
+
+    def dumps(self):
+        """Serialize for saving."""
+        return None
+
+    def loads(self, state):
+        """Deserialize when loading."""
+        return None
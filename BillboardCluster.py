@@ -0,0 +1,389 @@
+"""Billboard Cluster - aggregate labels for distant groups of billboards.
+
+An octree over the billboards' anchors (Placement.Base) is built once per
+document and kept until a billboard is added, removed or moved, which the
+screen passes' anchor generation tells without comparing the anchors. Each node
+knows the centroid, bounding radius and number of the anchors below it, and
+its anchors are contiguous in one index array.
+
+On every camera change the clustering pass selects a cut through the tree:
+a node whose bounding sphere spans fewer than CLUSTER_PIXELS on screen (or
+lies behind the camera) becomes one aggregate label ("42 labels") at its
+centroid, and the billboards below it are hidden. The cut of the previous
+camera is the starting point: its nodes are merged into their parents or
+split into their children only where the projected sizes changed, and only
+the billboards of nodes that entered the cut are shown or hidden. A small
+camera move therefore tests and touches a few nodes instead of walking the
+tree from the root and visiting every billboard.
+
+Each 3D view has its own camera, so the cut and the aggregate labels are
+kept per view of a document, in a layer added to that view's scene graph
+only; the hidden billboards are switched per view by BillboardScreen. The
+aggregates use the pixel-scaled shared orientation, so they keep their size
+on screen like ScaleMode "Screen" billboards.
+"""
+
+from pivy import coin
+
+
+# Nodes spanning fewer pixels than this on screen are drawn as one aggregate
+CLUSTER_PIXELS = 64.0
+
+# Font size of the aggregate labels, in pixels
+FONT_PIXELS = 14.0
+
+# Octree leaves hold at most this many anchors (unless they coincide)
+LEAF_SIZE = 8
+MAX_DEPTH = 16
+
+_counters = {"builds": 0, "tests": 0, "changed": 0}
+
+
+class _Node:
+    """Octree node over anchors order[start:end]."""
+
+    __slots__ = ("start", "end", "center", "radius", "parent", "children")
+
+    def __init__(self, start, end, center, radius, parent):
+        self.start = start
+        self.end = end
+        self.center = center
+        self.radius = radius
+        self.parent = parent
+        self.children = ()
+
+    @property
+    def count(self):
+        return self.end - self.start
+
+
+class ClusterTree:
+    """Octree over a fixed list of anchor positions."""
+
+    def __init__(self, positions):
+        """Build the tree; positions is a list of (x, y, z)."""
+        _counters["builds"] += 1
+        self.positions = positions
+        self.order = list(range(len(positions)))
+        self.root = self._build(0, len(positions), None, 0) if positions else None
+
+    def _build(self, start, end, parent, depth):
+        positions, order = self.positions, self.order
+        points = [positions[i] for i in order[start:end]]
+        xs, ys, zs = zip(*points)
+        lo = (min(xs), min(ys), min(zs))
+        hi = (max(xs), max(ys), max(zs))
+        count = end - start
+        center = (sum(xs) / count, sum(ys) / count, sum(zs) / count)
+        radius = max(
+            ((x - center[0]) ** 2 + (y - center[1]) ** 2 + (z - center[2]) ** 2) ** 0.5
+            for x, y, z in ((lo[0], lo[1], lo[2]), (hi[0], hi[1], hi[2]),
+                            (lo[0], hi[1], lo[2]), (hi[0], lo[1], hi[2]),
+                            (lo[0], lo[1], hi[2]), (hi[0], hi[1], lo[2]),
+                            (lo[0], hi[1], hi[2]), (hi[0], lo[1], lo[2]))
+        )
+        node = _Node(start, end, center, radius, parent)
+        if count <= LEAF_SIZE or depth >= MAX_DEPTH or lo == hi:
+            return node
+
+        # Sort the node's anchors by octant so every child is contiguous
+        mid = ((lo[0] + hi[0]) / 2, (lo[1] + hi[1]) / 2, (lo[2] + hi[2]) / 2)
+
+        def octant(i):
+            x, y, z = positions[i]
+            return (x > mid[0]) | ((y > mid[1]) << 1) | ((z > mid[2]) << 2)
+
+        order[start:end] = sorted(order[start:end], key=octant)
+        children = []
+        first = start
+        while first < end:
+            code = octant(order[first])
+            last = first + 1
+            while last < end and octant(order[last]) == code:
+                last += 1
+            children.append(self._build(first, last, node, depth + 1))
+            first = last
+        node.children = tuple(children)
+        return node
+
+    def members(self, node):
+        """Return the anchor indices below node."""
+        return self.order[node.start:node.end]
+
+
+class _ClusterState:
+    """Tree, current cut and aggregate labels of one view of a document."""
+
+    def __init__(self, anchors):
+        self.generation = anchors.generation
+        self.billboards = anchors.billboards
+        self.tree = ClusterTree(anchors.positions)
+        self.cut = {}  # node -> True if drawn as an aggregate
+        self.clustered = [False] * len(anchors.positions)
+        self.aggregates = {}  # node -> (separator, translation, scale, text)
+        self._order = (anchors, None)  # anchor set -> its indices in billboards
+
+    def matches(self, anchors):
+        """Return True if the tree is still valid for an anchor set."""
+        return self.generation == anchors.generation
+
+    def flags(self, anchors):
+        """Return the clustered flags in the order of an anchor set.
+
+        Anchor sets of one generation hold the same billboards, but a priority
+        edit reorders them.
+        """
+        if anchors.billboards is self.billboards:
+            return self.clustered
+        known, order = self._order
+        if known is not anchors:
+            index = {vp: i for i, vp in enumerate(self.billboards)}
+            order = [index[vp] for vp in anchors.billboards]
+            self._order = (anchors, order)
+        return [self.clustered[i] for i in order]
+
+
+_states = {}  # (document name, view) -> _ClusterState
+_layers = {}  # (document name, view) -> SoSeparator holding the aggregates
+_style = None
+
+
+def get_counters():
+    """Return how many trees were built, nodes tested and cut nodes changed."""
+    return dict(_counters)
+
+
+def reset_counters():
+    """Reset the counters to zero."""
+    for key in _counters:
+        _counters[key] = 0
+
+
+def cluster_state(document, view=None):
+    """Return the clustering state of a view of a document (its first by default)."""
+    for (name, owner), found in _states.items():
+        if name == document and (view is None or owner is view):
+            return found
+    return None
+
+
+def summary(document, view=None):
+    """Return (aggregate labels, billboards they replace) shown in a view of a document."""
+    found = cluster_state(document, view)
+    if found is None:
+        return 0, 0
+    return len(found.aggregates), sum(found.clustered)
+
+
+def cluster(document, anchors, snapshot, view=None):
+    """Select the cut for a view's camera and hide the billboards of aggregated nodes.
+
+    anchors is the screen passes' cached anchor set. Returns flags telling,
+    per billboard of anchors, whether it is replaced by an aggregate label.
+    """
+    key = (document, view)
+    state = _states.get(key)
+    if state is None or not state.matches(anchors):
+        # Billboards were added, removed or moved: start over
+        _clear(key)
+        state = _states[key] = _ClusterState(anchors)
+    tree = state.tree
+    billboards = state.billboards
+    if tree.root is None:
+        return state.flags(anchors)
+
+    small = _size_test(snapshot)
+    cut = select(tree.root, state.cut, small)
+
+    # Only nodes that entered the cut (or changed kind) touch billboards
+    for node, aggregated in cut.items():
+        if state.cut.get(node) == aggregated:
+            continue
+        _counters["changed"] += 1
+        for i in tree.members(node):
+            if state.clustered[i] != aggregated:
+                state.clustered[i] = aggregated
+                billboards[i]._set_hidden("cluster", aggregated)
+    state.cut = cut
+    _update_aggregates(key, state, small)
+    return state.flags(anchors)
+
+
+def _size_test(snapshot):
+    """Return small(node) for a camera, caching each node's depth in small.depth."""
+    import BillboardScreen
+
+    p = snapshot.projection
+    m = BillboardScreen._combined_matrix(snapshot)
+    m03, m13, m23, m33 = m[0][3], m[1][3], m[2][3], m[3][3]
+    # Pixels per world unit at clip w = 1
+    pixels = p[1][1] * snapshot.viewport[1] / 2.0
+    depth = {}
+
+    def small(node):
+        """True if node is drawn as one aggregate (or is a single anchor)."""
+        _counters["tests"] += 1
+        x, y, z = node.center
+        w = x * m03 + y * m13 + z * m23 + m33
+        depth[node] = w
+        if w < -node.radius:
+            return True  # behind the camera
+        return w > 0.0 and node.radius * pixels / w < CLUSTER_PIXELS
+
+    small.depth = depth
+    return small
+
+
+def select(root, previous, small):
+    """Return the cut {node: aggregated} for the current camera.
+
+    Starts from the previous cut (or the root): each node is merged into
+    its parent while the parent is small enough, then nodes too large on
+    screen are split until they are small or leaves. Leaves that are still
+    too large keep their billboards.
+    """
+    memo = {}
+
+    def test(node):
+        result = memo.get(node)
+        if result is None:
+            result = memo[node] = small(node)
+        return result
+
+    # Merge: climb to the highest small ancestor of every previous cut node
+    tops = set()
+    for node in previous or (root,):
+        parent = node.parent
+        while parent is not None and test(parent):
+            node, parent = parent, parent.parent
+        tops.add(node)
+    # Drop nodes merged into one of their ancestors
+    starts = []
+    for node in tops:
+        parent = node.parent
+        while parent is not None and parent not in tops:
+            parent = parent.parent
+        if parent is None:
+            starts.append(node)
+
+    # Split: descend from nodes that are too large on screen
+    cut = {}
+    stack = starts
+    while stack:
+        node = stack.pop()
+        if test(node):
+            cut[node] = node.count > 1
+        elif node.children:
+            stack.extend(node.children)
+        else:
+            cut[node] = False
+    return cut
+
+
+def _layer(key):
+    """Return the aggregate layer of a (document, view), added to that view.
+
+    Without a view, the layer is added to all 3D views of the document.
+    """
+    import FreeCADGui
+
+    layer = _layers.get(key)
+    if layer is None:
+        global _style
+        if _style is None:
+            font = coin.SoFont()
+            font.size = FONT_PIXELS
+            color = coin.SoBaseColor()
+            color.rgb = (1.0, 0.85, 0.3)
+            pick_style = coin.SoPickStyle()
+            pick_style.style = coin.SoPickStyle.UNPICKABLE
+            _style = (font, color, pick_style)
+        layer = coin.SoSeparator()
+        layer.setName("BillboardClusters")
+        # Holds the shared orientation, whose value depends on the view
+        layer.renderCaching = coin.SoSeparator.OFF
+        for node in _style:
+            layer.addChild(node)
+        _layers[key] = layer
+
+    document, view = key
+    if view is not None:
+        roots = [view.scene_root]
+    else:
+        gui_document = FreeCADGui.getDocument(document)
+        views = gui_document.mdiViewsOfType("Gui::View3DInventor") if gui_document else ()
+        roots = [v.getSceneGraph() for v in views]
+    for root in roots:
+        if root.findChild(layer) < 0:
+            root.addChild(layer)
+    return layer
+
+
+def _update_aggregates(key, state, small):
+    """Show one label per aggregated cut node, sized by its depth."""
+    import BillboardOrientation
+
+    layer = _layer(key)
+    wanted = {node for node, aggregated in state.cut.items() if aggregated}
+    for node in [n for n in state.aggregates if n not in wanted]:
+        layer.removeChild(state.aggregates.pop(node)[0])
+
+    depths = small.depth
+    for node in wanted:
+        nodes = state.aggregates.get(node)
+        if nodes is None:
+            sep = coin.SoSeparator()
+            translation = coin.SoTranslation()
+            translation.translation.setValue(*node.center)
+            scale = coin.SoScale()
+            text = coin.SoText3()
+            text.justification = coin.SoText3.CENTER
+            text.string.setValue(f"{node.count} labels")
+            sep.addChild(translation)
+            sep.addChild(scale)
+            sep.addChild(BillboardOrientation.rotation_node(screen=True))
+            sep.addChild(text)
+            layer.addChild(sep)
+            nodes = state.aggregates[node] = (sep, translation, scale, text)
+        depth = depths.get(node)
+        if depth is not None and depth > 0.0 and nodes[2].scaleFactor.getValue()[0] != depth:
+            nodes[2].scaleFactor.setValue(depth, depth, depth)
+
+
+def _clear_aggregates(key, state):
+    layer = _layers.get(key)
+    for sep, *_nodes in state.aggregates.values():
+        if layer is not None:
+            layer.removeChild(sep)
+    state.aggregates.clear()
+
+
+def _clear(key):
+    state = _states.pop(key, None)
+    if state is None:
+        return
+    _clear_aggregates(key, state)
+    for vp, clustered in zip(state.billboards, state.clustered):
+        if clustered:
+            vp._set_hidden("cluster", False)
+
+
+def clear(document=None):
+    """Show all clustered billboards again and remove the aggregate labels."""
+    for key in list(_states):
+        if document is None or key[0] == document:
+            _clear(key)
+
+
+def forget_document(document):
+    """Drop the trees and aggregate layers of a document being closed."""
+    for mapping in (_states, _layers):
+        for key in [k for k in mapping if k[0] == document]:
+            del mapping[key]
+
+
+def forget_view(view):
+    """Drop the trees and aggregate layers of a closed view."""
+    for mapping in (_states, _layers):
+        for key in [k for k in mapping if k[1] is view]:
+            del mapping[key]
@@ -35,4 +35,327 @@ class CreateTextBillboard:
         return FreeCAD.ActiveDocument is not None
 
 
+class CreateAnchoredBillboards:
+    """Command to label the selected objects, vertices, edges or faces."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        return {
+            "Pixmap": get_icon_path("AddBillboard.svg"),
+            "MenuText": "Create Anchored Billboards",
+            "ToolTip": "Create one billboard per selected object or sub-element; "
+                       "each follows its anchor when it moves",
+        }
+
+    def Activated(self):
+        """Called when the command is activated."""
+        import BillboardAnchor
+        BillboardAnchor.create_for_selection(FreeCADGui.Selection.getSelectionEx())
+
+    def IsActive(self):
+        """Return True if something is selected."""
+        return FreeCAD.ActiveDocument is not None and bool(FreeCADGui.Selection.getSelection())
+
+
+class CreateBillboardCloud:
+    """Command to create a new, empty billboard cloud."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        return {
+            "Pixmap": get_icon_path("AddBillboard.svg"),
+            "MenuText": "Create Billboard Cloud",
+            "ToolTip": "Create one object holding many camera-facing text labels",
+        }
+
+    def Activated(self):
+        """Called when the command is activated."""
+        import BillboardCloud
+        BillboardCloud.create("BillboardCloud")
+
+    def IsActive(self):
+        """Return True if there is an active document."""
+        return FreeCAD.ActiveDocument is not None
+
+
+class ConvertToBillboardCloud:
+    """Command to replace the selected billboards by billboard clouds."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        return {
+            "Pixmap": get_icon_path("Billboard.svg"),
+            "MenuText": "Convert to Billboard Cloud",
+            "ToolTip": "Replace the selected billboards by one cloud per font setup, "
+                       "which saves and opens much faster",
+        }
+
+    def Activated(self):
+        """Called when the command is activated."""
+        import BillboardCloud
+        # Billboards a cloud cannot fully hold are kept, and listed in a warning
+        clouds = BillboardCloud.from_billboards(FreeCADGui.Selection.getSelection())
+        if not clouds:
+            FreeCAD.Console.PrintWarning(
+                "Select text billboards without Anchor or TextTemplate first\n"
+            )
+
+    def IsActive(self):
+        """Return True if there is an active document."""
+        return FreeCAD.ActiveDocument is not None
+
+
+class CreateBillboardStyle:
+    """Command to create a shared style, linking the selected billboards to it."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        return {
+            "Pixmap": get_icon_path("AddBillboard.svg"),
+            "MenuText": "Create Billboard Style",
+            "ToolTip": "Create a shared font, color and frame style; "
+                       "selected billboards are linked to it",
+        }
+
+    def Activated(self):
+        """Called when the command is activated."""
+        import BillboardStyle
+        BillboardStyle.create("BillboardStyle", FreeCADGui.Selection.getSelection())
+
+    def IsActive(self):
+        """Return True if there is an active document."""
+        return FreeCAD.ActiveDocument is not None
+
+
+class EditTextBillboards:
+    """Command to set one property on all selected billboards at once."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        return {
+            "Pixmap": get_icon_path("Billboard.svg"),
+            "MenuText": "Edit Selected Billboards...",
+            "ToolTip": "Set a property on every selected billboard in one undoable step",
+        }
+
+    def Activated(self):
+        """Called when the command is activated."""
+        from PySide import QtGui
+        import BillboardObject
+
+        selected = [
+            obj for obj in FreeCADGui.Selection.getSelection()
+            if BillboardObject.is_billboard(obj)
+        ]
+        if not selected:
+            FreeCAD.Console.PrintWarning("Select one or more text billboards first\n")
+            return
+
+        first = selected[0]
+        names = BillboardObject.editable_properties(first)
+        window = FreeCADGui.getMainWindow()
+        name, ok = QtGui.QInputDialog.getItem(
+            window, "Edit Billboards", f"Property of {len(selected)} billboards:",
+            names, 0, False
+        )
+        if not ok:
+            return
+        value, ok = QtGui.QInputDialog.getText(
+            window, "Edit Billboards", f"{name}:",
+            text=BillboardObject.property_text(first, name)
+        )
+        if not ok:
+            return
+        try:
+            BillboardObject.edit_many(selected, {name: value})
+        except ValueError as e:
+            # Text that does not convert to the property's type
+            FreeCAD.Console.PrintError(f"Could not set {name} to {value!r}: {e}\n")
+
+    def IsActive(self):
+        """Return True if something is selected."""
+        return FreeCAD.ActiveDocument is not None and bool(FreeCADGui.Selection.getSelection())
+
+
+class ImportTextBillboards:
+    """Command to create billboards in bulk from a CSV or JSON file."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        return {
+            "Pixmap": get_icon_path("AddBillboard.svg"),
+            "MenuText": "Import Text Billboards...",
+            "ToolTip": "Create billboards from a CSV, JSON or JSON Lines file",
+        }
+
+    def Activated(self):
+        """Called when the command is activated."""
+        import time
+        from PySide import QtGui
+        import BillboardImport
+
+        path, _filter = QtGui.QFileDialog.getOpenFileName(
+            FreeCADGui.getMainWindow(), "Import Text Billboards", "",
+            "Billboard data (*.csv *.json *.jsonl *.ndjson)"
+        )
+        if not path:
+            return
+
+        start = time.perf_counter()
+        count = BillboardImport.import_file(
+            path, progress=BillboardImport.console_progress
+        )
+        FreeCAD.Console.PrintMessage(
+            f"Imported {count} billboards in {time.perf_counter() - start:.2f} s\n"
+        )
+
+    def IsActive(self):
+        """Return True if there is an active document."""
+        return FreeCAD.ActiveDocument is not None
+
+
+class ExportTextBillboards:
+    """Command to write all billboards to a JSON Lines, CSV or SVG file."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        return {
+            "Pixmap": get_icon_path("Billboard.svg"),
+            "MenuText": "Export Text Billboards...",
+            "ToolTip": "Write billboards to JSON Lines or CSV, or draw them as seen to SVG",
+        }
+
+    def Activated(self):
+        """Called when the command is activated."""
+        import time
+        from PySide import QtGui
+        import BillboardExport
+
+        path, _filter = QtGui.QFileDialog.getSaveFileName(
+            FreeCADGui.getMainWindow(), "Export Text Billboards", "",
+            "JSON Lines (*.jsonl);;CSV (*.csv);;SVG as seen in the 3D view (*.svg)"
+        )
+        if not path:
+            return
+
+        camera = None
+        view = FreeCADGui.ActiveDocument.ActiveView
+        if path.lower().endswith(".svg") and hasattr(view, "getCameraNode"):
+            camera = BillboardExport.camera_from_view(view)
+        start = time.perf_counter()
+        count = BillboardExport.export_file(
+            path, camera=camera, progress=BillboardExport.console_progress
+        )
+        FreeCAD.Console.PrintMessage(
+            f"Exported {count} billboards in {time.perf_counter() - start:.2f} s\n"
+        )
+
+    def IsActive(self):
+        """Return True if there is an active document."""
+        return FreeCAD.ActiveDocument is not None
+
+
+class ToggleBillboardDeclutter:
+    """Command to hide billboards that overlap higher-priority ones on screen."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        import BillboardScreen
+        return {
+            "Pixmap": get_icon_path("Billboard.svg"),
+            "MenuText": "Declutter Billboards",
+            "ToolTip": "Hide labels overlapping a higher-priority label on screen",
+            "Checkable": BillboardScreen.declutter_enabled(),
+        }
+
+    def Activated(self, checked):
+        """Called when the command is toggled."""
+        import BillboardScreen
+        BillboardScreen.set_declutter(checked)
+
+    def IsActive(self):
+        """Always available."""
+        return True
+
+
+class ToggleBillboardCulling:
+    """Command to hide off-screen billboards in one batch per camera change."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        import BillboardScreen
+        return {
+            "Pixmap": get_icon_path("Billboard.svg"),
+            "MenuText": "Cull Off-screen Billboards",
+            "ToolTip": "Skip drawing billboards outside the view, decided once per camera change",
+            "Checkable": BillboardScreen.culling_enabled(),
+        }
+
+    def Activated(self, checked):
+        """Called when the command is toggled."""
+        import BillboardScreen
+        BillboardScreen.set_culling(checked)
+
+    def IsActive(self):
+        """Always available."""
+        return True
+
+
+class ToggleBillboardClustering:
+    """Command to draw distant groups of billboards as one aggregate label."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        import BillboardScreen
+        return {
+            "Pixmap": get_icon_path("Billboard.svg"),
+            "MenuText": "Cluster Distant Billboards",
+            "ToolTip": "Replace groups of labels that are small on screen by one count label",
+            "Checkable": BillboardScreen.clustering_enabled(),
+        }
+
+    def Activated(self, checked):
+        """Called when the command is toggled."""
+        import BillboardScreen
+        BillboardScreen.set_clustering(checked)
+
+    def IsActive(self):
+        """Always available."""
+        return True
+
+
+class ToggleBillboardOverlay:
+    """Command to draw all billboards in an always-on-top overlay layer."""
+
+    def GetResources(self):
+        """Return command resources (icon, menu text, tooltip)."""
+        import BillboardOverlay
+        return {
+            "Pixmap": get_icon_path("Billboard.svg"),
+            "MenuText": "Billboards on Top",
+            "ToolTip": "Draw all labels after the model without depth testing, in one layer",
+            "Checkable": BillboardOverlay.enabled(),
+        }
+
+    def Activated(self, checked):
+        """Called when the command is toggled."""
+        import BillboardOverlay
+        BillboardOverlay.set_enabled(checked)
+
+    def IsActive(self):
+        """Always available."""
+        return True
+
+
 FreeCADGui.addCommand("CreateTextBillboard", CreateTextBillboard())
+FreeCADGui.addCommand("CreateAnchoredBillboards", CreateAnchoredBillboards())
+FreeCADGui.addCommand("CreateBillboardCloud", CreateBillboardCloud())
+FreeCADGui.addCommand("ConvertToBillboardCloud", ConvertToBillboardCloud())
+FreeCADGui.addCommand("CreateBillboardStyle", CreateBillboardStyle())
+FreeCADGui.addCommand("EditTextBillboards", EditTextBillboards())
+FreeCADGui.addCommand("ImportTextBillboards", ImportTextBillboards())
+FreeCADGui.addCommand("ExportTextBillboards", ExportTextBillboards())
+FreeCADGui.addCommand("ToggleBillboardDeclutter", ToggleBillboardDeclutter())
+FreeCADGui.addCommand("ToggleBillboardCulling", ToggleBillboardCulling())
+FreeCADGui.addCommand("ToggleBillboardClustering", ToggleBillboardClustering())
+FreeCADGui.addCommand("ToggleBillboardOverlay", ToggleBillboardOverlay())
@@ -0,0 +1,262 @@
+"""Billboard Export - stream TextBillboards to JSON Lines, CSV or SVG.
+
+Every TextBillboard of a document becomes one record: its name and label,
+world position (X, Y, Z), text and effective style (values of a linked Style
+are resolved, and the style's name is kept in Style). JSON Lines and CSV use
+the keys BillboardImport reads, so an export can be imported again.
+
+Given a camera (a BillboardScreen.CameraSnapshot, e.g. from look_at() or
+camera_from_view()), records also carry their projection: ScreenX and
+ScreenY in pixels from the top left corner, Depth (clip w, <= 0 behind the
+camera), OnScreen and the on-screen text height PixelSize. Positions are
+projected BATCH_SIZE records at a time by BillboardScreen.project, which
+uses numpy when available.
+
+SVG output draws the labels the camera shows as <text> elements, one
+<tspan> per line of text as BillboardMetrics lays it out (wrapped to
+MaxWidth), in a drawing the size of the viewport, ready to be placed on a
+TechDraw page as a symbol. Without a camera, a top view fitting all
+billboards is used.
+
+Records are built and written one batch at a time, so memory use does not
+grow with the number of billboards. Nothing here needs the GUI; exports run
+from FreeCADCmd as well, where BillboardMetrics estimates the text widths
+SVG lines are wrapped to.
+"""
+
+import csv
+import functools
+import json
+import math
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+import FreeCAD
+
+import BillboardImport
+import BillboardMetrics
+import BillboardObject
+import BillboardScreen
+import BillboardStyle
+
+
+BATCH_SIZE = 4096
+
+# Exported properties; those in BillboardStyle.STYLE_PROPERTIES are read
+# from the linked style
+PROPERTIES = (
+    "Text", "FontName", "FontSize", "TextColor", "Alignment", "MaxWidth", "LineSpacing",
+    "ShowBackground", "BackgroundColor", "BackgroundPadding", "ShowFrame", "FrameColor",
+    "FrameWidth", "ScaleMode", "Priority",
+)
+FIELDS = ("Name", "Label", "X", "Y", "Z") + PROPERTIES + ("Style",)
+PROJECTION_FIELDS = ("ScreenX", "ScreenY", "Depth", "OnScreen", "PixelSize")
+
+# (property, read from the style, is a color) for record()
+_READS = tuple(
+    (prop, prop in BillboardStyle.STYLE_PROPERTIES, prop.endswith("Color"))
+    for prop in PROPERTIES
+)
+
+# Side of the square drawing of the default SVG top view, in pixels
+TOP_VIEW_PIXELS = 1000
+
+_TEXT_ANCHORS = {"LEFT": "start", "CENTER": "middle", "RIGHT": "end"}
+
+
+@functools.lru_cache(maxsize=256)
+def _hex(color):
+    """Return "#rrggbb" for a FreeCAD color tuple (few distinct ones per document)."""
+    return "#%02x%02x%02x" % tuple(
+        int(round(min(max(c, 0.0), 1.0) * 255)) for c in color[:3]
+    )
+
+
+def record(obj):
+    """Return the export record of one billboard."""
+    style = BillboardStyle.source(obj)
+    pos = obj.Placement.Base
+    rec = {"Name": obj.Name, "Label": obj.Label, "X": pos.x, "Y": pos.y, "Z": pos.z}
+    for prop, styled, color in _READS:
+        value = getattr(style if styled else obj, prop, None)
+        if color and value is not None:
+            value = _hex(tuple(value))
+        rec[prop] = value
+    rec["Style"] = style.Name if style is not obj else ""
+    return rec
+
+
+def project_records(records, camera):
+    """Add the projection fields for camera to records, projected in one batch."""
+    xs, ys, ws, _kxs, kys = BillboardScreen.project(
+        [(rec["X"], rec["Y"], rec["Z"]) for rec in records], camera
+    )
+    width, height = camera.viewport
+    for rec, x, y, w, ky in zip(records, xs, ys, ws, kys):
+        visible = w > 0.0
+        rec["ScreenX"] = x
+        rec["ScreenY"] = height - y
+        rec["Depth"] = w
+        rec["OnScreen"] = visible and 0.0 <= x <= width and 0.0 <= y <= height
+        if not visible:
+            rec["PixelSize"] = 0.0
+        elif rec["ScaleMode"] == "Screen":
+            rec["PixelSize"] = rec["FontSize"]
+        else:
+            rec["PixelSize"] = rec["FontSize"] * ky
+
+
+def iter_batches(doc=None, camera=None, where=None, batch_size=BATCH_SIZE, progress=None):
+    """Yield lists of at most batch_size records, projected if a camera is given.
+
+    where filters billboards as for BillboardObject.billboards(). progress,
+    if given, is called with the running count after every batch.
+    """
+    objects = BillboardObject.billboards(doc, where)
+    for start in range(0, len(objects), batch_size):
+        records = [record(obj) for obj in objects[start:start + batch_size]]
+        if camera is not None:
+            project_records(records, camera)
+        yield records
+        if progress is not None:
+            progress(start + len(records))
+
+
+def write_jsonl(batches, stream):
+    """Write records as JSON Lines; return how many."""
+    count = 0
+    for records in batches:
+        stream.write("".join(json.dumps(rec) + "\n" for rec in records))
+        count += len(records)
+    return count
+
+
+def write_csv(batches, stream, projected=False):
+    """Write records as CSV with a header row; return how many."""
+    writer = csv.DictWriter(stream, FIELDS + (PROJECTION_FIELDS if projected else ()))
+    writer.writeheader()
+    count = 0
+    for records in batches:
+        writer.writerows(records)
+        count += len(records)
+    return count
+
+
+def write_svg(batches, stream, camera):
+    """Write the labels shown by camera as SVG text; return how many were drawn."""
+    width, height = camera.viewport
+    stream.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">\n'
+    )
+    count = 0
+    for records in batches:
+        shown = [rec for rec in records if rec["OnScreen"] and rec["Text"]]
+        stream.write("".join(_svg_text(rec) for rec in shown))
+        count += len(shown)
+    stream.write("</svg>\n")
+    return count
+
+
+def _svg_text(rec):
+    """Return the <text> element of one projected record."""
+    size = rec["PixelSize"]
+    x = f"{rec['ScreenX']:.2f}"
+    attributes = (
+        f'x="{x}" y="{rec["ScreenY"]:.2f}" font-family={quoteattr(rec["FontName"])} '
+        f'font-size="{size:.2f}" fill="{rec["TextColor"]}"'
+    )
+    anchor = _TEXT_ANCHORS.get(rec["Alignment"], "start")
+    if anchor != "start":
+        attributes += f' text-anchor="{anchor}"'
+    # The lines the billboard shows, from the layout cache its view provider fills
+    lines = BillboardMetrics.layout(
+        rec["FontName"], rec["FontSize"], rec["Text"], rec["MaxWidth"] or 0.0,
+        rec["LineSpacing"] or 1.0, rec["Alignment"],
+    ).lines
+    if len(lines) == 1:
+        return f"<text {attributes}>{escape(lines[0])}</text>\n"
+    step = f"{size * (rec['LineSpacing'] or 1.0):.2f}"
+    spans = "".join(
+        f'<tspan x="{x}" dy="{step if i else 0}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return f"<text {attributes}>{spans}</text>\n"
+
+
+def look_at(eye, target, up=(0.0, 0.0, 1.0), size=(1920, 1080),
+            height_angle=math.pi / 4.0, height=None):
+    """Return a camera at eye looking at target.
+
+    Perspective with height_angle (radians), or orthographic showing height
+    world units vertically if height is given. size is the viewport in pixels.
+    """
+    eye, target, up = FreeCAD.Vector(*eye), FreeCAD.Vector(*target), FreeCAD.Vector(*up)
+    back = (eye - target).normalize()
+    right = up.cross(back).normalize()
+    return BillboardScreen.camera_snapshot(
+        eye, (right, back.cross(right), back), size, height_angle, height
+    )
+
+
+def camera_from_view(view):
+    """Return the camera of a FreeCADGui 3D view as it is currently shown."""
+    camera = view.getCameraNode()
+    eye = FreeCAD.Vector(*camera.position.getValue().getValue())
+    rotation = FreeCAD.Rotation(*camera.orientation.getValue().getValue())
+    # The camera's x, y and z axes in world space
+    axes = [rotation.multVec(FreeCAD.Vector(*axis))
+            for axis in ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))]
+    size = tuple(view.getSize())
+    if view.getCameraType() == "Orthographic":
+        return BillboardScreen.camera_snapshot(
+            eye, axes, size, height=camera.height.getValue()
+        )
+    return BillboardScreen.camera_snapshot(
+        eye, axes, size, height_angle=camera.heightAngle.getValue()
+    )
+
+
+def top_view(doc=None, where=None):
+    """Return an orthographic camera looking down on all billboards of doc."""
+    lo, hi = [math.inf] * 3, [-math.inf] * 3
+    for obj in BillboardObject.billboards(doc, where):
+        pos = obj.Placement.Base
+        for axis, value in enumerate((pos.x, pos.y, pos.z)):
+            lo[axis] = min(lo[axis], value)
+            hi[axis] = max(hi[axis], value)
+    if lo[0] > hi[0]:
+        lo, hi = [0.0] * 3, [0.0] * 3
+    span = max(hi[0] - lo[0], hi[1] - lo[1], 1.0) * 1.1
+    center = [(a + b) / 2.0 for a, b in zip(lo, hi)]
+    eye = (center[0], center[1], hi[2] + span)
+    return look_at(eye, (center[0], center[1], hi[2]), up=(0.0, 1.0, 0.0),
+                   size=(TOP_VIEW_PIXELS, TOP_VIEW_PIXELS), height=span)
+
+
+def export_file(path, doc=None, camera=None, where=None, progress=None) -> int:
+    """Write the billboards of doc to path, choosing the format by extension.
+
+    .jsonl / .ndjson and .csv include the projection fields if a camera is
+    given; .svg draws the labels that camera (by default top_view()) shows.
+    Returns the number of records written (labels drawn for SVG).
+    """
+    doc = doc or FreeCAD.ActiveDocument
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".jsonl", ".ndjson", ".csv", ".svg"):
+        raise ValueError(f"Unsupported billboard file type: {ext}")
+    if ext == ".svg" and camera is None:
+        camera = top_view(doc, where)
+
+    batches = iter_batches(doc, camera, where, progress=progress)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if ext == ".csv":
+            return write_csv(batches, f, projected=camera is not None)
+        if ext == ".svg":
+            return write_svg(batches, f, camera)
+        return write_jsonl(batches, f)
+
+
+# Progress callback printing to the report view and keeping the GUI alive
+console_progress = functools.partial(BillboardImport.console_progress, action="Exported")
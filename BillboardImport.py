@@ -0,0 +1,137 @@
+"""Billboard Import - stream annotation files into TextBillboard objects.
+
+Supported formats:
+
+* CSV with a header row. X, Y, Z columns give the position; other columns
+  are matched to TextBillboard property names (Text, FontSize, TextColor...),
+  and columns matching none are ignored with a warning naming them.
+* JSON Lines (.jsonl, .ndjson), one object per line.
+* JSON (.json), either JSON Lines or a top-level array of objects. Arrays
+  are decoded incrementally, so the file is never loaded as a whole.
+
+JSON objects use property names as keys, with "Position": [x, y, z] or
+X/Y/Z keys for the position. Records are streamed straight into
+BillboardObject.create_many, keeping memory use bounded for large files.
+"""
+
+import csv
+import json
+import os
+
+import FreeCAD
+
+import BillboardObject
+
+
+READ_SIZE = 1 << 16
+
+
+def iter_csv(path):
+    """Yield one record dict per CSV row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def iter_json(path):
+    """Yield records from a JSON Lines file or a top-level JSON array."""
+    with open(path, encoding="utf-8") as f:
+        head = f.read(READ_SIZE)
+        if head.lstrip().startswith("["):
+            yield from _iter_json_array(f, head)
+            return
+
+        # JSON Lines
+        pending = ""
+        while head:
+            lines = (pending + head).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+            head = f.read(READ_SIZE)
+        if pending.strip():
+            yield json.loads(pending)
+
+
+def _iter_json_array(stream, buffer):
+    """Decode the elements of a JSON array one at a time."""
+    decoder = json.JSONDecoder()
+    pos = buffer.index("[") + 1
+    eof = False
+
+    while True:
+        # Skip separators, reading more input when the buffer runs out
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+
+        if pos >= len(buffer):
+            raise ValueError("Unterminated JSON array")
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Element spans the end of the buffer
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        yield item
+        pos = end
+
+
+def iter_records(path):
+    """Yield raw records from path, choosing the reader by file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return iter_csv(path)
+    if ext in (".json", ".jsonl", ".ndjson"):
+        return iter_json(path)
+    raise ValueError(f"Unsupported billboard file type: {ext}")
+
+
+def to_item(record):
+    """Normalize a raw record to a create_many item."""
+    item = {}
+    coords = []
+    for key, value in record.items():
+        if key is None or value is None or value == "":
+            continue
+        name = key.strip()
+        if name.upper() in ("X", "Y", "Z"):
+            coords.append((name.upper(), value))
+        elif name.lower() == "position":
+            item["Position"] = value
+        else:
+            item[name] = value
+    if coords:
+        values = dict(coords)
+        item["Position"] = tuple(float(values.get(axis, 0.0)) for axis in "XYZ")
+    return item
+
+
+def import_file(path, doc=None, chunk_size=500, progress=None) -> int:
+    """Create billboards for every record in path; return how many."""
+    items = (to_item(record) for record in iter_records(path))
+    return BillboardObject.create_many(
+        items, doc=doc, chunk_size=chunk_size, progress=progress
+    )
+
+
+def console_progress(count, action="Imported"):
+    """Progress callback printing to the report view and keeping the GUI alive."""
+    FreeCAD.Console.PrintMessage(f"{action} {count} billboards\n")
+    if FreeCAD.GuiUp:
+        import FreeCADGui
+        FreeCADGui.updateGui()
@@ -0,0 +1,161 @@
+"""Billboard Instrumentation - optional logging, counters and timings.
+
+Disabled by default. When disabled, hot paths only pay for one module
+attribute check (``if BillboardInstrumentation.enabled:``) and timed()
+returns a shared no-op context manager.
+
+From the FreeCAD Python console:
+
+    import BillboardInstrumentation as bi
+    bi.enable(level="debug")
+    ...                      # open a document, orbit the view
+    bi.dump()                # print counters and timings to the report view
+
+enable() and disable() only last for the session. To have instrumentation
+on from start-up, call set_enabled_on_startup(True) once.
+"""
+
+import collections
+import time
+
+import FreeCAD
+
+import BillboardShared
+
+LEVELS = {"error": 0, "warning": 1, "info": 2, "debug": 3}
+
+# Checked directly by hot paths; use enable()/disable() to change
+enabled = BillboardShared.params().GetBool("InstrumentationOnStartup", False)
+level = LEVELS["info"]
+
+_counts = collections.Counter()
+_totals = collections.defaultdict(float)
+_maxima = collections.defaultdict(float)
+
+
+def enable(on=True, level="info"):
+    """Turn instrumentation on (or off) for this session and set the log level."""
+    global enabled
+    _set_level(level)
+    enabled = bool(on)
+
+
+def disable():
+    """Turn instrumentation off for this session, keeping the log level."""
+    global enabled
+    enabled = False
+
+
+def set_enabled_on_startup(on=True):
+    """Store in preferences whether instrumentation is on when FreeCAD starts."""
+    BillboardShared.params().SetBool("InstrumentationOnStartup", bool(on))
+
+
+def _set_level(name):
+    global level
+    if name not in LEVELS:
+        raise ValueError(f"Unknown log level {name!r}, expected one of {list(LEVELS)}")
+    level = LEVELS[name]
+
+
+def log(severity, message):
+    """Write message to the report view if enabled at this severity."""
+    if not enabled or LEVELS[severity] > level:
+        return
+    text = f"Billboard: {message}\n"
+    if severity == "error":
+        FreeCAD.Console.PrintError(text)
+    elif severity == "warning":
+        FreeCAD.Console.PrintWarning(text)
+    elif severity == "info":
+        FreeCAD.Console.PrintMessage(text)
+    else:
+        FreeCAD.Console.PrintLog(text)
+
+
+def count(name, n=1):
+    """Increment the counter name."""
+    if enabled:
+        _counts[name] += n
+
+
+def record(name, seconds):
+    """Add one timed call of name taking seconds."""
+    _counts[name] += 1
+    _totals[name] += seconds
+    if seconds > _maxima[name]:
+        _maxima[name] = seconds
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timed(name):
+    """Return a context manager accumulating the time spent under name."""
+    return _Timer(name) if enabled else _NO_TIMER
+
+
+def stats():
+    """Return {name: {"count", "total_ms", "mean_ms", "max_ms"}}."""
+    result = {}
+    for name, n in _counts.items():
+        total = _totals.get(name)
+        entry = {"count": n}
+        if total is not None:
+            entry["total_ms"] = 1000.0 * total
+            entry["mean_ms"] = 1000.0 * total / n if n else 0.0
+            entry["max_ms"] = 1000.0 * _maxima[name]
+        result[name] = entry
+    return result
+
+
+def summary():
+    """Return the counters and timings as a text table."""
+    lines = [f"{'operation':<32} {'count':>10} {'total ms':>11} {'mean ms':>9} {'max ms':>9}"]
+    for name, entry in sorted(stats().items()):
+        if "total_ms" in entry:
+            lines.append(
+                f"{name:<32} {entry['count']:>10} {entry['total_ms']:>11.2f}"
+                f" {entry['mean_ms']:>9.3f} {entry['max_ms']:>9.3f}"
+            )
+        else:
+            lines.append(f"{name:<32} {entry['count']:>10}")
+    return "\n".join(lines)
+
+
+def dump():
+    """Print summary() to the report view."""
+    FreeCAD.Console.PrintMessage(summary() + "\n")
+
+
+def reset():
+    """Clear all counters and timings."""
+    _counts.clear()
+    _totals.clear()
+    _maxima.clear()
+
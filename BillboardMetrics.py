@@ -0,0 +1,181 @@
+"""Billboard Metrics - measured, cached text extents for billboard layout.
+
+Extents are obtained with an SoGetBoundingBoxAction over a scratch SoText3,
+so they match what Coin actually renders for proportional fonts. Without the
+GUI (e.g. exports from FreeCADCmd), where Coin has no fonts to measure with,
+they are estimated from the font size instead. Results are
+memoized by (font name, font size, text) in a bounded LRU cache; bulk
+relabeling with repeated strings only measures each distinct string once.
+
+layout() breaks text into lines at newlines and, given a maximum width, by
+greedy word wrapping, then measures every line. The resulting lines and
+extents are memoized by text, font and layout settings in a second bounded
+LRU cache, so billboards sharing a description, or redrawn without a text,
+font or width change, are not laid out again.
+"""
+
+import collections
+
+import FreeCAD
+from pivy import coin
+
+
+# Maximum number of memoized (font, size, text) measurements
+MAX_ENTRIES = 4096
+
+# Width per character relative to the font size, used when Coin cannot
+# measure (no GUI, or no font backend available)
+FALLBACK_CHAR_WIDTH = 0.6
+
+TextExtent = collections.namedtuple("TextExtent", "left right bottom top")
+TextExtent.__doc__ = """Extent of left-justified text with its baseline at y=0."""
+
+TextLayout = collections.namedtuple("TextLayout", "lines extents extent")
+TextLayout.__doc__ = """Lines of laid-out text, the TextExtent of each line and
+the extent of the whole block, justified, with the first baseline at y=0."""
+
+_cache = collections.OrderedDict()
+_hits = 0
+_misses = 0
+_layouts = collections.OrderedDict()
+_layout_hits = 0
+_layout_misses = 0
+_scratch = None
+
+
+def measure(font_name, font_size, text):
+    """Return the TextExtent of text, memoized."""
+    global _hits, _misses
+    key = (font_name, font_size, text)
+    extent = _cache.get(key)
+    if extent is not None:
+        _hits += 1
+        _cache.move_to_end(key)
+        return extent
+
+    _misses += 1
+    extent = _measure(font_name, font_size, text)
+    _cache[key] = extent
+    if len(_cache) > MAX_ENTRIES:
+        _cache.popitem(last=False)
+    return extent
+
+
+def layout(font_name, font_size, text, max_width=0.0, spacing=1.0, justification="LEFT"):
+    """Return the TextLayout of text, memoized.
+
+    Lines break at newlines and, if max_width > 0, between words so that no
+    line is wider than max_width unless it is a single word. Baselines are
+    spacing * font_size apart; each line is justified LEFT, CENTER or RIGHT
+    about x=0 like SoText3.
+    """
+    global _layout_hits, _layout_misses
+    key = (font_name, font_size, text, max_width, spacing, justification)
+    result = _layouts.get(key)
+    if result is not None:
+        _layout_hits += 1
+        _layouts.move_to_end(key)
+        return result
+
+    _layout_misses += 1
+    lines = []
+    for paragraph in text.split("\n"):
+        if max_width > 0.0:
+            lines.extend(_wrap(font_name, font_size, paragraph, max_width))
+        else:
+            lines.append(paragraph)
+    extents = [measure(font_name, font_size, line) for line in lines]
+
+    step = spacing * font_size
+    left = right = 0.0
+    for extent in extents:
+        if justification == "RIGHT":
+            shift = -extent.right
+        elif justification == "CENTER":
+            shift = -extent.right / 2
+        else:
+            shift = 0.0
+        left = min(left, extent.left + shift)
+        right = max(right, extent.right + shift)
+    bottom = min(e.bottom - i * step for i, e in enumerate(extents))
+    top = max(e.top - i * step for i, e in enumerate(extents))
+
+    result = TextLayout(tuple(lines), tuple(extents), TextExtent(left, right, bottom, top))
+    _layouts[key] = result
+    if len(_layouts) > MAX_ENTRIES:
+        _layouts.popitem(last=False)
+    return result
+
+
+def _wrap(font_name, font_size, paragraph, max_width):
+    """Greedily break a paragraph into lines at most max_width wide."""
+    space = max(0.0, measure(font_name, font_size, "n n").right
+                - 2 * measure(font_name, font_size, "n").right)
+    lines = []
+    words = []
+    width = 0.0
+    for word in paragraph.split(" "):
+        word_width = measure(font_name, font_size, word).right
+        if words and width + space + word_width > max_width:
+            lines.append(" ".join(words))
+            words, width = [word], word_width
+        else:
+            width = width + space + word_width if words else word_width
+            words.append(word)
+    lines.append(" ".join(words))
+    return lines
+
+
+def cache_info():
+    """Return a dict with cache hits, misses, current sizes and capacity."""
+    return {
+        "hits": _hits,
+        "misses": _misses,
+        "size": len(_cache),
+        "layout_hits": _layout_hits,
+        "layout_misses": _layout_misses,
+        "layouts": len(_layouts),
+        "max_entries": MAX_ENTRIES,
+    }
+
+
+def clear_cache():
+    """Forget all memoized measurements and layouts (e.g. after installing fonts)."""
+    global _hits, _misses, _layout_hits, _layout_misses
+    _cache.clear()
+    _layouts.clear()
+    _hits = _misses = _layout_hits = _layout_misses = 0
+
+
+def _measure(font_name, font_size, text):
+    """Measure text with a bounding box action on reused scratch nodes."""
+    global _scratch
+    if not FreeCAD.GuiUp:
+        return _estimate(font_size, text)
+    if _scratch is None:
+        root = coin.SoSeparator()
+        font = coin.SoFont()
+        text_node = coin.SoText3()
+        text_node.justification = coin.SoText3.LEFT
+        root.addChild(font)
+        root.addChild(text_node)
+        action = coin.SoGetBoundingBoxAction(coin.SbViewportRegion())
+        _scratch = (root, font, text_node, action)
+
+    root, font, text_node, action = _scratch
+    font.name.setValue(font_name)
+    font.size.setValue(font_size)
+    text_node.string.setValue(text)
+    action.apply(root)
+
+    box = action.getBoundingBox()
+    if not text or box.isEmpty():
+        return _estimate(font_size, text)
+    xmin, ymin, _ = box.getMin().getValue()
+    xmax, ymax, _ = box.getMax().getValue()
+    return TextExtent(xmin, xmax, ymin, ymax)
+
+
+def _estimate(font_size, text):
+    """Fixed-pitch estimate used when no real measurement is possible."""
+    return TextExtent(0.0, len(text) * font_size * FALLBACK_CHAR_WIDTH, 0.0, font_size)
@@ -1,8 +1,20 @@
 """Billboard Object - FeaturePython data model for text billboards."""
 
+import collections
+import contextlib
+import time
+
 import FreeCAD
 
 
+RENDER_MODES = ["Polygon", "Texture"]
+LOD_FALLBACKS = ["Marker", "Hide"]
+SCALE_MODES = ["World", "Screen"]
+
+EditResult = collections.namedtuple("EditResult", "count seconds")
+EditResult.__doc__ = """Number of billboards edited by edit_many() and the time it took."""
+
+
 class TextBillboard:
     """A text billboard that always faces the camera."""
 
@@ -59,7 +71,7 @@ class TextBillboard:
 
         obj.addProperty(
             "App::PropertyFloat", "BackgroundPadding", "Background",
-            "Padding around text in pixels"
+            "Padding around text, in the same units as FontSize"
         ).BackgroundPadding = 5.0
 
         # Frame settings
@@ -78,13 +90,104 @@ class TextBillboard:
             "Frame line width in pixels"
         ).FrameWidth = 1.0
 
+        self._ensure_properties(obj)
+
+    def _ensure_properties(self, obj):
+        """Add properties introduced after 0.1.0 that obj does not have yet."""
+        if "RenderMode" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyEnumeration", "RenderMode", "Billboard",
+                "Polygon: tessellated 3D text, Texture: quads from a shared glyph atlas"
+            )
+            obj.RenderMode = RENDER_MODES
+            obj.RenderMode = "Polygon"
+
+        if "Priority" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyInteger", "Priority", "Declutter",
+                "Labels with higher priority win when decluttering overlapping labels"
+            ).Priority = 0
+
+        if "LodMinPixelHeight" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyFloat", "LodMinPixelHeight", "Level of Detail",
+                "Below this on-screen text height in pixels, use LodFallback (0 = always full)"
+            ).LodMinPixelHeight = 0.0
+            obj.addProperty(
+                "App::PropertyEnumeration", "LodFallback", "Level of Detail",
+                "What to draw instead of the text when it is too small"
+            )
+            obj.LodFallback = LOD_FALLBACKS
+            obj.LodFallback = "Marker"
+
+        if "Style" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyLink", "Style", "Billboard",
+                "Shared BillboardStyle; overrides font, colors and frame width when set"
+            )
+
+        if "ScaleMode" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyEnumeration", "ScaleMode", "Billboard",
+                "World: FontSize and BackgroundPadding in model units, "
+                "Screen: in pixels, constant size on screen"
+            )
+            obj.ScaleMode = SCALE_MODES
+            obj.ScaleMode = "World"
+
+        if "Anchor" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyLinkSub", "Anchor", "Anchor",
+                "Object, vertex, edge or face the billboard follows; "
+                "Placement is then kept at that point plus AnchorOffset"
+            )
+            obj.addProperty(
+                "App::PropertyVector", "AnchorOffset", "Anchor",
+                "Offset from the anchor point"
+            )
+
+        if "MaxWidth" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyFloat", "MaxWidth", "Font",
+                "Wrap lines at word boundaries beyond this width, "
+                "in the same units as FontSize (0 = no wrapping)"
+            ).MaxWidth = 0.0
+            obj.addProperty(
+                "App::PropertyFloat", "LineSpacing", "Font",
+                "Distance between lines relative to FontSize"
+            ).LineSpacing = 1.0
+
+        if "TextTemplate" not in obj.PropertiesList:
+            obj.addProperty(
+                "App::PropertyString", "TextTemplate", "Billboard",
+                "Text computed from object properties, e.g. 'Mass: {Body.Mass:.2f}'; "
+                "overrides Text when set"
+            )
+
+    def onDocumentRestored(self, obj):
+        """Called after the object has been restored from a file."""
+        self._ensure_properties(obj)
+        if obj.Anchor:
+            import BillboardAnchor
+            BillboardAnchor.link(obj)
+        if obj.TextTemplate:
+            import BillboardTemplate
+            BillboardTemplate.link(obj)
+
     def execute(self, obj):
         """Called when the object needs to be recomputed."""
         pass
 
     def onChanged(self, obj, prop):
         """Called when a property changes."""
-        pass
+        if "Restore" in getattr(obj, "State", ()):
+            return
+        if prop in ("Anchor", "AnchorOffset"):
+            import BillboardAnchor
+            BillboardAnchor.link(obj)
+        elif prop == "TextTemplate":
+            import BillboardTemplate
+            BillboardTemplate.link(obj)
 
     def dumps(self):
         """Serialize for saving."""
@@ -96,19 +199,222 @@ class TextBillboard:
             self.Type = state.get("Type", "TextBillboard")
 
 
+def _make(doc, name):
+    """Add a TextBillboard (and its view provider, if the GUI is up) to doc."""
+    obj = doc.addObject("App::FeaturePython", name)
+    TextBillboard(obj)
+
+    # Add view provider if GUI is available
+    if FreeCAD.GuiUp:
+        import BillboardViewProvider
+        BillboardViewProvider.ViewProviderTextBillboard(obj.ViewObject)
+    return obj
+
+
 def create(name: str = "TextBillboard") -> "FreeCAD.DocumentObject":
     """Create a new TextBillboard object in the active document."""
     if FreeCAD.ActiveDocument is None:
         FreeCAD.Console.PrintError("No active document\n")
         return None
 
-    obj = FreeCAD.ActiveDocument.addObject("App::FeaturePython", name)
-    TextBillboard(obj)
+    obj = _make(FreeCAD.ActiveDocument, name)
+    FreeCAD.ActiveDocument.recompute()
+    return obj
+
+
+def create_many(items, doc=None, name="TextBillboard", chunk_size=500,
+                progress=None) -> int:
+    """Create one TextBillboard per item inside a single transaction.
+
+    Each item is a mapping of property names to values; "Position" may be
+    given as an (x, y, z) shorthand for Placement.Base, and string values
+    are converted to the property's type. items may be any iterable,
+    including a generator streaming from a file: nothing is kept beyond the
+    current item, and the document is recomputed once at the end.
+
+    progress, if given, is called with the running count after every
+    chunk_size objects. Returns the number of billboards created. Keys that
+    are not TextBillboard properties are ignored, and listed in one warning
+    at the end.
+    """
+    doc = doc or FreeCAD.ActiveDocument
+    if doc is None:
+        FreeCAD.Console.PrintError("No active document\n")
+        return 0
+
+    count = 0
+    known = {"Position": True}  # key -> is a property, checked once per call
+    unknown = []
+    doc.openTransaction("Create billboards")
+    try:
+        for item in items:
+            obj = _make(doc, name)
+            for key, value in item.items():
+                valid = known.get(key)
+                if valid is None:
+                    valid = known[key] = key in obj.PropertiesList
+                    if not valid:
+                        unknown.append(key)
+                if valid:
+                    _set_property(obj, key, value)
+            count += 1
+            if progress is not None and count % chunk_size == 0:
+                progress(count)
+    except Exception:
+        doc.abortTransaction()
+        raise
+    doc.commitTransaction()
+
+    if unknown:
+        FreeCAD.Console.PrintWarning(
+            f"Ignored keys that are not TextBillboard properties: {', '.join(sorted(unknown))}\n"
+        )
+    if progress is not None and count % chunk_size:
+        progress(count)
+    doc.recompute()
+    return count
+
+
+def is_billboard(obj):
+    """Return True if obj is a TextBillboard."""
+    return getattr(getattr(obj, "Proxy", None), "Type", None) == "TextBillboard"
+
+
+def billboards(doc=None, where=None):
+    """Return the TextBillboards of doc, optionally filtered by a predicate.
+
+    where is called with each billboard, e.g.
+    ``billboards(where=lambda obj: obj.Text.startswith("P"))``.
+    """
+    doc = doc or FreeCAD.ActiveDocument
+    if doc is None:
+        return []
+    return [
+        obj for obj in doc.Objects
+        if is_billboard(obj) and (where is None or where(obj))
+    ]
+
+
+def edit_many(targets, values, doc=None) -> EditResult:
+    """Apply property values to many billboards in a single transaction.
+
+    targets is an iterable of objects (e.g. the selection; other objects are
+    skipped) or a predicate selecting billboards of doc, as for billboards().
+    values maps property names to values, converted like create_many()
+    items. Visual updates are deferred to one batch at the end, so the
+    scene is notified once per billboard and redrawn once.
+
+    Returns an EditResult with the number of billboards edited and the
+    elapsed time in seconds, which is also printed to the console. Raises
+    ValueError, before editing anything, if a name in values is not a
+    TextBillboard property.
+    """
+    start = time.perf_counter()
+    if callable(targets):
+        targets = billboards(doc, targets)
+    targets = [obj for obj in targets if is_billboard(obj)]
+    if not targets:
+        return EditResult(0, time.perf_counter() - start)
+    unknown = sorted(
+        key for key in values
+        if key != "Position" and key not in targets[0].PropertiesList
+    )
+    if unknown:
+        raise ValueError(f"Not TextBillboard properties: {', '.join(unknown)}")
 
-    # Add view provider if GUI is available
     if FreeCAD.GuiUp:
         import BillboardViewProvider
-        BillboardViewProvider.ViewProviderTextBillboard(obj.ViewObject)
+        deferred = BillboardViewProvider.batch()
+    else:
+        deferred = contextlib.nullcontext()
 
-    FreeCAD.ActiveDocument.recompute()
-    return obj
+    doc = targets[0].Document
+    doc.openTransaction("Edit billboards")
+    try:
+        with deferred:
+            for obj in targets:
+                for key, value in values.items():
+                    _set_property(obj, key, value)
+    except Exception:
+        doc.abortTransaction()
+        raise
+    doc.commitTransaction()
+
+    result = EditResult(len(targets), time.perf_counter() - start)
+    FreeCAD.Console.PrintMessage(
+        f"Edited {result.count} billboards in {result.seconds * 1000.0:.1f} ms\n"
+    )
+    return result
+
+
+def editable_properties(obj):
+    """Return the names of obj's properties that can be edited as text."""
+    return sorted(
+        name for name in obj.PropertiesList
+        if obj.getGroupOfProperty(name) not in ("", "Base")
+        and obj.getTypeIdOfProperty(name) in _TEXT_TYPES
+    )
+
+
+def property_text(obj, name):
+    """Return a property value as text that _coerce() reads back."""
+    value = getattr(obj, name)
+    type_id = obj.getTypeIdOfProperty(name)
+    if type_id == "App::PropertyColor":  # as "r,g,b"
+        return ",".join(f"{c:g}" for c in value[:3])
+    if type_id == "App::PropertyVector":  # as "x,y,z"
+        return ",".join(str(c) for c in (value.x, value.y, value.z))
+    return str(value)
+
+
+def _set_property(obj, key, value):
+    """Assign one item value to obj, converting strings where needed."""
+    if key == "Position":
+        placement = obj.Placement
+        placement.Base = FreeCAD.Vector(*_coerce("App::PropertyVector", value))
+        obj.Placement = placement
+        return
+    if key not in obj.PropertiesList:
+        return
+    type_id = obj.getTypeIdOfProperty(key)
+    if type_id == "App::PropertyLink" and isinstance(value, str):
+        # Links (e.g. Style) are given by object name
+        value = obj.Document.getObject(value.strip())
+    elif type_id == "App::PropertyLinkSub" and isinstance(value, str):
+        # Sub-element links (e.g. Anchor) as "Name" or "Name.Face3"
+        name, _dot, sub = value.strip().partition(".")
+        target = obj.Document.getObject(name)
+        value = (target, [sub] if sub else []) if target is not None else None
+    setattr(obj, key, _coerce(type_id, value))
+
+
+# Property types whose values _coerce() converts from text
+_TEXT_TYPES = (
+    "App::PropertyString",
+    "App::PropertyEnumeration",
+    "App::PropertyFloat",
+    "App::PropertyInteger",
+    "App::PropertyBool",
+    "App::PropertyColor",
+    "App::PropertyVector",
+)
+
+
+def _coerce(type_id, value):
+    """Convert a string (e.g. from CSV) to the value type of a property."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if type_id == "App::PropertyFloat":
+        return float(text)
+    if type_id == "App::PropertyInteger":
+        return int(text)
+    if type_id == "App::PropertyBool":
+        return text.lower() in ("1", "true", "yes", "on")
+    if type_id == "App::PropertyColor":
+        if text.startswith("#"):
+            return tuple(int(text[i:i + 2], 16) / 255.0 for i in (1, 3, 5))
+        return tuple(float(c) for c in text.split(","))
+    if type_id == "App::PropertyVector":
+        return tuple(float(c) for c in text.split(","))
+    return value
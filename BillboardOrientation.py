@@ -0,0 +1,316 @@
+"""Billboard Orientation - shared camera-facing rotation for all billboards.
+
+Instead of every billboard running its own Python render callback, one
+ViewOrientation is installed at the top of each 3D view's scene graph. It
+computes the inverse view rotation once per frame, and every billboard
+inserts the same shared SoMatrixTransform node, so the per-frame Python cost
+does not grow with the number of billboards.
+
+Several 3D views of one document share its scene graph, so the shared node
+can only hold one view's rotation at a time. Each ViewOrientation keeps its
+own rotation (and screen scale), and writes it into the shared node at the
+start of its render only if the node holds another view's values or the
+camera moved. These writes are made with notification disabled: they are
+read by the render that is already running, while the other views are
+neither scheduled for a redraw nor have their caches invalidated. No render
+cache may therefore hold a node written this way: every billboard and cloud
+root starts with the shared cache_guard() node, an SoCallback without a
+callback, which Coin treats as uncacheable and so invalidates every cache
+open above it (FreeCAD's object root and mode switch, the document's
+separators). The text below the shared node caches as usual. Ray picks
+(preselection) in a view write its rotation the same way, so billboards are
+picked as that view shows them. The results of the screen passes (culled,
+decluttered or reduced labels) are kept per view by BillboardScreen and
+shown the same way at the start of each render and pick.
+
+Billboards with ScaleMode "Screen" insert a second shared node that also
+carries the view's world units per pixel, 2 / (P[1][1] * viewport height).
+It is computed once per view when the camera changes and is exact for
+orthographic cameras; for perspective cameras it is the scale at unit
+distance, and BillboardScreen multiplies in each billboard's depth in that
+view, written by this callback in the same way before the billboards render
+and kept per view like the other screen results.
+
+get_counters() reports frames rendered vs. rotation writes, so an idle view
+can be checked to do no work.
+"""
+
+import FreeCAD
+import FreeCADGui
+from pivy import coin
+
+import BillboardInstrumentation
+import BillboardOverlay
+import BillboardScreen
+
+
+# Node inserted by every billboard; the per-view render callbacks write into it
+_shared_rotation = None
+
+# The same for ScaleMode "Screen" billboards: rotation times the view's world
+# units per pixel. Created on first use, so views without such billboards
+# never compute the scale.
+_shared_screen_rotation = None
+
+# Inserted first by every billboard and cloud root to keep caches above it off
+_cache_guard = None
+
+# ViewOrientation whose values the shared nodes currently hold
+_applied = None
+_applied_screen = None
+
+# SbMatrix reused for every write
+_matrix = None
+
+_counters = {"frames": 0, "writes": 0}
+
+# ViewOrientation instances for the currently open 3D views
+_providers = []
+
+_install_sensor = None
+_mdi_watched = False
+
+
+class ViewOrientation:
+    """Per-view provider of the camera-facing billboard rotation."""
+
+    def __init__(self, scene_root, document=None):
+        """Insert the render callback at the top of the given scene graph."""
+        self.scene_root = scene_root
+        self.document = document
+        self._snapshot = None
+
+        # This view's inverse view rotation as preallocated 4x4 rows, compared
+        # and updated in place, and its world units per pixel
+        self._rows = [
+            [1.0, 0.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+        self._scale = None
+
+        def make_render_callback(provider):
+            def callback(user_data, action):
+                if action.isOfType(coin.SoGLRenderAction.getClassTypeId()):
+                    if BillboardInstrumentation.enabled:
+                        with BillboardInstrumentation.timed("render_callback"):
+                            provider._update_from_action(action)
+                    else:
+                        provider._update_from_action(action)
+                elif action.isOfType(coin.SoRayPickAction.getClassTypeId()):
+                    # Picks in this view must see its rotation, not that of
+                    # the view rendered last
+                    provider._apply(action.getState())
+            return callback
+
+        self._render_callback = make_render_callback(self)
+        self.callback_node = coin.SoCallback()
+        self.callback_node.setName("BillboardOrientation")
+        self.callback_node.setCallback(self._render_callback)
+        scene_root.insertChild(self.callback_node, 0)
+
+    def _update_from_action(self, action):
+        """Apply this view's rotation for the current render and run screen passes."""
+        state = action.getState()
+        _counters["frames"] += 1
+        self._apply(state)
+
+        # Screen-space passes only run when the camera actually changed
+        if BillboardScreen.active():
+            snapshot = BillboardScreen.snapshot_from_state(state)
+            # Needed by this frame, unlike the passes run after it
+            BillboardScreen.scale_depths(self.document, snapshot, self)
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                BillboardScreen.camera_changed(self.document, snapshot, self)
+
+    def _apply(self, state):
+        """Write this view's rotation (and scale) into the shared nodes if needed."""
+        global _applied, _applied_screen
+        BillboardScreen.show_view(self.document, self)
+        # The viewing matrix transforms world to camera space
+        # We want the inverse rotation to cancel it out
+        rotated = self._update_rotation(coin.SoViewingMatrixElement.get(state).getValue())
+        if rotated or _applied is not self:
+            _write_silently(get_shared_rotation().matrix, self._rows)
+            _applied = self
+
+        if _shared_screen_rotation is not None:
+            scaled = self._update_scale(state)
+            if rotated or scaled or _applied_screen is not self:
+                scale = self._scale
+                rows = [[v * scale for v in row[:3]] + [0.0] for row in self._rows[:3]]
+                rows.append([0.0, 0.0, 0.0, 1.0])
+                _write_silently(_shared_screen_rotation.matrix, rows)
+                _applied_screen = self
+
+    def _update_rotation(self, m):
+        """Store the inverse rotation of viewing matrix m; return True if it changed."""
+        # Extract rotation (upper-left 3x3) and transpose (inverse for orthogonal matrix)
+        m0, m1, m2 = m[0], m[1], m[2]
+        r0, r1, r2 = self._rows[0], self._rows[1], self._rows[2]
+        if (r0[0] == m0[0] and r0[1] == m1[0] and r0[2] == m2[0]
+                and r1[0] == m0[1] and r1[1] == m1[1] and r1[2] == m2[1]
+                and r2[0] == m0[2] and r2[1] == m1[2] and r2[2] == m2[2]):
+            return False
+        r0[0], r0[1], r0[2] = m0[0], m1[0], m2[0]
+        r1[0], r1[1], r1[2] = m0[1], m1[1], m2[1]
+        r2[0], r2[1], r2[2] = m0[2], m1[2], m2[2]
+        return True
+
+    def _update_scale(self, state):
+        """Store this view's world units per pixel; return True if it changed."""
+        p11 = coin.SoProjectionMatrixElement.get(state).getValue()[1][1]
+        height = coin.SoViewportRegionElement.get(state).getViewportSizePixels()[1]
+        scale = 2.0 / (p11 * height) if p11 and height else 1.0
+        if scale == self._scale:
+            return False
+        self._scale = scale
+        return True
+
+    def is_installed_in(self, scene_root):
+        """Return True if this provider's callback is a child of scene_root."""
+        return scene_root.findChild(self.callback_node) >= 0
+
+    def remove(self):
+        """Remove the render callback from the view's scene graph."""
+        index = self.scene_root.findChild(self.callback_node)
+        if index >= 0:
+            self.scene_root.removeChild(index)
+
+
+def _write_silently(field, rows):
+    """Set a matrix field without notifying the scene (and so the other views)."""
+    global _matrix
+    if _matrix is None:
+        _matrix = coin.SbMatrix()
+    _matrix.setValue(rows)
+    notify = field.enableNotify(False)
+    field.setValue(_matrix)
+    field.enableNotify(notify)
+    _counters["writes"] += 1
+
+
+def get_counters():
+    """Return how many frames were rendered and how often the rotation was written."""
+    return dict(_counters)
+
+
+def reset_counters():
+    """Reset the frame and write counters to zero."""
+    for key in _counters:
+        _counters[key] = 0
+
+
+def get_shared_rotation():
+    """Return the SoMatrixTransform all billboards insert."""
+    global _shared_rotation
+    if _shared_rotation is None:
+        _shared_rotation = coin.SoMatrixTransform()
+    return _shared_rotation
+
+
+def get_screen_rotation():
+    """Return the SoMatrixTransform ScaleMode "Screen" billboards insert."""
+    global _shared_screen_rotation, _applied_screen
+    if _shared_screen_rotation is None:
+        _shared_screen_rotation = coin.SoMatrixTransform()
+        _applied_screen = None
+    return _shared_screen_rotation
+
+
+def cache_guard():
+    """Return the node that keeps the render caches above it from being used.
+
+    Coin invalidates the caches open while traversing an SoCallback, whether
+    or not it has a callback function, since it cannot tell what it draws.
+    """
+    global _cache_guard
+    if _cache_guard is None:
+        _cache_guard = coin.SoCallback()
+        _cache_guard.setName("BillboardCacheGuard")
+    return _cache_guard
+
+
+def rotation_node(screen=False):
+    """Return the shared camera-facing node for a billboard to insert.
+
+    With screen=True it is the orientation scaled to pixels. Makes sure the
+    open 3D views get their render callbacks.
+    """
+    schedule_install()
+    return get_screen_rotation() if screen else get_shared_rotation()
+
+
+def _view_scene_roots():
+    """Return (scene graph root, document name) for all open 3D views."""
+    roots = []
+    for doc in FreeCAD.listDocuments().values():
+        gui_doc = FreeCADGui.getDocument(doc.Name)
+        if gui_doc is None:
+            continue
+        for view in gui_doc.mdiViewsOfType("Gui::View3DInventor"):
+            roots.append((view.getSceneGraph(), doc.Name))
+    return roots
+
+
+def install():
+    """Install a ViewOrientation (and overlay layer) in every open 3D view that lacks one."""
+    roots = _view_scene_roots()
+
+    global _applied, _applied_screen
+    # Drop providers whose view has been closed
+    kept = [p for p in _providers if any(p.is_installed_in(r) for r, _doc in roots)]
+    for provider in _providers:
+        if provider not in kept:
+            BillboardScreen.forget_view(provider)
+    _providers[:] = kept
+    if _applied not in _providers:
+        _applied = None
+    if _applied_screen not in _providers:
+        _applied_screen = None
+
+    for root, document in roots:
+        if not any(p.is_installed_in(root) for p in _providers):
+            _providers.append(ViewOrientation(root, document))
+
+    # New views also need the overlay layers of their documents
+    BillboardOverlay.install(roots)
+    _watch_mdi_area()
+
+
+def view_orientation(scene_root):
+    """Return the ViewOrientation installed in a 3D view's scene graph, or None."""
+    for provider in _providers:
+        if provider.is_installed_in(scene_root):
+            return provider
+    return None
+
+
+def schedule_install():
+    """Run install() once the event loop is idle.
+
+    Billboards are attached while a document is restored, before its views
+    exist, so installation is deferred to a one-shot sensor.
+    """
+    global _install_sensor
+    if _install_sensor is None:
+        _install_sensor = coin.SoOneShotSensor(lambda data, sensor: install(), None)
+    if not _install_sensor.isScheduled():
+        _install_sensor.schedule()
+
+
+def _watch_mdi_area():
+    """Re-run install() whenever an MDI window is activated (e.g. a new view)."""
+    global _mdi_watched
+    if _mdi_watched:
+        return
+    try:
+        from PySide import QtGui
+        mdi = FreeCADGui.getMainWindow().findChild(QtGui.QMdiArea)
+    except Exception:
+        return
+    if mdi is not None:
+        mdi.subWindowActivated.connect(lambda window: schedule_install())
+        _mdi_watched = True
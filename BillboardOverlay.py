@@ -0,0 +1,141 @@
+"""Billboard Overlay - billboards drawn on top of the model in one layer.
+
+By default every billboard is part of the document's scene graph: it is
+depth-tested against the model, so labels disappear inside parts, and every
+semi-transparent background is one more shape the viewer's sorted
+transparency collects, depth-sorts and renders separately each frame.
+
+With the overlay enabled, the visuals of all billboards of a document move
+into one SoAnnotation layer added to the scene graph of each of its 3D
+views. Coin renders an annotation after the rest of the scene with depth
+testing off, as one delayed traversal in which transparent shapes are
+blended in scene order instead of being sorted. Labels stay visible in
+front of the model, and the frame no longer sorts one shape per label.
+
+Each billboard keeps its invisible pick quad (see PICK_PROXIES in
+BillboardViewProvider) in its own root, so selection and preselection work
+as before. Those picks are still depth-tested: where a part lies in front of
+a label, the part is picked. Without pick proxies, billboards in the overlay
+are not pickable.
+"""
+
+import weakref
+
+from pivy import coin
+
+import BillboardShared
+
+_billboards = weakref.WeakSet()  # built view providers
+_layers = {}  # document name -> SoAnnotation holding its billboards
+_members = {}  # document name -> (billboard nodes in layer order, {node: position})
+_pick_style = None
+_enabled = None
+
+
+def enabled():
+    """Return True if billboards are drawn in the overlay layer."""
+    global _enabled
+    if _enabled is None:
+        _enabled = BillboardShared.params().GetBool("Overlay", False)
+    return _enabled
+
+
+def set_enabled(flag):
+    """Move all billboards into or out of the overlay and store the choice in preferences."""
+    global _enabled
+    _enabled = bool(flag)
+    BillboardShared.params().SetBool("Overlay", _enabled)
+    if not _enabled:
+        # Empty the layers at once instead of removing billboards one by one
+        for annotation in _layers.values():
+            annotation.removeAllChildren()
+            annotation.addChild(_pick_style)
+        _members.clear()
+    for vp in list(_billboards):
+        vp._set_overlay(_enabled)
+
+
+def register(vp):
+    """Track a built billboard and move it into the overlay if enabled."""
+    _billboards.add(vp)
+    if enabled():
+        vp._set_overlay(True)
+
+
+def unregister(vp):
+    """Stop tracking a billboard being deleted and drop it from its layer."""
+    _billboards.discard(vp)
+    if getattr(vp, "overlay_sep", None) is not None:
+        vp._set_overlay(False)
+
+
+def layer(document):
+    """Return the overlay layer of a document, added to all its 3D views."""
+    global _pick_style
+    import FreeCADGui
+
+    annotation = _layers.get(document)
+    if annotation is not None:
+        return annotation
+    if _pick_style is None:
+        # Billboards are picked by the quads left in their roots
+        _pick_style = coin.SoPickStyle()
+        _pick_style.style = coin.SoPickStyle.UNPICKABLE
+    annotation = coin.SoAnnotation()
+    annotation.setName("BillboardOverlay")
+    # Never cache: the billboards inside read the per-view rotation
+    annotation.renderCaching = coin.SoSeparator.OFF
+    annotation.addChild(_pick_style)
+    _layers[document] = annotation
+
+    # Views opened later get the layer from BillboardOrientation.install()
+    gui_document = FreeCADGui.getDocument(document)
+    if gui_document is not None:
+        install([(view.getSceneGraph(), document)
+                 for view in gui_document.mdiViewsOfType("Gui::View3DInventor")])
+    return annotation
+
+
+def install(roots):
+    """Add the existing layers to the given (scene graph root, document) pairs."""
+    for root, document in roots:
+        annotation = _layers.get(document)
+        if annotation is not None and root.findChild(annotation) < 0:
+            root.addChild(annotation)
+
+
+def add(document, node):
+    """Draw a billboard's node (not yet in the layer) in the document's overlay."""
+    nodes, positions = _members.setdefault(document, ([], {}))
+    positions[node] = len(nodes)
+    nodes.append(node)
+    layer(document).addChild(node)
+
+
+def remove(document, node):
+    """Stop drawing a billboard's node in the document's overlay.
+
+    The layer's last billboard moves into the gap, so hiding or deleting
+    many billboards never searches the layer or shifts its children.
+    """
+    nodes, positions = _members.get(document, ((), {}))
+    position = positions.pop(node, None)
+    if position is None:
+        return
+    annotation = _layers[document]
+    last = nodes.pop()
+    if last is not node:
+        nodes[position] = last
+        positions[last] = position
+        # Child 0 is the pick style
+        annotation.replaceChild(position + 1, last)
+    annotation.removeChild(annotation.getNumChildren() - 1)
+
+
+def forget_document(document):
+    """Drop the layer of a document being closed."""
+    _layers.pop(document, None)
+    _members.pop(document, None)
+
+
+BillboardShared.on_close(forget_document)
@@ -0,0 +1,626 @@
+"""Billboard Screen - screen-space passes run once per camera change.
+
+The per-view orientation callback hands a camera snapshot to this module
+whenever the view, projection or viewport actually changes. A one-shot
+sensor then runs the enabled passes after the frame:
+
+Anchors (Placement.Base) of all billboards of the document are projected to
+pixel rectangles in one batch, which every pass then shares:
+
+* cluster - with clustering enabled, groups of billboards that are small
+  on screen are replaced by one aggregate label (see BillboardCluster).
+* cull - billboards whose rectangle is off screen or behind the camera are
+  hidden, instead of Coin traversing every billboard subgraph to cull it.
+* level of detail - below a billboard's LodMinPixelHeight its text is
+  swapped for a point marker or hidden, skipping background and frame.
+* declutter - the remaining labels are binned into a screen-space grid and
+  greedily placed by Priority; labels overlapping an already placed,
+  higher-priority label are hidden.
+
+Billboards with ScaleMode "Screen" get their depth (clip w) as an extra
+scale factor, so they keep their pixel size under a perspective camera.
+Since that is needed by the frame being drawn, scale_depths() is called by
+the orientation callback itself, before the billboards render: it projects
+only those billboards and writes their depths without notification, so no
+second redraw is scheduled. With an orthographic camera the depth is always
+1 and nothing is written.
+
+Anchor, priority and bounds arrays are cached per document and only rebuilt
+when a billboard is added, removed, moved, resized or reprioritized. Each
+document also has a generation number that only adding, removing or moving
+a billboard changes, so the clustering tree outlives the other rebuilds.
+
+Several 3D views of one document share its billboards' nodes, while each
+view has its own camera. Snapshots and clustering cuts are therefore kept
+per view, and once a document has more than one view, each view's pass
+results (which billboards are hidden, and why, which show their marker, and
+the depth scales of ScaleMode "Screen" billboards) are recorded after its
+passes. show_view() is called at the start of every
+render and pick: if another view's results are shown, it rewrites the
+billboards whose results differ, without notification, like
+BillboardOrientation does for the shared rotation. With one view nothing is
+recorded or rewritten.
+"""
+
+import collections
+import itertools
+import math
+import weakref
+
+from pivy import coin
+
+import BillboardCluster
+import BillboardInstrumentation
+import BillboardShared
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - FreeCAD ships numpy
+    numpy = None
+
+
+# Grid cell size in pixels for the overlap index
+GRID_CELL = 64
+
+CameraSnapshot = collections.namedtuple("CameraSnapshot", "view projection viewport")
+CameraSnapshot.__doc__ = """Viewing and projection matrices (4x4 tuples) and viewport size in pixels."""
+
+ScreenBoxes = collections.namedtuple("ScreenBoxes", "x0 y0 x1 y1 on_screen pixel_height depth")
+ScreenBoxes.__doc__ = """Per-billboard pixel rectangles, visibility, font height in pixels and clip w."""
+
+_billboards = weakref.WeakSet()
+_anchor_cache = {}  # document name -> _AnchorSet
+_generations = {}  # document name -> generation of its anchor positions
+_generation_counter = itertools.count()
+_pending = {}  # (document name, view) -> CameraSnapshot
+_last_snapshot = {}  # document name -> {view: CameraSnapshot}
+_results = {}  # (document name, view) -> _ViewResults
+_scaled_for = {}  # (document name, view) -> (_AnchorSet, CameraSnapshot) depths are for
+_shown = {}  # document name -> view whose results its billboards show
+_lod_billboards = weakref.WeakSet()
+_scaled_billboards = weakref.WeakSet()
+_pass_sensor = None
+_declutter = None
+_culling = None
+_clustering = None
+
+
+class _AnchorSet:
+    """Cached per-document arrays used by the screen passes."""
+
+    def __init__(self, billboards, generation):
+        # Changes only when billboards are added, removed or moved
+        self.generation = generation
+        # Highest priority first; placement is greedy in this order
+        ordered = sorted(billboards, key=lambda vp: -vp.screen_priority())
+        self.billboards = ordered
+        self.positions = [vp.screen_anchor() for vp in ordered]
+        self.bounds = [vp.bounds for vp in ordered]
+        self.font_sizes = [vp.screen_font_size() for vp in ordered]
+        self.lod = [vp.screen_lod() for vp in ordered]
+        self.scaled = [vp in _scaled_billboards for vp in ordered]
+        # ScaleMode "Screen" billboards, depth-scaled on every camera change
+        self.scaled_billboards = [vp for vp in ordered if vp in _scaled_billboards]
+        self.scaled_positions = [vp.screen_anchor() for vp in self.scaled_billboards]
+
+
+class _ViewResults:
+    """Pass results of one view, shown again when it renders."""
+
+    __slots__ = ("hidden", "markers", "depths")
+
+    def __init__(self, billboards=()):
+        self.hidden = {}  # view provider -> reasons it is hidden for
+        self.markers = set()  # view providers drawn as their LOD marker
+        self.depths = {}  # view provider -> depth scale (ScaleMode "Screen")
+        for vp in billboards:
+            hidden, marker, depth = vp.screen_results()
+            if hidden:
+                self.hidden[vp] = hidden
+            if marker:
+                self.markers.add(vp)
+            if depth is not None:
+                self.depths[vp] = depth
+
+    def discard(self, vp, reason=None):
+        """Drop one reason (or all results) of a billboard."""
+        if reason is None:
+            self.hidden.pop(vp, None)
+            self.markers.discard(vp)
+            self.depths.pop(vp, None)
+            return
+        reasons = self.hidden.get(vp)
+        if reasons and reason in reasons:
+            reasons = reasons - {reason}
+            if reasons:
+                self.hidden[vp] = reasons
+            else:
+                del self.hidden[vp]
+
+
+_NO_RESULTS = _ViewResults()
+
+
+def declutter_enabled():
+    """Return True if overlapping labels are hidden."""
+    global _declutter
+    if _declutter is None:
+        _declutter = BillboardShared.params().GetBool("Declutter", False)
+    return _declutter
+
+
+def set_declutter(enabled):
+    """Enable or disable decluttering and store the choice in preferences."""
+    global _declutter
+    _declutter = bool(enabled)
+    BillboardShared.params().SetBool("Declutter", _declutter)
+    if _declutter:
+        _rerun_all()
+    else:
+        _clear_reason("declutter")
+
+
+def culling_enabled():
+    """Return True if off-screen billboards are hidden in batch."""
+    global _culling
+    if _culling is None:
+        _culling = BillboardShared.params().GetBool("Culling", False)
+    return _culling
+
+
+def set_culling(enabled):
+    """Enable or disable batch frustum culling and store the choice in preferences."""
+    global _culling
+    _culling = bool(enabled)
+    BillboardShared.params().SetBool("Culling", _culling)
+    if _culling:
+        _rerun_all()
+    else:
+        _clear_reason("cull")
+
+
+def clustering_enabled():
+    """Return True if distant groups of billboards are drawn as aggregates."""
+    global _clustering
+    if _clustering is None:
+        _clustering = BillboardShared.params().GetBool("Clustering", False)
+    return _clustering
+
+
+def set_clustering(enabled):
+    """Enable or disable clustering and store the choice in preferences."""
+    global _clustering
+    _clustering = bool(enabled)
+    BillboardShared.params().SetBool("Clustering", _clustering)
+    if _clustering:
+        _rerun_all()
+    else:
+        BillboardCluster.clear()
+        _clear_reason("cluster")
+
+
+def _clear_reason(reason):
+    """Show the billboards a disabled pass hid, in every view."""
+    for vp in list(_billboards):
+        vp._set_hidden(reason, False)
+    for results in _results.values():
+        for vp in [vp for vp, reasons in results.hidden.items() if reason in reasons]:
+            results.discard(vp, reason)
+
+
+def set_lod_user(vp, enabled):
+    """Track whether a billboard has a level-of-detail threshold."""
+    if enabled:
+        _lod_billboards.add(vp)
+    else:
+        _lod_billboards.discard(vp)
+        vp._set_marker(False)
+        vp._set_hidden("lod", False)
+        for results in _results.values():
+            results.discard(vp, "lod")
+            results.markers.discard(vp)
+    invalidate(vp)
+
+
+def set_screen_scaled(vp, enabled):
+    """Track whether a billboard is sized in pixels (ScaleMode "Screen")."""
+    if enabled:
+        _scaled_billboards.add(vp)
+    else:
+        _scaled_billboards.discard(vp)
+        for results in _results.values():
+            results.depths.pop(vp, None)
+    invalidate(vp)
+
+
+def active():
+    """Return True if any screen pass (or depth scaling) needs camera snapshots."""
+    return (declutter_enabled() or culling_enabled() or clustering_enabled()
+            or len(_lod_billboards) > 0 or len(_scaled_billboards) > 0)
+
+
+def _rerun_all():
+    for document, snapshots in list(_last_snapshot.items()):
+        for view, snapshot in list(snapshots.items()):
+            camera_changed(document, snapshot, view)
+
+
+def register(vp):
+    """Include a billboard view provider in the screen passes."""
+    _billboards.add(vp)
+    invalidate(vp, moved=True)
+
+
+def unregister(vp):
+    """Exclude a billboard view provider from the screen passes."""
+    _billboards.discard(vp)
+    _lod_billboards.discard(vp)
+    _scaled_billboards.discard(vp)
+    for results in _results.values():
+        results.discard(vp)
+    invalidate(vp, moved=True)
+
+
+def forget_document(document):
+    """Drop all billboards, cached anchors, snapshots and results of a document."""
+    for vp in [vp for vp in _billboards if vp.screen_document() == document]:
+        _billboards.discard(vp)
+        _lod_billboards.discard(vp)
+        _scaled_billboards.discard(vp)
+    _anchor_cache.pop(document, None)
+    _generations.pop(document, None)
+    _last_snapshot.pop(document, None)
+    _shown.pop(document, None)
+    for mapping in (_pending, _results, _scaled_for):
+        for key in [k for k in mapping if k[0] == document]:
+            del mapping[key]
+    BillboardCluster.forget_document(document)
+
+
+def forget_view(view):
+    """Drop the snapshots and results of a closed view.
+
+    Billboards showing its results show those of no view until another view
+    of their document renders.
+    """
+    for document, shown in list(_shown.items()):
+        if shown is view:
+            show_view(document, None)
+    for snapshots in _last_snapshot.values():
+        snapshots.pop(view, None)
+    for mapping in (_pending, _results, _scaled_for):
+        for key in [k for k in mapping if k[1] is view]:
+            del mapping[key]
+    BillboardCluster.forget_view(view)
+
+
+def show_view(document, view):
+    """Make the billboards of a document show the pass results of view.
+
+    Called at the start of every render and pick of a view; does nothing
+    unless the passes of another view of the document were shown since.
+    """
+    shown = _shown.get(document)
+    if shown is view:
+        return
+    _shown[document] = view
+    if shown is not None and (document, shown) not in _results:
+        # Results are only recorded once there are several views: keep what
+        # the view shown so far left in the nodes
+        _results[(document, shown)] = _ViewResults(_get_anchors(document).billboards)
+    old = _results.get((document, shown), _NO_RESULTS)
+    new = _results.get((document, view), _NO_RESULTS)
+    if old is new:
+        return
+    for vp in old.hidden.keys() | new.hidden.keys() | old.markers | new.markers:
+        vp._show_screen_results(new.hidden.get(vp, ()), vp in new.markers)
+    for vp, depth in new.depths.items():
+        vp._set_depth_scale(depth, notify=False)
+
+
+def scale_depths(document, snapshot, view=None):
+    """Scale the pixel-sized billboards of a document by their depth in a view.
+
+    Called by the view's render callback before the billboards render, with
+    the view's results shown. Does nothing unless the camera or the anchors
+    changed since the last call for the view.
+    """
+    if not _scaled_billboards:
+        return
+    anchors = _get_anchors(document)
+    key = (document, view)
+    done = _scaled_for.get(key)
+    if done is not None and done[0] is anchors and done[1] == snapshot:
+        return
+    _scaled_for[key] = (anchors, snapshot)
+    if not anchors.scaled_billboards:
+        return
+    depths = project(anchors.scaled_positions, snapshot)[2]
+    results = _results.get(key)
+    for vp, depth in zip(anchors.scaled_billboards, depths):
+        if depth > 0.0:
+            vp._set_depth_scale(depth, notify=False)
+            if results is not None:
+                results.depths[vp] = depth
+
+
+def invalidate(vp=None, moved=False):
+    """Drop cached anchors after billboards were added, moved or resized.
+
+    moved tells that billboards were added, removed or moved, which also
+    starts a new generation of anchor positions.
+    """
+    document = vp.screen_document() if vp is not None else None
+    if document is None:
+        _anchor_cache.clear()
+        if moved:
+            _generations.clear()
+    else:
+        _anchor_cache.pop(document, None)
+        if moved:
+            _generations.pop(document, None)
+    if active():
+        for view, snapshot in list(_last_snapshot.get(document, {}).items()):
+            camera_changed(document, snapshot, view)
+
+
+def camera_snapshot(eye, axes, viewport, height_angle=None, height=None):
+    """Build a CameraSnapshot for a camera at eye with axes (right, up, back).
+
+    axes are the camera's unit x, y and z axes in world space. The camera
+    is orthographic, showing height world units vertically, if height is
+    given, otherwise perspective with height_angle (radians).
+    """
+    rotation = [[axis[i] for axis in axes] for i in range(3)]
+    translation = [-sum(eye[i] * rotation[i][j] for i in range(3)) for j in range(3)]
+    view = tuple(tuple(row) + (0.0,) for row in rotation) + (tuple(translation) + (1.0,),)
+    width, height_px = viewport
+    aspect = width / float(height_px)
+    near, far = 1.0, 1e6  # only clip z depends on them, which no pass reads
+    if height is not None:
+        projection = (
+            (2.0 / (height * aspect), 0.0, 0.0, 0.0),
+            (0.0, 2.0 / height, 0.0, 0.0),
+            (0.0, 0.0, -2.0 / (far - near), 0.0),
+            (0.0, 0.0, -(far + near) / (far - near), 1.0),
+        )
+    else:
+        f = 1.0 / math.tan(height_angle / 2.0)
+        projection = (
+            (f / aspect, 0.0, 0.0, 0.0),
+            (0.0, f, 0.0, 0.0),
+            (0.0, 0.0, (far + near) / (near - far), -1.0),
+            (0.0, 0.0, 2.0 * far * near / (near - far), 0.0),
+        )
+    return CameraSnapshot(view, projection, (width, height_px))
+
+
+def snapshot_from_state(state):
+    """Build a CameraSnapshot from a render action's traversal state."""
+    size = coin.SoViewportRegionElement.get(state).getViewportSizePixels()
+    return CameraSnapshot(
+        tuple(map(tuple, coin.SoViewingMatrixElement.get(state).getValue())),
+        tuple(map(tuple, coin.SoProjectionMatrixElement.get(state).getValue())),
+        (size[0], size[1]),
+    )
+
+
+def camera_changed(document, snapshot, view=None):
+    """Schedule the screen passes for a document after a camera change in view."""
+    global _pass_sensor
+    _last_snapshot.setdefault(document, {})[view] = snapshot
+    _pending[(document, view)] = snapshot
+    if _pass_sensor is None:
+        _pass_sensor = coin.SoOneShotSensor(lambda data, sensor: run_passes(), None)
+    if not _pass_sensor.isScheduled():
+        _pass_sensor.schedule()
+
+
+def run_passes():
+    """Run the enabled passes for every view with a pending snapshot."""
+    pending = list(_pending.items())
+    _pending.clear()
+    with BillboardInstrumentation.timed("screen_passes"):
+        for (document, view), snapshot in pending:
+            _run_passes(document, snapshot, view)
+
+
+def _run_passes(document, snapshot, view=None):
+    """Run the enabled passes for one view of a document."""
+    anchors = _get_anchors(document)
+    if not anchors.billboards:
+        return
+    BillboardInstrumentation.count("screen_passes.billboards", len(anchors.billboards))
+    # The passes update the results of view, which the nodes must hold
+    show_view(document, view)
+
+    # One batched projection shared by all passes
+    boxes = screen_boxes(anchors, snapshot)
+    clustered = None
+    if clustering_enabled():
+        clustered = BillboardCluster.cluster(document, anchors, snapshot, view)
+    if culling_enabled():
+        cull(anchors, boxes)
+    full = level_of_detail(anchors, boxes)
+    if declutter_enabled():
+        candidates = [a and b for a, b in zip(boxes.on_screen, full)]
+        if clustered is not None:
+            candidates = [a and not b for a, b in zip(candidates, clustered)]
+        declutter(anchors, boxes, candidates, *snapshot.viewport)
+
+    if len(_last_snapshot.get(document, ())) > 1:
+        _results[(document, view)] = _ViewResults(anchors.billboards)
+    else:
+        # Taken from the nodes if another view comes to be shown
+        _results.pop((document, view), None)
+
+
+def _get_anchors(document):
+    anchors = _anchor_cache.get(document)
+    if anchors is None:
+        generation = _generations.get(document)
+        if generation is None:
+            generation = _generations[document] = next(_generation_counter)
+        anchors = _AnchorSet(
+            (vp for vp in _billboards
+             if document is None or vp.screen_document() == document),
+            generation,
+        )
+        _anchor_cache[document] = anchors
+    return anchors
+
+
+def _combined_matrix(snapshot):
+    """Return view * projection (Coin's row-vector convention)."""
+    v, p = snapshot.view, snapshot.projection
+    return [
+        [sum(v[i][k] * p[k][j] for k in range(4)) for j in range(4)]
+        for i in range(4)
+    ]
+
+
+def project(positions, snapshot):
+    """Project world points to pixels in one batch.
+
+    Returns lists (x, y, w, kx, ky): pixel coordinates, clip w (<= 0 behind
+    the camera) and pixels per world unit along the billboard's x and y axes.
+    """
+    m = _combined_matrix(snapshot)
+    width, height = snapshot.viewport
+    p00 = snapshot.projection[0][0] * width / 2.0
+    p11 = snapshot.projection[1][1] * height / 2.0
+
+    if numpy is not None:
+        pts = numpy.asarray(positions, dtype=float).reshape(-1, 3)
+        mat = numpy.asarray(m, dtype=float)
+        clip = pts @ mat[:3] + mat[3]
+        w = clip[:, 3]
+        inv_w = 1.0 / numpy.where(numpy.abs(w) > 1e-12, w, 1e-12)
+        x = (clip[:, 0] * inv_w + 1.0) * (width / 2.0)
+        y = (clip[:, 1] * inv_w + 1.0) * (height / 2.0)
+        return (x.tolist(), y.tolist(), w.tolist(),
+                (p00 * inv_w).tolist(), (p11 * inv_w).tolist())
+
+    xs, ys, ws, kxs, kys = [], [], [], [], []
+    for px, py, pz in positions:
+        cx = px * m[0][0] + py * m[1][0] + pz * m[2][0] + m[3][0]
+        cy = px * m[0][1] + py * m[1][1] + pz * m[2][1] + m[3][1]
+        w = px * m[0][3] + py * m[1][3] + pz * m[2][3] + m[3][3]
+        inv_w = 1.0 / (w if abs(w) > 1e-12 else 1e-12)
+        xs.append((cx * inv_w + 1.0) * (width / 2.0))
+        ys.append((cy * inv_w + 1.0) * (height / 2.0))
+        ws.append(w)
+        kxs.append(p00 * inv_w)
+        kys.append(p11 * inv_w)
+    return xs, ys, ws, kxs, kys
+
+
+def screen_boxes(anchors, snapshot):
+    """Return ScreenBoxes for all anchors, computed in one batch.
+
+    Billboards sized in pixels (ScaleMode "Screen") keep their bounds in
+    pixels whatever their depth.
+    """
+    xs, ys, ws, kxs, kys = project(anchors.positions, snapshot)
+    width, height = snapshot.viewport
+    p11 = snapshot.projection[1][1] * height
+    aspect = snapshot.projection[0][0] * width / p11 if p11 else 1.0
+
+    if numpy is not None:
+        x, y, w = numpy.asarray(xs), numpy.asarray(ys), numpy.asarray(ws)
+        kx, ky = numpy.asarray(kxs), numpy.asarray(kys)
+        if any(anchors.scaled):
+            scaled = numpy.asarray(anchors.scaled, dtype=bool)
+            kx = numpy.where(scaled, aspect, kx)
+            ky = numpy.where(scaled, 1.0, ky)
+        b = numpy.asarray(anchors.bounds, dtype=float).reshape(-1, 4)
+        x0, x1 = x + b[:, 0] * kx, x + b[:, 1] * kx
+        y0, y1 = y + b[:, 2] * ky, y + b[:, 3] * ky
+        on_screen = (w > 0.0) & (x1 >= 0) & (y1 >= 0) & (x0 <= width) & (y0 <= height)
+        pixel_height = numpy.asarray(anchors.font_sizes, dtype=float) * ky
+        return ScreenBoxes(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist(),
+                           on_screen.tolist(), pixel_height.tolist(), ws)
+
+    boxes = ScreenBoxes([], [], [], [], [], [], ws)
+    for i, (left, right, bottom, top) in enumerate(anchors.bounds):
+        kx, ky = (aspect, 1.0) if anchors.scaled[i] else (kxs[i], kys[i])
+        x0, x1 = xs[i] + left * kx, xs[i] + right * kx
+        y0, y1 = ys[i] + bottom * ky, ys[i] + top * ky
+        boxes.x0.append(x0)
+        boxes.y0.append(y0)
+        boxes.x1.append(x1)
+        boxes.y1.append(y1)
+        boxes.on_screen.append(
+            ws[i] > 0.0 and x1 >= 0 and y1 >= 0 and x0 <= width and y0 <= height
+        )
+        boxes.pixel_height.append(anchors.font_sizes[i] * ky)
+    return boxes
+
+
+def cull(anchors, boxes):
+    """Hide billboards whose screen box lies outside the viewport."""
+    for vp, on_screen in zip(anchors.billboards, boxes.on_screen):
+        vp._set_hidden("cull", not on_screen)
+    if BillboardInstrumentation.enabled:
+        BillboardInstrumentation.count("cull.hidden", boxes.on_screen.count(False))
+
+
+def level_of_detail(anchors, boxes):
+    """Swap small labels for a marker, or hide them, below their pixel threshold.
+
+    Returns per-billboard flags telling whether the full label is shown.
+    """
+    full = []
+    for i, vp in enumerate(anchors.billboards):
+        min_height, fallback = anchors.lod[i]
+        small = min_height > 0.0 and boxes.pixel_height[i] < min_height
+        vp._set_marker(small and fallback == "Marker")
+        vp._set_hidden("lod", small and fallback == "Hide")
+        full.append(not small)
+    if BillboardInstrumentation.enabled:
+        BillboardInstrumentation.count("lod.reduced", full.count(False))
+    return full
+
+
+def declutter(anchors, boxes, candidates, width, height):
+    """Hide labels overlapping a higher-priority label in screen space.
+
+    Only billboards flagged in candidates (on screen, shown in full) take
+    part; the others are shown or hidden by the other passes alone.
+    """
+    grid = {}
+    cell = float(GRID_CELL)
+    hidden = 0
+
+    for i, vp in enumerate(anchors.billboards):
+        if not candidates[i]:
+            vp._set_hidden("declutter", False)
+            continue
+        x0, y0, x1, y1 = boxes.x0[i], boxes.y0[i], boxes.x1[i], boxes.y1[i]
+
+        # Only cells inside the viewport can hold placed labels
+        cells = [
+            (cx, cy)
+            for cx in range(int(max(x0, 0.0) // cell), int(min(x1, width) // cell) + 1)
+            for cy in range(int(max(y0, 0.0) // cell), int(min(y1, height) // cell) + 1)
+        ]
+        overlaps = False
+        for key in cells:
+            for ox0, oy0, ox1, oy1 in grid.get(key, ()):
+                if x0 < ox1 and ox0 < x1 and y0 < oy1 and oy0 < y1:
+                    overlaps = True
+                    break
+            if overlaps:
+                break
+
+        vp._set_hidden("declutter", overlaps)
+        if overlaps:
+            hidden += 1
+        else:
+            rect = (x0, y0, x1, y1)
+            for key in cells:
+                grid.setdefault(key, []).append(rect)
+    BillboardInstrumentation.count("declutter.hidden", hidden)
+
+
+BillboardShared.on_close(forget_document)
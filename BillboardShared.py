@@ -0,0 +1,86 @@
+"""Billboard Shared - preferences and the one document observer of the workbench.
+
+Modules keeping per-document state register callbacks here instead of
+installing document observers of their own:
+
+    BillboardShared.connect("slotChangedObject", _object_changed)
+    BillboardShared.on_close(forget_document)
+
+The observer is added to FreeCAD on the first connect() and forwards each
+slot to the callbacks connected to it, in the order they were connected.
+"""
+
+import FreeCAD
+
+
+PARAM_PATH = "User parameter:BaseApp/Preferences/Mod/Billboard"
+
+# Slots the observer forwards
+SLOTS = (
+    "slotChangedObject",
+    "slotDeletedObject",
+    "slotDeletedDocument",
+    "slotStartSaveDocument",
+    "slotFinishSaveDocument",
+)
+
+_callbacks = {slot: () for slot in SLOTS}
+_closing = ()  # callbacks taking the name of a closed document
+_observer = None
+
+
+def params():
+    """Return the workbench's preference group."""
+    return FreeCAD.ParamGet(PARAM_PATH)
+
+
+def connect(slot, callback):
+    """Call callback with the arguments of every slot notification."""
+    if slot not in _callbacks:
+        raise ValueError(f"Unknown slot {slot!r}, expected one of {list(SLOTS)}")
+    if callback not in _callbacks[slot]:
+        _callbacks[slot] += (callback,)
+    _install()
+
+
+def on_close(callback):
+    """Call callback with the name of every document being closed."""
+    global _closing
+    if callback not in _closing:
+        _closing += (callback,)
+    _install()
+
+
+def _install():
+    global _observer
+    if _observer is None:
+        _observer = _DocumentObserver()
+        FreeCAD.addDocumentObserver(_observer)
+
+
+class _DocumentObserver:
+    """Forwards document notifications to the connected callbacks."""
+
+    def slotChangedObject(self, obj, prop):
+        # Called for every property of every object; callbacks must keep
+        # their miss path cheap
+        for callback in _callbacks["slotChangedObject"]:
+            callback(obj, prop)
+
+    def slotDeletedObject(self, obj):
+        for callback in _callbacks["slotDeletedObject"]:
+            callback(obj)
+
+    def slotDeletedDocument(self, doc):
+        for callback in _callbacks["slotDeletedDocument"]:
+            callback(doc)
+        for callback in _closing:
+            callback(doc.Name)
+
+    def slotStartSaveDocument(self, doc, filename):
+        for callback in _callbacks["slotStartSaveDocument"]:
+            callback(doc, filename)
+
+    def slotFinishSaveDocument(self, doc, filename):
+        for callback in _callbacks["slotFinishSaveDocument"]:
+            callback(doc, filename)
@@ -0,0 +1,127 @@
+"""Billboard Style - font, color and frame settings shared by billboards."""
+
+import FreeCAD
+
+
+# TextBillboard properties a linked style overrides
+STYLE_PROPERTIES = (
+    "FontSize", "FontName", "TextColor", "BackgroundColor", "FrameColor", "FrameWidth",
+)
+
+
+class BillboardStyle:
+    """Text, background and frame settings shared by linked billboards.
+
+    Billboards link to a style through their Style property. All billboards
+    using one style share a single set of Coin style nodes, so changing the
+    style updates every linked label in one operation.
+    """
+
+    def __init__(self, obj):
+        """Initialize the style object with properties."""
+        obj.Proxy = self
+        self.Type = "BillboardStyle"
+
+        # Font settings
+        obj.addProperty(
+            "App::PropertyFloat", "FontSize", "Font",
+            "Font size in points"
+        ).FontSize = 24.0
+
+        obj.addProperty(
+            "App::PropertyString", "FontName", "Font",
+            "Font family name"
+        ).FontName = "Arial"
+
+        obj.addProperty(
+            "App::PropertyColor", "TextColor", "Font",
+            "Text color"
+        ).TextColor = (1.0, 1.0, 1.0, 0.0)  # White
+
+        # Background settings
+        obj.addProperty(
+            "App::PropertyColor", "BackgroundColor", "Background",
+            "Background color"
+        ).BackgroundColor = (0.2, 0.2, 0.2, 0.0)  # Dark gray
+
+        # Frame settings
+        obj.addProperty(
+            "App::PropertyColor", "FrameColor", "Frame",
+            "Frame line color"
+        ).FrameColor = (1.0, 1.0, 1.0, 0.0)  # White
+
+        obj.addProperty(
+            "App::PropertyFloat", "FrameWidth", "Frame",
+            "Frame line width in pixels"
+        ).FrameWidth = 1.0
+
+    def execute(self, obj):
+        """Called when the object needs to be recomputed."""
+        pass
+
+    def onChanged(self, obj, prop):
+        """Called when a property changes."""
+        pass
+
+    def dumps(self):
+        """Serialize for saving."""
+        return {"Type": self.Type}
+
+    def loads(self, state):
+        """Deserialize when loading."""
+        if state:
+            self.Type = state.get("Type", "BillboardStyle")
+
+
+def is_style(obj) -> bool:
+    """Return True if obj is a BillboardStyle object."""
+    return getattr(getattr(obj, "Proxy", None), "Type", None) == "BillboardStyle"
+
+
+def source(obj):
+    """Return the object style properties of billboard obj are read from.
+
+    That is obj's linked Style if it has one, otherwise obj itself.
+    """
+    style = getattr(obj, "Style", None)
+    return style if style is not None and is_style(style) else obj
+
+
+def linked_billboards(style):
+    """Return the billboards and clouds whose Style is style."""
+    return [
+        obj for obj in style.InList
+        if getattr(obj, "Style", None) is not None and obj.Style.Name == style.Name
+    ]
+
+
+def create(name: str = "BillboardStyle", billboards=()) -> "FreeCAD.DocumentObject":
+    """Create a BillboardStyle in the active document.
+
+    If billboards are given, the style copies the settings of the first one
+    and all of them are linked to it.
+    """
+    doc = FreeCAD.ActiveDocument
+    if doc is None:
+        FreeCAD.Console.PrintError("No active document\n")
+        return None
+
+    billboards = [b for b in billboards if "Style" in b.PropertiesList]
+    doc.openTransaction("Create billboard style")
+    obj = doc.addObject("App::FeaturePython", name)
+    BillboardStyle(obj)
+
+    # Add view provider if GUI is available
+    if FreeCAD.GuiUp:
+        import BillboardStyleViewProvider
+        BillboardStyleViewProvider.ViewProviderBillboardStyle(obj.ViewObject)
+
+    if billboards:
+        for prop in STYLE_PROPERTIES:
+            setattr(obj, prop, getattr(billboards[0], prop))
+        for billboard in billboards:
+            billboard.Style = obj
+    doc.commitTransaction()
+
+    doc.recompute()
+    return obj
@@ -0,0 +1,171 @@
+"""Billboard Style ViewProvider - Coin style nodes shared by linked billboards."""
+
+import FreeCAD
+from pivy import coin
+
+import BillboardStyle
+
+
+class StyleNodes:
+    """One set of font, material and line style nodes.
+
+    Each billboard without a style owns one; a BillboardStyle owns one that
+    all of its linked billboards insert into their scene graphs.
+    """
+
+    # Setter applying each style property
+    _SETTERS = {
+        "FontName": "set_font",
+        "FontSize": "set_font",
+        "TextColor": "set_text_color",
+        "BackgroundColor": "set_background_color",
+        "FrameColor": "set_frame_style",
+        "FrameWidth": "set_frame_style",
+    }
+
+    def __init__(self):
+        """Create the nodes with default values."""
+        self.font = coin.SoFont()
+        self.text_material = coin.SoMaterial()
+        # Vertical offset to shift text down (for better centering)
+        self.vertical_offset = coin.SoTranslation()
+        self.background_material = coin.SoMaterial()
+        self.frame_color = coin.SoBaseColor()
+        self.frame_style = coin.SoDrawStyle()
+        self.frame_style.style = coin.SoDrawStyle.LINES
+
+    def nodes(self):
+        """Return all nodes, in a fixed order."""
+        return (
+            self.font, self.text_material, self.vertical_offset,
+            self.background_material, self.frame_color, self.frame_style,
+        )
+
+    def update(self, obj, prop=None):
+        """Apply style property prop (or all of them) from obj."""
+        if prop is None:
+            for setter in set(self._SETTERS.values()):
+                getattr(self, setter)(obj)
+        elif prop in self._SETTERS:
+            getattr(self, self._SETTERS[prop])(obj)
+
+    def set_font(self, obj):
+        """Update font settings."""
+        if hasattr(obj, "FontName"):
+            self.font.name.setValue(obj.FontName)
+        if hasattr(obj, "FontSize"):
+            self.font.size.setValue(obj.FontSize)
+            # Shift text for better centering
+            offset = obj.FontSize * 0.2  # positive Y (up) to center in text frame
+            self.vertical_offset.translation.setValue(0, offset, 0)
+
+    def set_text_color(self, obj):
+        """Update text color."""
+        if hasattr(obj, "TextColor"):
+            color = obj.TextColor
+            self.text_material.diffuseColor.setValue(color[0], color[1], color[2])
+            self.text_material.emissiveColor.setValue(color[0], color[1], color[2])
+
+    def set_background_color(self, obj):
+        """Update background material."""
+        if hasattr(obj, "BackgroundColor"):
+            color = obj.BackgroundColor
+            self.background_material.diffuseColor.setValue(
+                color[0], color[1], color[2]
+            )
+            self.background_material.transparency.setValue(0.3)
+
+    def set_frame_style(self, obj):
+        """Update frame line color and width."""
+        if hasattr(obj, "FrameColor"):
+            color = obj.FrameColor
+            self.frame_color.rgb.setValue(color[0], color[1], color[2])
+
+        if hasattr(obj, "FrameWidth"):
+            self.frame_style.lineWidth.setValue(obj.FrameWidth)
+
+
+def shared_nodes(style):
+    """Return the StyleNodes shared by billboards linked to style, or None."""
+    if style is None or not FreeCAD.GuiUp or not BillboardStyle.is_style(style):
+        return None
+    proxy = getattr(style.ViewObject, "Proxy", None)
+    if not isinstance(proxy, ViewProviderBillboardStyle):
+        return None
+    return proxy.get_nodes()
+
+
+class ViewProviderBillboardStyle:
+    """ViewProvider for BillboardStyle - owns the shared style nodes.
+
+    The style has no geometry of its own. Its nodes are created on first
+    use by a linked billboard; property changes are written to them once,
+    and linked objects are only notified when the font changes, since that
+    changes billboards' text bounds, or the text color, which clouds apply
+    to their labels themselves.
+    """
+
+    def __init__(self, vobj):
+        """Initialize the view provider."""
+        vobj.Proxy = self
+        self.ViewObject = vobj
+
+    def attach(self, vobj):
+        """Called when the view provider is attached to the object."""
+        self.ViewObject = vobj
+        self.nodes = None
+        # Nothing to draw, but the reported display mode must exist
+        vobj.addDisplayMode(coin.SoSeparator(), "Standard")
+
+    def get_nodes(self):
+        """Return the shared StyleNodes, creating them on first use."""
+        if getattr(self, "nodes", None) is None:
+            self.nodes = StyleNodes()
+            self.nodes.update(self.ViewObject.Object)
+        return self.nodes
+
+    def updateData(self, fp, prop):
+        """Called when a data property of the object changes."""
+        if getattr(self, "nodes", None) is not None:
+            self.nodes.update(fp, prop)
+        if prop in ("FontName", "FontSize", "TextColor"):
+            for billboard in BillboardStyle.linked_billboards(fp):
+                proxy = getattr(billboard.ViewObject, "Proxy", None)
+                if hasattr(proxy, "style_changed"):
+                    proxy.style_changed(prop)
+
+    def onChanged(self, vp, prop):
+        """Called when a view property changes."""
+        pass
+
+    def getDisplayModes(self, vobj):
+        """Return available display modes."""
+        return ["Standard"]
+
+    def getDefaultDisplayMode(self):
+        """Return the default display mode."""
+        return "Standard"
+
+    def setDisplayMode(self, mode):
+        """Set the display mode."""
+        return mode
+
+    def getIcon(self):
+        """Return the icon for this object."""
+        return ""
+
+    def claimChildren(self):
+        """Return child objects."""
+        return []
+
+    def onDelete(self, vobj, subelements):
+        """Called when the object is about to be deleted."""
+        return True
+
+    def dumps(self):
+        """Serialize for saving."""
+        return None
+
+    def loads(self, state):
+        """Deserialize when loading."""
+        return None
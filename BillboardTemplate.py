@@ -0,0 +1,228 @@
+"""Billboard Template - text computed from other objects' properties.
+
+A billboard's TextTemplate is a Python format string whose fields reference
+properties of objects in the same document by name, optionally followed by
+attributes and a format spec:
+
+    "Mass: {Body.Mass:.2f}"
+    "{Pad.Shape.Volume:.0f} mm^3 at x = {Pad.Placement.Base.x:.1f}"
+
+Quantities are formatted in their user-preferred unit. References that
+cannot be resolved show as "?".
+
+Every billboard is indexed under the (object, property) pairs its template
+reads, and the shared document observer (BillboardShared) re-evaluates only the billboards indexed
+under a property that changed. The referenced values of the last evaluation
+and the resulting text are memoized: if the values are unchanged, nothing is
+formatted, and if the formatted text is unchanged, Text is not written, so
+the view provider re-lays out the text and recomputes its bounds only when
+the displayed string actually changes.
+"""
+
+import functools
+import string
+
+import FreeCAD
+
+import BillboardShared
+
+
+MISSING = "?"
+
+# (document name, source name, property) -> set of billboard names
+_dependents = {}
+# (document name, billboard name) -> referenced (source name, property) pairs
+_references = {}
+# (document name, billboard name) -> referenced values of the last evaluation
+_values = {}
+# Billboards being evaluated, to stop reference cycles
+_updating = set()
+
+_formatter = string.Formatter()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(template):
+    """Parse a template into (literal, reference, conversion, spec) parts.
+
+    reference is (object name, attribute path) or None for trailing text.
+    Raises ValueError for malformed templates.
+    """
+    parts = []
+    for literal, field, spec, conversion in _formatter.parse(template):
+        reference = None
+        if field is not None:
+            names = field.split(".")
+            if len(names) < 2 or not all(names):
+                raise ValueError(f"'{{{field}}}' is not of the form Object.Property")
+            reference = (names[0], tuple(names[1:]))
+        parts.append((literal, reference, conversion, spec or ""))
+    return tuple(parts)
+
+
+def references(template):
+    """Return the (object name, property) pairs a template reads."""
+    return {
+        (ref[0], ref[1][0])
+        for _literal, ref, _conversion, _spec in compile_template(template)
+        if ref is not None
+    }
+
+
+def _resolve(doc, reference, missing):
+    name, path = reference
+    value = doc.getObject(name) if name not in missing else None
+    if value is None:
+        return MISSING
+    try:
+        for attr in path:
+            value = getattr(value, attr)
+    except Exception:
+        return MISSING
+    return value
+
+
+def _format_value(value, conversion, spec):
+    if value is MISSING:
+        return MISSING
+    if conversion == "r":
+        value = repr(value)
+    elif conversion == "s":
+        value = str(value)
+    try:
+        return format(value, spec)
+    except (TypeError, ValueError):
+        pass
+    if hasattr(value, "getUserPreferred"):
+        # Quantity: format the number in its preferred unit
+        _text, factor, unit = value.getUserPreferred()
+        try:
+            return f"{format(value.Value / factor, spec)} {unit}"
+        except (TypeError, ValueError):
+            pass
+    return str(value)
+
+
+def render(template, doc, missing=()):
+    """Return the template's text for the current values in doc."""
+    parts = compile_template(template)
+    values = [_resolve(doc, ref, missing) for _l, ref, _c, _s in parts if ref is not None]
+    return _render(parts, values)
+
+
+def _render(parts, values):
+    values = iter(values)
+    out = []
+    for literal, ref, conversion, spec in parts:
+        out.append(literal)
+        if ref is not None:
+            out.append(_format_value(next(values), conversion, spec))
+    return "".join(out)
+
+
+def evaluate(obj, missing=()):
+    """Update obj.Text from its TextTemplate if a referenced value changed."""
+    template = getattr(obj, "TextTemplate", "")
+    if not template:
+        return
+    key = (obj.Document.Name, obj.Name)
+    if key in _updating:
+        return
+    try:
+        parts = compile_template(template)
+    except ValueError:
+        return  # reported by link()
+    values = tuple(
+        _resolve(obj.Document, ref, missing) for _l, ref, _c, _s in parts if ref is not None
+    )
+    if _values.get(key) == values:
+        return
+    _values[key] = values
+
+    text = _render(parts, values)
+    if obj.Text != text:
+        _updating.add(key)
+        try:
+            obj.Text = text
+        finally:
+            _updating.discard(key)
+
+
+def link(obj):
+    """Index obj under the properties its TextTemplate reads and evaluate it."""
+    doc = obj.Document.Name
+    key = (doc, obj.Name)
+    template = getattr(obj, "TextTemplate", "")
+    try:
+        new = references(template) if template else set()
+    except ValueError as e:
+        FreeCAD.Console.PrintWarning(f"Billboard {obj.Name}: invalid TextTemplate: {e}\n")
+        new = set()
+
+    old = _references.get(key, set())
+    for source, prop in old - new:
+        _discard((doc, source, prop), obj.Name)
+    for source, prop in new - old:
+        _dependents.setdefault((doc, source, prop), set()).add(obj.Name)
+    if new:
+        _references[key] = new
+    else:
+        _references.pop(key, None)
+
+    _values.pop(key, None)
+    obj.setEditorMode("Text", 1 if template else 0)  # read-only while computed
+    evaluate(obj)
+
+
+def unlink(document, name):
+    """Drop a billboard from the index."""
+    key = (document, name)
+    for source, prop in _references.pop(key, ()):
+        _discard((document, source, prop), name)
+    _values.pop(key, None)
+
+
+def _discard(key, name):
+    names = _dependents.get(key)
+    if names is not None:
+        names.discard(name)
+        if not names:
+            del _dependents[key]
+
+
+def property_changed(obj, prop, missing=()):
+    """Re-evaluate the billboards whose template reads obj.prop."""
+    doc = obj.Document
+    for name in list(_dependents.get((doc.Name, obj.Name, prop), ())):
+        billboard = doc.getObject(name)
+        if billboard is not None:
+            evaluate(billboard, missing)
+
+
+def forget_document(document):
+    """Drop all index entries of a document."""
+    for mapping in (_references, _values):
+        for key in [k for k in mapping if k[0] == document]:
+            del mapping[key]
+    for key in [k for k in _dependents if k[0] == document]:
+        del _dependents[key]
+
+
+def _object_changed(obj, prop):
+    """Re-evaluate the templates reading obj.prop."""
+    if (obj.Document.Name, obj.Name, prop) in _dependents:
+        property_changed(obj, prop)
+
+
+def _object_deleted(obj):
+    doc = obj.Document.Name
+    unlink(doc, obj.Name)
+    # Billboards reading the deleted object now show "?"
+    for prop in obj.PropertiesList:
+        if (doc, obj.Name, prop) in _dependents:
+            property_changed(obj, prop, missing=(obj.Name,))
+
+
+BillboardShared.connect("slotChangedObject", _object_changed)
+BillboardShared.connect("slotDeletedObject", _object_deleted)
+BillboardShared.on_close(forget_document)
@@ -1,12 +1,110 @@
 """Billboard ViewProvider - Coin3D visualization for text billboards."""
 
-import FreeCADGui
+import contextlib
+
 from pivy import coin
-import math
+
+import BillboardAtlas
+import BillboardInstrumentation
+import BillboardMetrics
+import BillboardOrientation
+import BillboardOverlay
+import BillboardScreen
+import BillboardStyle
+import BillboardStyleViewProvider
+
+
+# Visual aspects each data property invalidates
+PROPERTY_ASPECTS = {
+    "Text": ("text", "bounds"),
+    "FontSize": ("font", "bounds"),
+    "FontName": ("font", "bounds"),
+    "TextColor": ("color",),
+    "Alignment": ("text", "bounds"),
+    "MaxWidth": ("text", "bounds"),
+    "LineSpacing": ("text", "bounds"),
+    "RenderMode": ("render_mode",),
+    "ShowBackground": ("background",),
+    "BackgroundColor": ("background",),
+    "BackgroundPadding": ("bounds",),
+    "ShowFrame": ("frame",),
+    "FrameColor": ("frame",),
+    "FrameWidth": ("frame",),
+    "Placement": ("position",),
+    "Style": ("style", "font", "bounds"),
+    "ScaleMode": ("scale",),
+    "LodMinPixelHeight": ("lod",),
+    "LodFallback": ("lod",),
+    "Priority": ("screen",),
+}
+
+
+# Pick billboards by an invisible quad over their text bounds instead of the
+# text glyphs (see _build_content); read when a billboard is built
+PICK_PROXIES = True
+
+# Draw style shared by all pick proxies
+_invisible = None
+
+
+def _invisible_style():
+    """Return the draw style shared by pick proxies: pickable, never drawn."""
+    global _invisible
+    if _invisible is None:
+        _invisible = coin.SoDrawStyle()
+        _invisible.style = coin.SoDrawStyle.INVISIBLE
+    return _invisible
+
+
+def _set_field(field, value, notify=True):
+    """Set a field, optionally without notifying the scene (and so the views)."""
+    if notify:
+        field.setValue(value)
+        return
+    flag = field.enableNotify(False)
+    field.setValue(value)
+    field.enableNotify(flag)
+
+
+# View providers changed inside batch(), flushed when it ends (None outside)
+_batch = None
+
+
+@contextlib.contextmanager
+def batch():
+    """Defer the flushes of all billboards changed inside the block to its end.
+
+    The deferred flushes then run in one pass with each billboard's root not
+    notifying the scene; every root is touched once afterwards, so the
+    viewers are notified once per billboard instead of once per field write
+    and redraw once.
+    """
+    global _batch
+    if _batch is not None:
+        yield  # nested: the outermost batch flushes
+        return
+    _batch = {}
+    try:
+        yield
+    finally:
+        pending, _batch = _batch, None
+        with BillboardInstrumentation.timed("batch_flush"):
+            for vp in pending:
+                vp._flush_quietly()
 
 
 class ViewProviderTextBillboard:
-    """ViewProvider for TextBillboard - handles 3D visualization."""
+    """ViewProvider for TextBillboard - handles 3D visualization.
+
+    Property changes only mark visual aspects dirty; a one-shot sensor
+    flushes them once per event loop turn, so several edits in a row
+    rebuild each aspect at most once.
+
+    The scene graph is built lazily: attach() only creates the root, the
+    content is built by the first flush once the billboard is visible, and
+    background, frame, texture and marker subgraphs are created the first
+    time they are needed.
+    """
 
     def __init__(self, vobj):
         """Initialize the view provider."""
@@ -16,184 +114,314 @@ class ViewProviderTextBillboard:
 
     def attach(self, vobj):
         """Called when the view provider is attached to the object."""
-        print(f"ViewProvider attach called for {vobj.Object.Name}")
+        with BillboardInstrumentation.timed("attach"):
+            self._attach(vobj)
+        BillboardInstrumentation.log("debug", f"attached {vobj.Object.Name}")
+
+    def _attach(self, vobj):
+        """Create the root and defer building the content.
+
+        Content is built by the first flush, after a document restore has
+        finished, and only once the billboard is visible.
+        """
         self.ViewObject = vobj  # Store ViewObject, access .Object when needed
-        print(f"  self.ViewObject set to: {self.ViewObject}")
-        print(f"  self.ViewObject.Object: {self.ViewObject.Object}")
-        print(f"  self id: {id(self)}")
 
-        # Root separator for the billboard
+        # Root separator for the billboard. Its per-view nodes are written
+        # without notification, so no cache above it may be used
         self.root = coin.SoSeparator()
         self.root.setName("BillboardRoot")
+        self.root.addChild(BillboardOrientation.cache_guard())
 
         # Parent node: Translation for positioning in world space
         self.translation = coin.SoTranslation()
+        self.root.addChild(self.translation)
 
-        # Rotation matrix for billboard orientation
-        self.rotation = coin.SoMatrixTransform()
-
-        # Vertical offset to shift content down (for better centering)
-        self.vertical_offset = coin.SoTranslation()
+        # Add to the view
+        vobj.addDisplayMode(self.root, "Standard")
 
-        # Separator for rotated content (text, background, frame)
+        # Deferred update state
+        self._built = False
+        self._dirty = set()
+        self._counters = {"flushes": 0, "rebuilds": 0}
+        self._flush_sensor = coin.SoOneShotSensor(
+            lambda data, sensor: self.flush(), None
+        )
+        self._flush_sensor.schedule()
+
+    def _build_content(self, obj):
+        """Build the text subgraph and start following camera and screen passes."""
+        # Camera-facing rotation: a node shared by all billboards and written
+        # per view by BillboardOrientation (see _update_scale_mode)
+        self._screen_scaled = False
+        self.rotation = BillboardOrientation.rotation_node()
+
+        # Font, materials and line style: our own, or shared with a Style
+        self._own_style = None
+        self.style = self._style_nodes(obj)
+
+        # Separator for rotated content (text, background, frame). Holds the
+        # shared rotation, whose value depends on the view being rendered,
+        # so neither it nor the root may cache
         self.billboard_content = coin.SoSeparator()
+        self.billboard_content.renderCaching = coin.SoSeparator.OFF
+        self.root.renderCaching = coin.SoSeparator.OFF
+
+        # Background and frame are built on demand (see _ensure_background,
+        # _ensure_frame), the texture path on first use of RenderMode "Texture"
+        self.background_switch = None
+        self.background_sep = None
+        self.frame_switch = None
+        self.frame_sep = None
+        self.texture_sep = None
+        self.marker_sep = None
+        self.atlas = None
+
+        # Depth factor for ScaleMode "Screen" under a perspective camera,
+        # only present in that mode (see _update_scale_mode)
+        self.depth_scale = None
+
+        # Text group - using SoText3 for 3D text
+        self.text_sep = coin.SoSeparator()
+        self.text = coin.SoText3()
+        self.text.parts = coin.SoText3.FRONT | coin.SoText3.BACK  # Render both faces
+        self._lines = None  # lines last written to self.text
+
+        self.text_sep.addChild(self.style.font)
+        self.text_sep.addChild(self.style.text_material)
+        self.text_sep.addChild(self.style.vertical_offset)  # Offset only for text
+        self.text_sep.addChild(self.text)
+
+        # Text mode switch: 0 = polygon text, 1 = textured quads
+        self.text_switch = coin.SoSwitch()
+        self.text_switch.addChild(self.text_sep)
+        self.text_switch.whichChild = 0
+
+        # Pick proxy: ray picks and preselection test one invisible quad over
+        # the text bounds, and the visuals after pick_style are unpickable,
+        # instead of intersecting every glyph triangle of the text
+        self.pick_style = coin.SoPickStyle()
+        self.pick_sep = None
+        if PICK_PROXIES:
+            self.pick_style.style = coin.SoPickStyle.UNPICKABLE
+            self.pick_sep = coin.SoSeparator()
+            self.pick_coords = coin.SoCoordinate3()
+            self.pick_face = coin.SoFaceSet()
+            self.pick_face.numVertices.setValue(4)
+            self.pick_sep.addChild(_invisible_style())
+            self.pick_sep.addChild(self.pick_coords)
+            self.pick_sep.addChild(self.pick_face)
+
+        # Build billboard content: rotation, pick proxy, then visuals
+        self.billboard_content.addChild(self.rotation)
+        if self.pick_sep is not None:
+            self.billboard_content.addChild(self.pick_sep)
+        self.billboard_content.addChild(self.pick_style)
+        self.billboard_content.addChild(self.text_switch)
+
+        # Content switch, driven by screen passes: 0 = full label, 1 = marker
+        self._hidden = set()
+        self._marker = False
+        # Set while drawn in the overlay layer (see _set_overlay)
+        self.overlay_sep = None
+        self.pick_switch = None
+        self._overlay_shown = False
+        self.content_switch = coin.SoSwitch()
+        self.content_switch.addChild(self.billboard_content)
+        self.content_switch.whichChild = 0
+
+        # Build scene graph: root -> translation -> content (rotation is inside content)
+        self.root.addChild(self.content_switch)
+        self._built = True
+
+        # Initial update
+        self._update_all(obj)
 
-        # Background group (optional)
+        BillboardScreen.register(self)
+        self._update_lod(obj)
+        self._update_scale_mode(obj)
+        BillboardOverlay.register(self)
+
+    def _ensure_background(self):
+        """Create the background subgraph the first time it is shown."""
+        if self.background_switch is not None:
+            return
         self.background_switch = coin.SoSwitch()
         self.background_switch.whichChild = coin.SO_SWITCH_NONE
 
         self.background_sep = coin.SoSeparator()
-        self.background_material = coin.SoMaterial()
         self.background_coords = coin.SoCoordinate3()
         self.background_face = coin.SoFaceSet()
         self.background_face.numVertices.setValue(4)
 
-        self.background_sep.addChild(self.background_material)
+        self.background_sep.addChild(self.style.background_material)
         self.background_sep.addChild(self.background_coords)
         self.background_sep.addChild(self.background_face)
         self.background_switch.addChild(self.background_sep)
 
-        # Frame group (optional)
+        # Right after the rotation and pick proxy, behind frame and text
+        self.billboard_content.insertChild(
+            self.background_switch, self.billboard_content.findChild(self.pick_style) + 1
+        )
+
+    def _ensure_frame(self):
+        """Create the frame subgraph the first time it is shown."""
+        if self.frame_switch is not None:
+            return
         self.frame_switch = coin.SoSwitch()
         self.frame_switch.whichChild = coin.SO_SWITCH_NONE
 
         self.frame_sep = coin.SoSeparator()
-        self.frame_color = coin.SoBaseColor()
-        self.frame_style = coin.SoDrawStyle()
-        self.frame_style.style = coin.SoDrawStyle.LINES
         self.frame_coords = coin.SoCoordinate3()
         self.frame_lines = coin.SoLineSet()
         self.frame_lines.numVertices.setValue(5)  # Closed rectangle
 
-        self.frame_sep.addChild(self.frame_color)
-        self.frame_sep.addChild(self.frame_style)
+        self.frame_sep.addChild(self.style.frame_color)
+        self.frame_sep.addChild(self.style.frame_style)
         self.frame_sep.addChild(self.frame_coords)
         self.frame_sep.addChild(self.frame_lines)
         self.frame_switch.addChild(self.frame_sep)
 
-        # Text group - using SoText3 for 3D text
-        self.text_sep = coin.SoSeparator()
-        self.font = coin.SoFont()
-        self.text_material = coin.SoMaterial()
-        self.text = coin.SoText3()
-        self.text.parts = coin.SoText3.FRONT | coin.SoText3.BACK  # Render both faces
-
-        self.text_sep.addChild(self.font)
-        self.text_sep.addChild(self.text_material)
-        self.text_sep.addChild(self.vertical_offset)  # Offset only for text
-        self.text_sep.addChild(self.text)
-
-        # Build billboard content: rotation, then visuals
-        self.billboard_content.addChild(self.rotation)
-        self.billboard_content.addChild(self.background_switch)
-        self.billboard_content.addChild(self.frame_switch)
-        self.billboard_content.addChild(self.text_sep)
-
-        # Build scene graph: root -> translation -> content (rotation is inside content)
-        self.root.addChild(self.translation)
-        self.root.addChild(self.billboard_content)
-
-        # Add to the view
-        vobj.addDisplayMode(self.root, "Standard")
-        print("  Added display mode")
-
-        # Initial update
-        self._update_all(vobj.Object)
-        print("  Updated all properties")
-
-        # Set up camera sensor to update billboard orientation
-        self._setup_camera_sensor()
-        print("  Setup complete")
-
-    def _setup_camera_sensor(self):
-        """Set up callback during render traversal to update billboard orientation."""
-        print("_setup_camera_sensor called")
-
-        # Create a callback that fires during rendering
-        def make_render_callback(view_provider):
-            def callback(user_data, action):
-                if action.isOfType(coin.SoGLRenderAction.getClassTypeId()):
-                    view_provider._update_billboard_orientation_from_action(action)
-            return callback
+        # Just before the text
+        self.billboard_content.insertChild(
+            self.frame_switch, self.billboard_content.findChild(self.text_switch)
+        )
 
-        self._render_callback = make_render_callback(self)
-        self.callback_node = coin.SoCallback()
-        self.callback_node.setCallback(self._render_callback)
-
-        # Insert callback before the rotation node
-        self.billboard_content.insertChild(self.callback_node, 0)
-        print("  Inserted render callback")
-
-
-    def _update_billboard_orientation(self):
-        """Update billboard rotation matrix to face the camera."""
-        print("_update_billboard_orientation called")
-
-        if self.ViewObject is None:
-            print("  ViewObject is None, returning")
-            return
-
-        obj = self.ViewObject.Object
-        if obj is None:
-            print("  Object is None, returning")
-            return
-
-        print(f"  obj type: {type(obj)}")
-        print(f"  obj properties: {obj.PropertiesList if hasattr(obj, 'PropertiesList') else 'N/A'}")
-        if not hasattr(obj, "Placement"):
-            print("  No Placement property, returning")
+    def _ensure_texture(self):
+        """Create the textured-quad subgraph on first use of RenderMode "Texture"."""
+        if self.texture_sep is not None:
             return
-        print(f"  Placement: {obj.Placement}")
-
-        view = FreeCADGui.ActiveDocument.ActiveView
-        if view is None:
-            print("  No ActiveView, returning")
-            return
-
-        camera = view.getCameraNode()
-        if camera is None:
-            print("  No camera, returning")
+        self.texture_sep = coin.SoSeparator()
+        self.texture_slot = coin.SoGroup()  # holds the atlas' shared SoTexture2
+        self.texture_coords = coin.SoTextureCoordinate2()
+        self.quad_coords = coin.SoCoordinate3()
+        self.quad_faces = coin.SoFaceSet()
+
+        self.texture_sep.addChild(self.style.text_material)  # shared with text_sep
+        self.texture_sep.addChild(self.style.vertical_offset)  # shared with text_sep
+        self.texture_sep.addChild(self.texture_slot)
+        self.texture_sep.addChild(self.texture_coords)
+        self.texture_sep.addChild(self.quad_coords)
+        self.texture_sep.addChild(self.quad_faces)
+        self.text_switch.addChild(self.texture_sep)
+
+    def _ensure_marker(self):
+        """Create the level-of-detail marker the first time it is needed."""
+        if self.marker_sep is not None:
             return
-
-        # This method is no longer used - see _update_billboard_orientation_from_action
-        pass
-
-    def _update_billboard_orientation_from_action(self, action):
-        """Update billboard orientation using info from render action."""
-        # Get the VIEWING matrix (camera transform) from the state
-        state = action.getState()
-        vm = coin.SoViewingMatrixElement.get(state)
-
-        # The viewing matrix transforms world to camera space
-        # We want the inverse rotation to cancel it out
-        m = vm.getValue()
-
-        # Extract rotation (upper-left 3x3) and transpose (inverse for orthogonal matrix)
-        r00, r01, r02 = m[0][0], m[1][0], m[2][0]
-        r10, r11, r12 = m[0][1], m[1][1], m[2][1]
-        r20, r21, r22 = m[0][2], m[1][2], m[2][2]
-
-        matrix = coin.SbMatrix([
-            [r00, r01, r02, 0.0],
-            [r10, r11, r12, 0.0],
-            [r20, r21, r22, 0.0],
-            [0.0, 0.0, 0.0, 1.0],
-        ])
-        self.rotation.matrix.setValue(matrix)
+        # Cheap level-of-detail stand-in: a single point marker
+        self.marker_sep = coin.SoSeparator()
+        self.marker_coords = coin.SoCoordinate3()
+        self.marker_coords.point.setValue(0, 0, 0)
+        self.marker = coin.SoMarkerSet()
+        self.marker.markerIndex = coin.SoMarkerSet.CIRCLE_FILLED_7_7
+        self.marker_sep.addChild(self.style.text_material)  # shared with text_sep
+        self.marker_sep.addChild(self.marker_coords)
+        self.marker_sep.addChild(self.marker)
+        self.content_switch.addChild(self.marker_sep)
+
+    def _style_nodes(self, obj):
+        """Return the style nodes of obj's Style, or this billboard's own."""
+        nodes = BillboardStyleViewProvider.shared_nodes(getattr(obj, "Style", None))
+        if nodes is None:
+            if self._own_style is None:
+                self._own_style = BillboardStyleViewProvider.StyleNodes()
+            nodes = self._own_style
+        return nodes
+
+    def _owns_style(self):
+        """Return True if the style nodes are this billboard's own."""
+        return self.style is self._own_style
+
+    def _update_style(self, obj):
+        """Switch to the style nodes of the current Style link."""
+        nodes = self._style_nodes(obj)
+        if nodes is not self.style:
+            old = self.style.nodes()
+            for sep in (self.text_sep, self.texture_sep, self.marker_sep,
+                        self.background_sep, self.frame_sep):
+                if sep is None:
+                    continue
+                for old_node, new_node in zip(old, nodes.nodes()):
+                    index = sep.findChild(old_node)
+                    if index >= 0:
+                        sep.replaceChild(index, new_node)
+            self.style = nodes
+        if self._owns_style():
+            self.style.update(obj)
+
+    def style_changed(self, prop):
+        """Called by a linked BillboardStyle after its font or text color changed."""
+        # The text color is in the shared style nodes already
+        if prop != "TextColor":
+            self._mark_dirty(prop)
 
     def _update_all(self, obj):
         """Update all visual elements from object properties."""
+        self._update_render_mode(obj)
         self._update_text(obj)
         self._update_font(obj)
         self._update_text_color(obj)
-        self._update_background(obj)
+        self._rebuild_bounds(obj)
+        self._update_background(obj)  # also applies the bounds when shown
         self._update_frame(obj)
         self._update_position(obj)
 
+    def _update_render_mode(self, obj):
+        """Switch between polygon text and textured quads."""
+        if getattr(obj, "RenderMode", "Polygon") == "Texture":
+            self._ensure_texture()
+            self.text_switch.whichChild = 1
+            self._update_atlas(obj)
+        else:
+            self.text_switch.whichChild = 0
+
+    def _update_atlas(self, obj):
+        """Bind the shared glyph atlas for the current font."""
+        style = BillboardStyle.source(obj)
+        atlas = BillboardAtlas.get_atlas(
+            getattr(style, "FontName", "Arial"), getattr(style, "FontSize", 24.0)
+        )
+        if atlas is not self.atlas:
+            self.atlas = atlas
+            atlas.add_listener(self)
+            self.texture_slot.removeAllChildren()
+            self.texture_slot.addChild(atlas.texture)
+        atlas.request(getattr(obj, "Text", ""))
+        self._update_quads(obj)
+
+    def _update_quads(self, obj):
+        """Re-lay out the textured quads for the current text."""
+        if self.atlas is None or not self.atlas.ready:
+            return
+        coords, texcoords, count, _width = self.atlas.layout(
+            "\n".join(self._layout(obj).lines),
+            getattr(BillboardStyle.source(obj), "FontSize", 24.0),
+            getattr(obj, "Alignment", "CENTER"),
+            getattr(obj, "LineSpacing", 1.0),
+        )
+        self.quad_coords.point.setNum(len(coords))
+        self.texture_coords.point.setNum(len(texcoords))
+        if count:
+            self.quad_coords.point.setValues(0, len(coords), coords)
+            self.texture_coords.point.setValues(0, len(texcoords), texcoords)
+        self.quad_faces.numVertices.setNum(count)
+        if count:
+            self.quad_faces.numVertices.setValues(0, count, [4] * count)
+
+    def on_atlas_ready(self, atlas):
+        """Called by the glyph atlas after new glyphs have been uploaded."""
+        if atlas is self.atlas and self.text_switch.whichChild.getValue() == 1:
+            self._update_quads(self.ViewObject.Object)
+
     def _update_text(self, obj):
         """Update the displayed text."""
         if hasattr(obj, "Text"):
-            self.text.string.setValue(obj.Text)
+            if self.text_switch.whichChild.getValue() == 1:
+                if self.atlas is not None and not self.atlas.covers(obj.Text):
+                    self.atlas.request(obj.Text)
+                self._update_quads(obj)
+            else:
+                self._set_lines(self._layout(obj).lines)
 
         if hasattr(obj, "Alignment"):
             alignment_map = {
@@ -205,68 +433,97 @@ class ViewProviderTextBillboard:
                 obj.Alignment, coin.SoText3.CENTER
             )
 
+        spacing = getattr(obj, "LineSpacing", 1.0)
+        if self.text.spacing.getValue() != spacing:
+            self.text.spacing = spacing
+
+    def _layout(self, obj):
+        """Return the (cached) line breaks and extents of obj's text."""
+        style = BillboardStyle.source(obj)
+        return BillboardMetrics.layout(
+            getattr(style, "FontName", "Arial"),
+            getattr(style, "FontSize", 24.0),
+            getattr(obj, "Text", ""),
+            getattr(obj, "MaxWidth", 0.0),
+            getattr(obj, "LineSpacing", 1.0),
+            getattr(obj, "Alignment", "CENTER"),
+        )
+
+    def _set_lines(self, lines):
+        """Write the text lines to the SoText3, only when they changed."""
+        if lines == self._lines:
+            return
+        self._lines = lines
+        self.text.string.setValues(0, len(lines), list(lines))
+        self.text.string.setNum(len(lines))
+
     def _update_font(self, obj):
-        """Update font settings."""
-        if hasattr(obj, "FontName"):
-            self.font.name.setValue(obj.FontName)
-        if hasattr(obj, "FontSize"):
-            self.font.size.setValue(obj.FontSize)
-            # Shift text for better centering
-            offset = obj.FontSize * 0.2  # positive Y (up) to center in text frame
-            self.vertical_offset.translation.setValue(0, offset, 0)
-            print(f"  Set vertical offset: {offset}")
+        """Update font settings (a linked style keeps its own nodes current)."""
+        if self._owns_style():
+            self.style.set_font(obj)
 
     def _update_text_color(self, obj):
         """Update text color."""
-        if hasattr(obj, "TextColor"):
-            color = obj.TextColor
-            self.text_material.diffuseColor.setValue(color[0], color[1], color[2])
-            self.text_material.emissiveColor.setValue(color[0], color[1], color[2])
+        if self._owns_style():
+            self.style.set_text_color(obj)
+
+    def _compute_bounds(self, obj):
+        """Return the padded (left, right, bottom, top) text box in billboard coordinates."""
+        padding = getattr(obj, "BackgroundPadding", 5.0)
+        font_size = getattr(BillboardStyle.source(obj), "FontSize", 24.0)
+        extent = self._layout(obj).extent  # already justified
+
+        # Text is shifted up by vertical_offset; keep at least one nominal
+        # line height so labels with and without descenders match
+        offset = font_size * 0.2
+        bottom = min(0.0, extent.bottom + offset)
+        top = max(font_size * 1.2, extent.top + offset)
+
+        return (
+            extent.left - padding,
+            extent.right + padding,
+            bottom - padding,
+            top + padding,
+        )
+
+    def _rebuild_bounds(self, obj):
+        """Recompute and cache the text box shared by background and frame.
+
+        Also re-wraps the polygon text, whose line breaks change with the font.
+        """
+        if BillboardInstrumentation.enabled:
+            with BillboardInstrumentation.timed("rebuild_bounds"):
+                self.bounds = self._compute_bounds(obj)
+        else:
+            self.bounds = self._compute_bounds(obj)
+        self._counters["rebuilds"] += 1
+        if self.text_switch.whichChild.getValue() == 0:
+            lines = self._layout(obj).lines
+            BillboardInstrumentation.count("rebuild_bounds.lines", len(lines))
+            self._set_lines(lines)
+        if self.pick_sep is not None:
+            self._update_pick_geometry()
+        BillboardScreen.invalidate(self)
 
     def _update_background(self, obj):
         """Update background visibility and appearance."""
         if hasattr(obj, "ShowBackground"):
             if obj.ShowBackground:
+                self._ensure_background()
                 self.background_switch.whichChild = coin.SO_SWITCH_ALL
-                self._update_background_geometry(obj)
-            else:
+                self._update_background_color(obj)
+                self._update_background_geometry()
+            elif self.background_switch is not None:
                 self.background_switch.whichChild = coin.SO_SWITCH_NONE
 
-    def _update_background_geometry(self, obj):
-        """Update background quad geometry based on text size."""
-        if hasattr(obj, "BackgroundColor"):
-            color = obj.BackgroundColor
-            self.background_material.diffuseColor.setValue(
-                color[0], color[1], color[2]
-            )
-            self.background_material.transparency.setValue(0.3)
+    def _update_background_color(self, obj):
+        """Update background material."""
+        if self._owns_style():
+            self.style.set_background_color(obj)
 
-        # Estimate text bounds (approximate based on font size and text length)
-        padding = getattr(obj, "BackgroundPadding", 5.0)
-        font_size = getattr(obj, "FontSize", 24.0)
-        text = getattr(obj, "Text", "")
-
-        # Rough estimate: each character is about 0.6 * font_size wide
-        char_width = font_size * 0.6
-        text_width = len(text) * char_width
-        text_height = font_size * 1.2
-
-        # Calculate quad corners in local billboard coordinates (XY plane)
-        half_width = (text_width / 2) + padding
-        bottom = -padding
-        top = text_height + padding
-
-        # Alignment offset
-        alignment = getattr(obj, "Alignment", "CENTER")
-        if alignment == "LEFT":
-            left = -padding
-            right = text_width + padding
-        elif alignment == "RIGHT":
-            left = -text_width - padding
-            right = padding
-        else:  # CENTER
-            left = -half_width
-            right = half_width
+    def _update_background_geometry(self):
+        """Update background quad geometry from the cached text bounds."""
+        left, right, bottom, top = self.bounds
 
         # Set quad vertices in local XY plane (Z=-0.1 to be slightly behind text)
         self.background_coords.point.setValues(0, 4, [
@@ -276,47 +533,35 @@ class ViewProviderTextBillboard:
             [left, top, -0.1],
         ])
 
+    def _update_pick_geometry(self):
+        """Update the pick proxy quad from the cached text bounds."""
+        left, right, bottom, top = self.bounds
+        self.pick_coords.point.setValues(0, 4, [
+            [left, bottom, 0],
+            [right, bottom, 0],
+            [right, top, 0],
+            [left, top, 0],
+        ])
+
     def _update_frame(self, obj):
         """Update frame visibility and appearance."""
         if hasattr(obj, "ShowFrame"):
             if obj.ShowFrame:
+                self._ensure_frame()
                 self.frame_switch.whichChild = coin.SO_SWITCH_ALL
-                self._update_frame_geometry(obj)
-            else:
+                self._update_frame_style(obj)
+                self._update_frame_geometry()
+            elif self.frame_switch is not None:
                 self.frame_switch.whichChild = coin.SO_SWITCH_NONE
 
-    def _update_frame_geometry(self, obj):
-        """Update frame line geometry."""
-        if hasattr(obj, "FrameColor"):
-            color = obj.FrameColor
-            self.frame_color.rgb.setValue(color[0], color[1], color[2])
-
-        if hasattr(obj, "FrameWidth"):
-            self.frame_style.lineWidth.setValue(obj.FrameWidth)
+    def _update_frame_style(self, obj):
+        """Update frame line color and width."""
+        if self._owns_style():
+            self.style.set_frame_style(obj)
 
-        # Use same bounds calculation as background
-        padding = getattr(obj, "BackgroundPadding", 5.0)
-        font_size = getattr(obj, "FontSize", 24.0)
-        text = getattr(obj, "Text", "")
-
-        char_width = font_size * 0.6
-        text_width = len(text) * char_width
-        text_height = font_size * 1.2
-
-        half_width = (text_width / 2) + padding
-        bottom = -padding
-        top = text_height + padding
-
-        alignment = getattr(obj, "Alignment", "CENTER")
-        if alignment == "LEFT":
-            left = -padding
-            right = text_width + padding
-        elif alignment == "RIGHT":
-            left = -text_width - padding
-            right = padding
-        else:  # CENTER
-            left = -half_width
-            right = half_width
+    def _update_frame_geometry(self):
+        """Update frame line geometry from the cached text bounds."""
+        left, right, bottom, top = self.bounds
 
         # Set line vertices in local XY plane (closed rectangle)
         self.frame_coords.point.setValues(0, 5, [
@@ -332,50 +577,271 @@ class ViewProviderTextBillboard:
         if hasattr(obj, "Placement"):
             pos = obj.Placement.Base
             self.translation.translation.setValue(pos.x, pos.y, pos.z)
+            BillboardScreen.invalidate(self, moved=True)
+
+    def _set_hidden(self, reason, hidden):
+        """Hide or show the label on behalf of a screen pass."""
+        if hidden:
+            self._hidden.add(reason)
+        else:
+            self._hidden.discard(reason)
+        self._apply_content_switch()
+
+    def _set_marker(self, marker):
+        """Draw the level-of-detail marker instead of the full label."""
+        if marker:
+            self._ensure_marker()
+        self._marker = marker
+        self._apply_content_switch()
+
+    def _show_screen_results(self, hidden, marker):
+        """Show the screen pass results of another view, without notification."""
+        self._hidden = set(hidden)
+        self._marker = marker
+        self._apply_content_switch(notify=False)
+
+    def screen_results(self):
+        """Return (reasons the label is hidden for, marker shown, depth scale or None)."""
+        depth = None
+        if self.depth_scale is not None:
+            depth = self.depth_scale.scaleFactor.getValue()[0]
+        return frozenset(self._hidden), self._marker, depth
+
+    def _apply_content_switch(self, notify=True):
+        """Set the content switch, writing the field only when it changes."""
+        if self._hidden:
+            which = coin.SO_SWITCH_NONE
+        else:
+            which = 1 if self._marker else 0
+        if self.content_switch.whichChild.getValue() != which:
+            _set_field(self.content_switch.whichChild, which, notify)
+        if self.pick_switch is not None:
+            # Only a full label is picked by its in-scene quad
+            which = 0 if which == 0 else coin.SO_SWITCH_NONE
+            if self.pick_switch.whichChild.getValue() != which:
+                _set_field(self.pick_switch.whichChild, which, notify)
+
+    def _set_overlay(self, overlay):
+        """Move the label's visuals into the document's overlay layer, or back.
+
+        In the overlay, the root keeps the translation and a copy of the pick
+        quad under the same rotation, so picks still find this billboard.
+        """
+        if overlay == (self.overlay_sep is not None):
+            return
+        if overlay:
+            self.overlay_sep = coin.SoSeparator()
+            self.overlay_sep.renderCaching = coin.SoSeparator.OFF
+            self.overlay_sep.addChild(BillboardOrientation.cache_guard())
+            self.overlay_sep.addChild(self.translation)  # shared with the root
+            self.root.removeChild(self.content_switch)
+            self.overlay_sep.addChild(self.content_switch)
+            if self.pick_sep is not None:
+                self.pick_switch = coin.SoSwitch()
+                self.pick_switch.addChild(coin.SoSeparator())
+                self.root.addChild(self.pick_switch)
+                self._update_pick_twin()
+                self._apply_content_switch()
+            self._show_overlay(self.ViewObject.Visibility)
+        else:
+            self._show_overlay(False)
+            if self.pick_switch is not None:
+                self.root.removeChild(self.pick_switch)
+                self.pick_switch = None
+            self.root.addChild(self.content_switch)
+            self.overlay_sep = None
+
+    def _show_overlay(self, shown):
+        """Add the overlay node to its layer or take it out, following Visibility."""
+        if shown == self._overlay_shown:
+            return
+        self._overlay_shown = shown
+        if shown:
+            BillboardOverlay.add(self.screen_document(), self.overlay_sep)
+        else:
+            BillboardOverlay.remove(self.screen_document(), self.overlay_sep)
+
+    def _update_pick_twin(self):
+        """Give the in-scene pick quad the same scale and rotation as the label."""
+        if self.pick_switch is None:
+            return
+        twin = self.pick_switch.getChild(0)
+        twin.removeAllChildren()
+        if self.depth_scale is not None:
+            twin.addChild(self.depth_scale)
+        twin.addChild(self.rotation)
+        twin.addChild(self.pick_sep)
+
+    def screen_document(self):
+        """Return the name of the document this billboard belongs to."""
+        return self.ViewObject.Object.Document.Name
+
+    def screen_anchor(self):
+        """Return the world-space anchor used by screen passes."""
+        pos = self.ViewObject.Object.Placement.Base
+        return (pos.x, pos.y, pos.z)
+
+    def screen_priority(self):
+        """Return the declutter priority (higher wins)."""
+        return getattr(self.ViewObject.Object, "Priority", 0)
+
+    def screen_font_size(self):
+        """Return the font size in world units (pixels in ScaleMode "Screen")."""
+        return getattr(BillboardStyle.source(self.ViewObject.Object), "FontSize", 24.0)
+
+    def screen_lod(self):
+        """Return (LodMinPixelHeight, LodFallback)."""
+        obj = self.ViewObject.Object
+        return (getattr(obj, "LodMinPixelHeight", 0.0),
+                getattr(obj, "LodFallback", "Marker"))
+
+    def _update_lod(self, obj):
+        """Register with the screen passes if a LOD threshold is set."""
+        BillboardScreen.set_lod_user(self, getattr(obj, "LodMinPixelHeight", 0.0) > 0.0)
+
+    def _update_scale_mode(self, obj):
+        """Use the world or the pixel-scaled shared orientation node."""
+        screen = getattr(obj, "ScaleMode", "World") == "Screen"
+        if screen == self._screen_scaled:
+            return
+        self._screen_scaled = screen
+        rotation = BillboardOrientation.rotation_node(screen)
+        self.billboard_content.replaceChild(self.rotation, rotation)
+        self.rotation = rotation
+        if screen:
+            self.depth_scale = coin.SoScale()
+            self.billboard_content.insertChild(self.depth_scale, 0)
+        else:
+            self.billboard_content.removeChild(self.depth_scale)
+            self.depth_scale = None
+        self._update_pick_twin()
+        BillboardScreen.set_screen_scaled(self, screen)
+
+    def _set_depth_scale(self, depth, notify=True):
+        """Scale a pixel-sized billboard by its depth, writing only on change."""
+        if self.depth_scale is None:
+            return
+        if self.depth_scale.scaleFactor.getValue()[0] != depth:
+            _set_field(self.depth_scale.scaleFactor, coin.SbVec3f(depth, depth, depth), notify)
 
     def updateData(self, fp, prop):
         """Called when a data property of the object changes."""
-        if prop == "Text":
-            self._update_text(fp)
-            if fp.ShowBackground:
-                self._update_background_geometry(fp)
-            if fp.ShowFrame:
-                self._update_frame_geometry(fp)
-        elif prop == "FontSize":
-            self._update_font(fp)
-            if fp.ShowBackground:
-                self._update_background_geometry(fp)
-            if fp.ShowFrame:
-                self._update_frame_geometry(fp)
-        elif prop == "FontName":
-            self._update_font(fp)
-        elif prop == "TextColor":
-            self._update_text_color(fp)
-        elif prop == "Alignment":
-            self._update_text(fp)
-            if fp.ShowBackground:
-                self._update_background_geometry(fp)
-            if fp.ShowFrame:
-                self._update_frame_geometry(fp)
-        elif prop == "ShowBackground":
-            self._update_background(fp)
-        elif prop in ("BackgroundColor", "BackgroundPadding"):
-            if fp.ShowBackground:
-                self._update_background_geometry(fp)
-            if fp.ShowFrame:
-                self._update_frame_geometry(fp)
-        elif prop == "ShowFrame":
-            self._update_frame(fp)
-        elif prop in ("FrameColor", "FrameWidth"):
-            if fp.ShowFrame:
-                self._update_frame_geometry(fp)
-        elif prop == "Placement":
-            self._update_position(fp)
-            self._update_billboard_orientation()
+        if BillboardInstrumentation.enabled:
+            with BillboardInstrumentation.timed("updateData." + prop):
+                self._mark_dirty(prop)
+        else:
+            self._mark_dirty(prop)
+
+    def _mark_dirty(self, prop):
+        """Mark the aspects affected by prop dirty and schedule a flush."""
+        aspects = PROPERTY_ASPECTS.get(prop)
+        if aspects is None or not hasattr(self, "_dirty"):
+            return
+        self._dirty.update(aspects)
+        if _batch is not None:
+            _batch[self] = None
+        elif not self._flush_sensor.isScheduled():
+            self._flush_sensor.schedule()
+
+    def flush(self):
+        """Apply all pending property changes now."""
+        if self._flush_sensor.isScheduled():
+            self._flush_sensor.unschedule()
+        obj = self.ViewObject.Object
+        if not self._built:
+            # Hidden billboards stay unbuilt until first shown (see onChanged)
+            if self.ViewObject.Visibility:
+                with BillboardInstrumentation.timed("build"):
+                    self._build_content(obj)
+                self._dirty.clear()
+            return
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        self._counters["flushes"] += 1
+        if BillboardInstrumentation.enabled:
+            for aspect in dirty:
+                BillboardInstrumentation.count("flush." + aspect)
+        with BillboardInstrumentation.timed("flush"):
+            self._apply(dirty, obj)
+
+    def _flush_quietly(self):
+        """Flush without notifying the scene per field write, then touch the root once."""
+        # In the overlay, the visuals notify the scene through overlay_sep
+        nodes = [self.root]
+        if getattr(self, "overlay_sep", None) is not None:
+            nodes.append(self.overlay_sep)
+        notify = [node.enableNotify(False) for node in nodes]
+        try:
+            self.flush()
+        finally:
+            for node, flag in zip(nodes, notify):
+                node.enableNotify(flag)
+        for node in nodes:
+            node.touch()
+
+    def _apply(self, dirty, obj):
+        """Apply the given dirty aspects from obj's properties."""
+        texture = getattr(obj, "RenderMode", "Polygon") == "Texture"
+
+        if "style" in dirty:
+            self._update_style(obj)
+        if "render_mode" in dirty:
+            self._update_render_mode(obj)
+            if not texture:
+                dirty.add("text")  # SoText3 is not kept current in texture mode
+        if "font" in dirty:
+            self._update_font(obj)
+            if texture and "render_mode" not in dirty:
+                self._update_atlas(obj)
+        if "text" in dirty:
+            self._update_text(obj)
+        if "color" in dirty:
+            self._update_text_color(obj)
+
+        if "bounds" in dirty:
+            self._rebuild_bounds(obj)
+        if "background" in dirty:
+            self._update_background(obj)
+        elif "bounds" in dirty and obj.ShowBackground:
+            self._update_background_geometry()
+        if "frame" in dirty:
+            self._update_frame(obj)
+        elif "bounds" in dirty and obj.ShowFrame:
+            self._update_frame_geometry()
+
+        if "position" in dirty:
+            self._update_position(obj)
+        if "scale" in dirty:
+            self._update_scale_mode(obj)
+        if "lod" in dirty:
+            self._update_lod(obj)
+        elif "screen" in dirty:
+            BillboardScreen.invalidate(self)
+
+    def is_built(self):
+        """Return True once the billboard content has been built."""
+        return getattr(self, "_built", False)
+
+    def get_update_counters(self):
+        """Return how many flushes and bounds rebuilds have happened."""
+        return dict(self._counters)
+
+    def reset_update_counters(self):
+        """Reset the flush and rebuild counters to zero."""
+        for key in self._counters:
+            self._counters[key] = 0
 
     def onChanged(self, vp, prop):
         """Called when a view property changes."""
-        pass
+        if prop != "Visibility":
+            return
+        if not getattr(self, "_built", True) and vp.Visibility:
+            if not self._flush_sensor.isScheduled():
+                self._flush_sensor.schedule()
+        elif getattr(self, "overlay_sep", None) is not None:
+            # The overlay is outside the root FreeCAD hides
+            self._show_overlay(vp.Visibility)
 
     def getDisplayModes(self, vobj):
         """Return available display modes."""
@@ -403,9 +869,12 @@ class ViewProviderTextBillboard:
         return True
 
     def _cleanup_sensors(self):
-        """Cleanup callback node."""
-        # No sensors to detach - using render callback instead
-        pass
+        """Cancel pending updates and leave the screen passes."""
+        BillboardScreen.unregister(self)
+        BillboardOverlay.unregister(self)
+        sensor = getattr(self, "_flush_sensor", None)
+        if sensor is not None and sensor.isScheduled():
+            sensor.unschedule()
 
     def dumps(self):
         """Serialize for saving."""
@@ -413,7 +882,5 @@ class ViewProviderTextBillboard:
 
     def loads(self, state):
         """Deserialize when loading."""
-        # Re-setup camera sensor after loading
-        if hasattr(self, 'root') and self.root:
-            self._setup_camera_sensor()
+        # The content, with the shared rotation, is rebuilt after attach()
         return None
@@ -24,8 +24,15 @@ class BillboardWorkbench(FreeCADGui.Workbench):
         """Called when the workbench is first loaded."""
         import BillboardCommand  # noqa: F401 - registers commands
 
-        self.appendToolbar("Billboard Tools", ["CreateTextBillboard"])
-        self.appendMenu("Billboard", ["CreateTextBillboard"])
+        commands = [
+            "CreateTextBillboard", "CreateAnchoredBillboards", "EditTextBillboards",
+            "ImportTextBillboards", "ExportTextBillboards", "CreateBillboardCloud",
+            "ConvertToBillboardCloud", "CreateBillboardStyle", "Separator",
+            "ToggleBillboardDeclutter", "ToggleBillboardCulling", "ToggleBillboardClustering",
+            "ToggleBillboardOverlay",
+        ]
+        self.appendToolbar("Billboard Tools", commands)
+        self.appendMenu("Billboard", commands)
 
     def Activated(self):
         """Called when the workbench is activated."""
@@ -0,0 +1,122 @@
+"""Frame-time benchmark: per-billboard render callbacks vs shared orientation.
+
+Renders N billboard-like subgraphs offscreen while orbiting the camera and
+reports the mean frame time for
+
+* ``callback`` - the previous approach, one Python SoCallback per billboard
+  building a fresh SbMatrix every frame, and
+* ``shared`` - one BillboardOrientation.ViewOrientation per view, with every
+  billboard inserting the shared rotation node.
+
+With the workbench installed, run from the FreeCAD Python console (GUI, an
+OpenGL context is required):
+
+    exec(open("/path/to/Billboard/benchmarks/bench_orientation.py").read())
+"""
+
+import math
+import time
+
+from pivy import coin
+
+import BillboardOrientation
+
+
+COUNTS = (10, 100, 1000, 10000)
+FRAMES = 60
+
+
+def _legacy_callback(rotation):
+    """Replicate the old per-billboard render callback."""
+    def callback(user_data, action):
+        if action.isOfType(coin.SoGLRenderAction.getClassTypeId()):
+            m = coin.SoViewingMatrixElement.get(action.getState()).getValue()
+            rotation.matrix.setValue(coin.SbMatrix([
+                [m[0][0], m[1][0], m[2][0], 0.0],
+                [m[0][1], m[1][1], m[2][1], 0.0],
+                [m[0][2], m[1][2], m[2][2], 0.0],
+                [0.0, 0.0, 0.0, 1.0],
+            ]))
+    return callback
+
+
+def build_scene(count, mode):
+    """Build a camera + ``count`` billboards using the given orientation mode."""
+    root = coin.SoSeparator()
+    camera = coin.SoPerspectiveCamera()
+    root.addChild(camera)
+    root.addChild(coin.SoDirectionalLight())
+
+    # Billboards live below the camera, like a view's scene graph
+    scene = coin.SoSeparator()
+    root.addChild(scene)
+    keep_alive = []
+
+    side = max(1, int(math.ceil(math.sqrt(count))))
+    for i in range(count):
+        sep = coin.SoSeparator()
+        translation = coin.SoTranslation()
+        translation.translation.setValue((i % side) * 4.0, (i // side) * 4.0, 0.0)
+        if mode == "callback":
+            rotation = coin.SoMatrixTransform()
+            cb = _legacy_callback(rotation)
+            keep_alive.append(cb)
+            node = coin.SoCallback()
+            node.setCallback(cb)
+            sep.addChild(translation)
+            sep.addChild(node)
+        else:
+            rotation = BillboardOrientation.get_shared_rotation()
+            sep.renderCaching = coin.SoSeparator.OFF
+            sep.addChild(translation)
+        sep.addChild(rotation)
+        marker = coin.SoCube()
+        marker.width = marker.height = 1.0
+        marker.depth = 0.1
+        sep.addChild(marker)
+        scene.addChild(sep)
+
+    provider = None
+    if mode == "shared":
+        provider = BillboardOrientation.ViewOrientation(scene)
+
+    return root, camera, provider, keep_alive
+
+
+def time_frames(count, mode, frames=FRAMES, size=(640, 480)):
+    """Return the mean frame time in milliseconds."""
+    viewport = coin.SbViewportRegion(*size)
+    renderer = coin.SoOffscreenRenderer(viewport)
+    root, camera, provider, keep_alive = build_scene(count, mode)
+    camera.viewAll(root, viewport)
+    distance = camera.position.getValue().length()
+
+    renderer.render(root)  # warm-up, builds caches
+    start = time.perf_counter()
+    for frame in range(frames):
+        angle = 2.0 * math.pi * frame / frames
+        camera.orientation.setValue(coin.SbRotation(coin.SbVec3f(0, 1, 0), angle))
+        camera.position.setValue(
+            distance * math.sin(angle), 0.0, distance * math.cos(angle))
+        renderer.render(root)
+    elapsed = time.perf_counter() - start
+
+    if provider is not None:
+        provider.remove()
+    return 1000.0 * elapsed / frames
+
+
+def run(counts=COUNTS, frames=FRAMES):
+    """Run the benchmark and print a table of mean frame times."""
+    results = []
+    print(f"{'billboards':>10} {'callback ms':>12} {'shared ms':>10} {'speedup':>8}")
+    for count in counts:
+        legacy = time_frames(count, "callback", frames)
+        shared = time_frames(count, "shared", frames)
+        results.append({"count": count, "callback_ms": legacy, "shared_ms": shared})
+        print(f"{count:>10} {legacy:>12.2f} {shared:>10.2f} {legacy / shared:>7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run()
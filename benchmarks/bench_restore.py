@@ -0,0 +1,100 @@
+"""Restore-time benchmark: lazy scene-graph construction on document open.
+
+Creates a document with N billboards, saves it to a temporary file, closes
+it and reopens it, reporting
+
+* ``open ms`` - time spent in FreeCAD.openDocument, and
+* ``idle ms`` - time until the first event loop turn has run, i.e. until the
+  deferred flushes have built every visible billboard,
+
+for visible and hidden billboards, with and without background and frame.
+The ``built`` column counts billboards whose content has been built; hidden
+billboards should stay at 0. Run the same script against a previous release
+of the workbench to compare.
+
+With the workbench installed, run from the FreeCAD Python console (GUI):
+
+    exec(open("/path/to/Billboard/benchmarks/bench_restore.py").read())
+"""
+
+import os
+import tempfile
+import time
+
+import FreeCAD
+import FreeCADGui
+
+import BillboardObject
+
+
+COUNTS = (100, 1000, 5000, 20000)
+
+SCENARIOS = (
+    ("visible", True, False),
+    ("visible+decor", True, True),
+    ("hidden", False, False),
+    ("hidden+decor", False, True),
+)
+
+
+def _items(count, decor):
+    """Yield create_many items laid out on a grid."""
+    side = max(1, int(count ** 0.5))
+    for i in range(count):
+        yield {
+            "Text": f"Label {i}",
+            "Position": ((i % side) * 50.0, (i // side) * 50.0, 0.0),
+            "ShowBackground": decor,
+            "ShowFrame": decor,
+        }
+
+
+def _save(count, visible, decor, path):
+    """Create, save and close a document with count billboards."""
+    doc = FreeCAD.newDocument("BillboardRestoreBench")
+    BillboardObject.create_many(_items(count, decor), doc=doc)
+    if not visible:
+        for obj in doc.Objects:
+            obj.ViewObject.Visibility = False
+    FreeCADGui.updateGui()
+    doc.saveAs(path)
+    FreeCAD.closeDocument(doc.Name)
+
+
+def time_restore(count, visible, decor):
+    """Return (open ms, idle ms, built count) for reopening a saved document."""
+    path = os.path.join(tempfile.mkdtemp(), "restore_bench.FCStd")
+    _save(count, visible, decor, path)
+
+    start = time.perf_counter()
+    doc = FreeCAD.openDocument(path)
+    opened = time.perf_counter()
+    FreeCADGui.updateGui()
+    idle = time.perf_counter()
+
+    built = sum(
+        1 for obj in doc.Objects
+        if getattr(obj.ViewObject.Proxy, "is_built", lambda: True)()
+    )
+    FreeCAD.closeDocument(doc.Name)
+    os.remove(path)
+    return 1000.0 * (opened - start), 1000.0 * (idle - start), built
+
+
+def run(counts=COUNTS, scenarios=SCENARIOS):
+    """Run the benchmark and print a table of restore times."""
+    results = []
+    print(f"{'billboards':>10} {'scenario':>14} {'open ms':>10} {'idle ms':>10} {'built':>7}")
+    for count in counts:
+        for name, visible, decor in scenarios:
+            open_ms, idle_ms, built = time_restore(count, visible, decor)
+            results.append({
+                "count": count, "scenario": name,
+                "open_ms": open_ms, "idle_ms": idle_ms, "built": built,
+            })
+            print(f"{count:>10} {name:>14} {open_ms:>10.1f} {idle_ms:>10.1f} {built:>7}")
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,93 @@
+"""Node-count benchmark: per-billboard style nodes vs a shared BillboardStyle.
+
+Creates N billboards (with background and frame) once with their own style
+settings and once linked to one BillboardStyle, and reports
+
+* ``nodes`` - distinct Coin nodes below all billboard roots,
+* ``per bb`` - nodes per billboard, and
+* ``recolor ms`` - time to change the text color of every label and let the
+  deferred updates run: N TextColor edits without a style, one style edit
+  with it.
+
+With the workbench installed, run from the FreeCAD Python console (GUI):
+
+    exec(open("/path/to/Billboard/benchmarks/bench_style.py").read())
+"""
+
+import time
+
+import FreeCAD
+import FreeCADGui
+from pivy import coin
+
+import BillboardObject
+import BillboardStyle
+
+
+COUNTS = (100, 1000, 5000)
+
+
+def count_nodes(roots):
+    """Return the number of distinct nodes reachable from roots."""
+    seen = set()
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        key = int(node.this)
+        if key in seen:
+            continue
+        seen.add(key)
+        if node.isOfType(coin.SoGroup.getClassTypeId()):
+            stack.extend(node.getChild(i) for i in range(node.getNumChildren()))
+    return len(seen)
+
+
+def measure(count, shared):
+    """Return (node count, recolor ms) for count billboards."""
+    doc = FreeCAD.newDocument("BillboardStyleBench")
+    style = BillboardStyle.create("Style") if shared else None
+    side = max(1, int(count ** 0.5))
+    BillboardObject.create_many(
+        {
+            "Text": f"Label {i}",
+            "Position": ((i % side) * 50.0, (i // side) * 50.0, 0.0),
+            "ShowBackground": True,
+            "ShowFrame": True,
+            **({"Style": style} if shared else {}),
+        }
+        for i in range(count)
+    )
+    FreeCADGui.updateGui()
+
+    billboards = [o for o in doc.Objects if not BillboardStyle.is_style(o)]
+    nodes = count_nodes(o.ViewObject.Proxy.root for o in billboards)
+
+    start = time.perf_counter()
+    if shared:
+        style.TextColor = (1.0, 0.0, 0.0)
+    else:
+        for obj in billboards:
+            obj.TextColor = (1.0, 0.0, 0.0)
+    FreeCADGui.updateGui()
+    recolor = time.perf_counter() - start
+
+    FreeCAD.closeDocument(doc.Name)
+    return nodes, 1000.0 * recolor
+
+
+def run(counts=COUNTS):
+    """Run the benchmark and print a table of node counts and recolor times."""
+    results = []
+    print(f"{'billboards':>10} {'mode':>7} {'nodes':>9} {'per bb':>7} {'recolor ms':>11}")
+    for count in counts:
+        for mode in ("own", "shared"):
+            nodes, recolor_ms = measure(count, mode == "shared")
+            results.append({
+                "count": count, "mode": mode, "nodes": nodes, "recolor_ms": recolor_ms,
+            })
+            print(f"{count:>10} {mode:>7} {nodes:>9} {nodes / count:>7.1f} {recolor_ms:>11.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,738 @@
+"""Headless stand-in for the FreeCAD App module.
+
+Implements the subset of the App API the workbench uses: documents with
+FeaturePython objects and typed properties, transactions, preferences,
+Console, Vector/Placement, links/InList and a JSON save/restore. Property
+changes notify the object proxy (onChanged), the view provider proxy
+(updateData) and document observers (slotChangedObject) like FreeCAD does.
+
+Only for benchmarks/run_headless.py; not a general FreeCAD replacement.
+"""
+
+import copy
+import importlib
+import json
+import math
+import os
+import tempfile
+
+
+GuiUp = True
+ActiveDocument = None
+
+_documents = {}
+_observers = []
+_parameters = {}
+_temp_dir = tempfile.mkdtemp(prefix="freecad_headless_")
+
+
+# -- Console ----------------------------------------------------------------
+
+class _Console:
+    """Collects messages instead of printing, so benchmark output stays JSON."""
+
+    def __init__(self):
+        self.messages = []
+        self.echo = False
+
+    def _print(self, kind, text):
+        self.messages.append((kind, text))
+        if len(self.messages) > 1000:
+            del self.messages[:500]
+        if self.echo:
+            import sys
+            sys.stderr.write(text)
+
+    def PrintMessage(self, text):
+        self._print("message", text)
+
+    def PrintWarning(self, text):
+        self._print("warning", text)
+
+    def PrintError(self, text):
+        self._print("error", text)
+
+    def PrintLog(self, text):
+        self._print("log", text)
+
+    def errors(self):
+        """Return the error messages printed so far."""
+        return [text for kind, text in self.messages if kind == "error"]
+
+
+Console = _Console()
+
+
+# -- Preferences --------------------------------------------------------------
+
+class _ParamGroup:
+    def __init__(self):
+        self._values = {}
+
+    def _get(self, kind, name, default):
+        return self._values.get((kind, name), default)
+
+    def _set(self, kind, name, value):
+        self._values[(kind, name)] = value
+
+    def GetBool(self, name, default=False):
+        return self._get("bool", name, default)
+
+    def SetBool(self, name, value):
+        self._set("bool", name, bool(value))
+
+    def GetInt(self, name, default=0):
+        return self._get("int", name, default)
+
+    def SetInt(self, name, value):
+        self._set("int", name, int(value))
+
+    def GetFloat(self, name, default=0.0):
+        return self._get("float", name, default)
+
+    def SetFloat(self, name, value):
+        self._set("float", name, float(value))
+
+    def GetString(self, name, default=""):
+        return self._get("string", name, default)
+
+    def SetString(self, name, value):
+        self._set("string", name, str(value))
+
+
+def ParamGet(path):
+    """Return the (in-memory) parameter group for path."""
+    return _parameters.setdefault(path, _ParamGroup())
+
+
+def getUserAppDataDir():
+    return _temp_dir
+
+
+def getResourceDir():
+    return _temp_dir
+
+
+# -- Base types -----------------------------------------------------------------
+
+class Vector:
+    """3D vector."""
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, (Vector, tuple, list)):
+            x, y, z = x
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and tuple(self) == tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __add__(self, other):
+        return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, factor):
+        return Vector(self.x * factor, self.y * factor, self.z * factor)
+
+    def __repr__(self):
+        return f"Vector ({self.x}, {self.y}, {self.z})"
+
+    @property
+    def Length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def cross(self, other):
+        return Vector(self.y * other.z - self.z * other.y,
+                      self.z * other.x - self.x * other.z,
+                      self.x * other.y - self.y * other.x)
+
+    def normalize(self):
+        """Normalize in place and return self, as FreeCAD does."""
+        length = self.Length
+        if length == 0.0:
+            raise ValueError("Cannot normalize null vector")
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+        return self
+
+
+class Rotation:
+    """Rotation; only the identity is supported."""
+
+    def __init__(self, *args):
+        self.Q = (0.0, 0.0, 0.0, 1.0)
+
+    def multVec(self, vector):
+        return Vector(vector)
+
+
+class Placement:
+    """Position and (identity) rotation."""
+
+    def __init__(self, base=None, rotation=None):
+        self.Base = Vector(base) if base is not None else Vector()
+        self.Rotation = rotation if rotation is not None else Rotation()
+
+    def copy(self):
+        return Placement(self.Base, self.Rotation)
+
+    def multVec(self, vector):
+        return self.Rotation.multVec(vector) + self.Base
+
+    def __eq__(self, other):
+        return isinstance(other, Placement) and self.Base == other.Base
+
+
+# -- Properties -----------------------------------------------------------------
+
+def _color(value):
+    value = tuple(float(c) for c in value)
+    return value + (0.0,) * (4 - len(value)) if len(value) < 4 else value[:4]
+
+
+_CONVERT = {
+    "App::PropertyFloat": float,
+    "App::PropertyLength": float,
+    "App::PropertyDistance": float,
+    "App::PropertyAngle": float,
+    "App::PropertyPercent": int,
+    "App::PropertyInteger": int,
+    "App::PropertyBool": bool,
+    "App::PropertyString": str,
+    "App::PropertyColor": _color,
+    "App::PropertyVector": Vector,
+    "App::PropertyPlacement": lambda p: p.copy(),
+    "App::PropertyStringList": lambda v: [str(s) for s in v],
+    "App::PropertyVectorList": lambda v: [Vector(p) for p in v],
+    "App::PropertyColorList": lambda v: [_color(c) for c in v],
+    "App::PropertyFloatList": lambda v: [float(f) for f in v],
+    "App::PropertyIntegerList": lambda v: [int(i) for i in v],
+}
+
+_DEFAULTS = {
+    "App::PropertyFloat": 0.0,
+    "App::PropertyLength": 0.0,
+    "App::PropertyDistance": 0.0,
+    "App::PropertyAngle": 0.0,
+    "App::PropertyPercent": 0,
+    "App::PropertyInteger": 0,
+    "App::PropertyBool": False,
+    "App::PropertyString": "",
+    "App::PropertyColor": (0.0, 0.0, 0.0, 0.0),
+    "App::PropertyVector": Vector(),
+    "App::PropertyPlacement": Placement(),
+    "App::PropertyStringList": [],
+    "App::PropertyVectorList": [],
+    "App::PropertyColorList": [],
+    "App::PropertyFloatList": [],
+    "App::PropertyIntegerList": [],
+}
+
+_LINK_TYPES = ("App::PropertyLink", "App::PropertyLinkGlobal", "App::PropertyLinkChild")
+_LINK_SUB_TYPES = ("App::PropertyLinkSub", "App::PropertyLinkSubGlobal")
+
+
+class _Property:
+    __slots__ = ("type", "group", "doc", "value", "options", "status")
+
+    def __init__(self, type_id, group, doc):
+        self.type = type_id
+        self.group = group
+        self.doc = doc
+        self.options = []
+        self.status = set()
+        default = _DEFAULTS.get(type_id)
+        self.value = copy.copy(default) if isinstance(default, list) else default
+        if type_id == "App::PropertyPlacement":
+            self.value = Placement()
+
+    def set(self, value):
+        if self.type == "App::PropertyEnumeration":
+            if isinstance(value, (list, tuple)):
+                self.options = [str(v) for v in value]
+                if self.value not in self.options:
+                    self.value = self.options[0] if self.options else None
+                return
+            if isinstance(value, int):
+                value = self.options[value]
+            if value not in self.options:
+                raise ValueError(f"'{value}' is not part of the enumeration")
+            self.value = value
+        elif self.type in _LINK_SUB_TYPES:
+            if value is None:
+                self.value = None
+            elif isinstance(value, DocumentObject):
+                self.value = (value, [])
+            else:
+                target, subs = value
+                self.value = (target, [subs] if isinstance(subs, str) else list(subs))
+        elif value is None or self.type in _LINK_TYPES or self.type not in _CONVERT:
+            self.value = value
+        else:
+            self.value = _CONVERT[self.type](value)
+
+    def get(self):
+        value = self.value
+        if isinstance(value, list):
+            return list(value)
+        if isinstance(value, Placement):
+            return value.copy()
+        if isinstance(value, Vector):
+            return Vector(value)
+        return value
+
+    def links(self):
+        """Return the objects this property links to."""
+        if self.type in _LINK_TYPES:
+            return [self.value] if self.value is not None else []
+        if self.type in _LINK_SUB_TYPES:
+            return [self.value[0]] if self.value is not None else []
+        return []
+
+
+# -- Documents ----------------------------------------------------------------
+
+class DocumentObject:
+    """FeaturePython-like document object with dynamic properties."""
+
+    def __init__(self, document, type_id, name):
+        d = self.__dict__
+        d["Document"] = document
+        d["TypeId"] = type_id
+        d["Name"] = name
+        d["Label"] = name
+        d["_props"] = {}
+        d["_proxy"] = None
+        d["ViewObject"] = None
+
+    # Properties ------------------------------------------------------------
+
+    def addProperty(self, type_id, name, group="", doc="", attr=0, read_only=False, hidden=False):
+        if name in self._props:
+            raise ValueError(f"Property {name} already exists")
+        self._props[name] = _Property(type_id, group, doc)
+        return self
+
+    def removeProperty(self, name):
+        return self._props.pop(name, None) is not None
+
+    @property
+    def PropertiesList(self):
+        return list(self._props)
+
+    def getTypeIdOfProperty(self, name):
+        return self._props[name].type
+
+    def getGroupOfProperty(self, name):
+        return self._props[name].group
+
+    def getEnumerationsOfProperty(self, name):
+        return list(self._props[name].options)
+
+    def getPropertyByName(self, name):
+        return getattr(self, name)
+
+    def setEditorMode(self, name, mode):
+        self.__dict__.setdefault("_editor_modes", {})[name] = mode
+
+    def getEditorMode(self, name):
+        return self.__dict__.get("_editor_modes", {}).get(name, 0)
+
+    def setPropertyStatus(self, name, status):
+        """Set status bits like "Transient"; a leading "-" clears the bit."""
+        prop = self._props[name]
+        for bit in [status] if isinstance(status, str) else status:
+            if bit.startswith("-"):
+                prop.status.discard(bit[1:])
+            else:
+                prop.status.add(bit)
+
+    def getPropertyStatus(self, name):
+        return sorted(self._props[name].status)
+
+    def __getattr__(self, name):
+        props = self.__dict__.get("_props")
+        if props is not None and name in props:
+            return props[name].get()
+        if name == "Proxy":
+            return self.__dict__["_proxy"]
+        raise AttributeError(f"'{self.TypeId}' object has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        if name in self._props:
+            prop = self._props[name]
+            if prop.type in _LINK_TYPES or prop.type in _LINK_SUB_TYPES:
+                self.Document._count_links(prop, -1)
+                prop.set(value)
+                self.Document._count_links(prop, 1)
+            else:
+                prop.set(value)
+            self._changed(name)
+        elif name == "Proxy":
+            self.__dict__["_proxy"] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def _changed(self, name):
+        document = self.Document
+        if document._restoring:
+            return
+        # Like FreeCAD, changes of Output properties do not touch the object
+        if "Output" not in self._props[name].status:
+            document._touched.add(self.Name)
+        proxy = self._proxy
+        if proxy is not None and hasattr(proxy, "onChanged"):
+            proxy.onChanged(self, name)
+        vobj = self.ViewObject
+        if vobj is not None:
+            vp = vobj.Proxy
+            if vp is not None and hasattr(vp, "updateData"):
+                vp.updateData(self, name)
+        for observer in _observers:
+            slot = getattr(observer, "slotChangedObject", None)
+            if slot is not None:
+                slot(self, name)
+
+    # Links -----------------------------------------------------------------
+
+    @property
+    def OutList(self):
+        result = []
+        for prop in self._props.values():
+            result.extend(prop.links())
+        return result
+
+    @property
+    def InList(self):
+        return [
+            obj for obj in self.Document.Objects
+            if any(target is self for target in obj.OutList)
+        ]
+
+    def isValid(self):
+        return self.Name in self.Document._objects
+
+    def touch(self):
+        self.Document._touched.add(self.Name)
+
+    def recompute(self):
+        proxy = self._proxy
+        if proxy is not None and hasattr(proxy, "execute"):
+            proxy.execute(self)
+        return True
+
+    def __repr__(self):
+        return f"<{self.TypeId} object '{self.Name}'>"
+
+
+class Document:
+    """A document holding DocumentObjects."""
+
+    def __init__(self, name):
+        self.Name = name
+        self.Label = name
+        self.FileName = ""
+        self._objects = {}
+        self._name_counters = {}
+        self._touched = set()
+        self._restoring = False
+        self._transaction = None
+        self._link_counts = {}  # object name -> links to it, like FreeCAD's InList index
+
+    def _count_links(self, prop, delta):
+        for target in prop.links():
+            self._link_counts[target.Name] = self._link_counts.get(target.Name, 0) + delta
+
+    @property
+    def Objects(self):
+        return list(self._objects.values())
+
+    def getObject(self, name):
+        return self._objects.get(name)
+
+    def getObjectsByLabel(self, label):
+        return [obj for obj in self._objects.values() if obj.Label == label]
+
+    def _unique_name(self, name):
+        if name not in self._objects:
+            return name
+        n = self._name_counters.get(name, 0)
+        while True:
+            n += 1
+            candidate = f"{name}{n:03d}"
+            if candidate not in self._objects:
+                self._name_counters[name] = n
+                return candidate
+
+    def addObject(self, type_id, name=None):
+        name = self._unique_name(name or type_id.split("::")[-1])
+        obj = DocumentObject(self, type_id, name)
+        self._objects[name] = obj
+        if self._transaction is not None:
+            self._transaction.append(name)
+        if GuiUp:
+            import FreeCADGui
+            FreeCADGui._object_added(obj)
+        return obj
+
+    def removeObject(self, name):
+        obj = self._objects.get(name)
+        if obj is None:
+            return
+        for observer in list(_observers):
+            if hasattr(observer, "slotDeletedObject"):
+                observer.slotDeletedObject(obj)
+        for prop in obj._props.values():
+            self._count_links(prop, -1)
+        # Break links to the removed object
+        if self._link_counts.pop(name, 0) > 0:
+            for other in self.Objects:
+                for prop_name, prop in other._props.items():
+                    if obj in prop.links():
+                        prop.value = None
+                        other._changed(prop_name)
+        if GuiUp:
+            import FreeCADGui
+            FreeCADGui._object_removed(obj)
+        del self._objects[name]
+
+    # Transactions (undo is not modelled; abort removes added objects) -------
+
+    def openTransaction(self, name=""):
+        self._transaction = []
+
+    def commitTransaction(self):
+        self._transaction = None
+
+    def abortTransaction(self):
+        added, self._transaction = self._transaction or [], None
+        for name in reversed(added):
+            self.removeObject(name)
+
+    def isTouched(self):
+        return bool(self._touched)
+
+    def recompute(self):
+        count = 0
+        for name in list(self._touched):
+            obj = self._objects.get(name)
+            if obj is not None:
+                obj.recompute()
+                count += 1
+        self._touched.clear()
+        return count
+
+    # Save / restore --------------------------------------------------------
+
+    def save(self):
+        self.saveAs(self.FileName)
+
+    def saveAs(self, path):
+        self.FileName = path
+        for observer in list(_observers):
+            if hasattr(observer, "slotStartSaveDocument"):
+                observer.slotStartSaveDocument(self, path)
+        data = {"name": self.Name, "objects": [_dump_object(o) for o in self.Objects]}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        for observer in list(_observers):
+            if hasattr(observer, "slotFinishSaveDocument"):
+                observer.slotFinishSaveDocument(self, path)
+
+    def __repr__(self):
+        return f"<Document '{self.Name}'>"
+
+
+def _proxy_ref(proxy):
+    if proxy is None:
+        return None
+    cls = type(proxy)
+    state = proxy.dumps() if hasattr(proxy, "dumps") else None
+    return {"module": cls.__module__, "class": cls.__qualname__, "state": state}
+
+
+def _encode(prop):
+    value = prop.value
+    if value is None:
+        return None
+    if prop.type in _LINK_TYPES:
+        return value.Name
+    if prop.type in _LINK_SUB_TYPES:
+        return [value[0].Name, list(value[1])]
+    if isinstance(value, Placement):
+        return list(value.Base)
+    if isinstance(value, Vector):
+        return list(value)
+    if prop.type == "App::PropertyVectorList":
+        return [list(v) for v in value]
+    return value
+
+
+def _dump_object(obj):
+    vobj = obj.ViewObject
+    return {
+        "name": obj.Name,
+        "type": obj.TypeId,
+        "label": obj.Label,
+        "proxy": _proxy_ref(obj._proxy),
+        "view": None if vobj is None else {
+            "proxy": _proxy_ref(vobj.Proxy),
+            "visibility": vobj.Visibility,
+        },
+        "properties": [_dump_property(name, prop) for name, prop in obj._props.items()],
+    }
+
+
+def _dump_property(name, prop):
+    entry = {"name": name, "type": prop.type, "group": prop.group, "doc": prop.doc,
+             "options": prop.options}
+    if prop.status:
+        entry["status"] = sorted(prop.status)
+    # Like FreeCAD, Transient properties keep their status but not their value
+    if "Transient" not in prop.status:
+        entry["value"] = _encode(prop)
+    return entry
+
+
+def _make_proxy(ref):
+    """Recreate a proxy without calling __init__, like FreeCAD's restore."""
+    if ref is None:
+        return None
+    cls = importlib.import_module(ref["module"])
+    for part in ref["class"].split("."):
+        cls = getattr(cls, part)
+    proxy = cls.__new__(cls)
+    if hasattr(proxy, "loads"):
+        proxy.loads(ref["state"])
+    return proxy
+
+
+def _restore(doc, data):
+    """Restore objects and properties silently, then view providers."""
+    doc._restoring = True
+    entries = []
+    for entry in data["objects"]:
+        obj = DocumentObject(doc, entry["type"], entry["name"])
+        obj.__dict__["Label"] = entry["label"]
+        doc._objects[obj.Name] = obj
+        entries.append((obj, entry))
+
+    for obj, entry in entries:
+        for p in entry["properties"]:
+            prop = _Property(p["type"], p["group"], p["doc"])
+            prop.options = list(p["options"])
+            prop.status = set(p.get("status", ()))
+            obj._props[p["name"]] = prop
+            if "value" not in p:
+                continue  # Transient: restored with the type's default value
+            value = p["value"]
+            if value is not None:
+                if prop.type in _LINK_TYPES:
+                    value = doc.getObject(value)
+                elif prop.type in _LINK_SUB_TYPES:
+                    value = (doc.getObject(value[0]), value[1])
+                elif prop.type == "App::PropertyPlacement":
+                    value = Placement(Vector(*value))
+            if prop.type == "App::PropertyEnumeration":
+                prop.value = value
+            else:
+                prop.set(value)
+            doc._count_links(prop, 1)
+        obj.__dict__["_proxy"] = _make_proxy(entry["proxy"])
+    doc._restoring = False
+
+    for obj, _entry in entries:
+        proxy = obj._proxy
+        if proxy is not None and hasattr(proxy, "onDocumentRestored"):
+            proxy.onDocumentRestored(obj)
+
+    if GuiUp:
+        import FreeCADGui
+        for obj, entry in entries:
+            FreeCADGui._object_added(obj)
+            view = entry["view"]
+            if view is None:
+                continue
+            obj.ViewObject.__dict__["_visibility"] = view["visibility"]
+            obj.ViewObject.Proxy = _make_proxy(view["proxy"])
+            vp = obj.ViewObject.Proxy
+            if vp is not None and hasattr(vp, "updateData"):
+                for name in obj.PropertiesList:
+                    vp.updateData(obj, name)
+
+
+# -- Module-level document API ----------------------------------------------
+
+def newDocument(name="Unnamed"):
+    global ActiveDocument
+    unique, n = name, 0
+    while unique in _documents:
+        n += 1
+        unique = f"{name}{n}"
+    doc = Document(unique)
+    _documents[unique] = doc
+    ActiveDocument = doc
+    if GuiUp:
+        import FreeCADGui
+        FreeCADGui._document_added(doc)
+    return doc
+
+
+def openDocument(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    doc = newDocument(os.path.splitext(os.path.basename(path))[0])
+    doc.FileName = path
+    _restore(doc, data)
+    return doc
+
+
+def addDocumentObserver(observer):
+    _observers.append(observer)
+
+
+def removeDocumentObserver(observer):
+    _observers.remove(observer)
+
+
+def closeDocument(name):
+    global ActiveDocument
+    doc = _documents.get(name)
+    if doc is None:
+        return
+    for observer in list(_observers):
+        if hasattr(observer, "slotDeletedDocument"):
+            observer.slotDeletedDocument(doc)
+    del _documents[name]
+    if GuiUp:
+        import FreeCADGui
+        FreeCADGui._document_closed(doc)
+    if ActiveDocument is doc:
+        ActiveDocument = next(iter(_documents.values()), None)
+
+
+def getDocument(name):
+    return _documents[name]
+
+
+def listDocuments():
+    return dict(_documents)
+
+
+def setActiveDocument(name):
+    global ActiveDocument
+    ActiveDocument = _documents[name]
@@ -0,0 +1,341 @@
+"""Headless stand-in for the FreeCADGui module.
+
+Provides view objects (setting Proxy calls attach, Visibility notifies
+onChanged), one shared scene group per document, 3D views with a camera
+that can be rendered and picked (getObjectInfo) with the stand-in coin
+module, and updateGui(), which runs pending Coin sensors like an idle event
+loop turn.
+
+Only for benchmarks/run_headless.py; not a general FreeCADGui replacement.
+"""
+
+import math
+
+from pivy import coin
+
+
+_gui_documents = {}
+_commands = {}
+ActiveDocument = None
+
+
+# -- View objects ---------------------------------------------------------------
+
+class ViewObject:
+    """View provider of one document object."""
+
+    def __init__(self, obj):
+        d = self.__dict__
+        d["Object"] = obj
+        d["_proxy"] = None
+        d["_visibility"] = True
+        d["DisplayMode"] = ""
+        # Like Gui::ViewProvider's root (render-caching as Coin decides) and
+        # mode switch, which hides the display mode roots
+        d["_root"] = coin.SoSeparator()
+        d["_mode_switch"] = coin.SoSwitch()
+        d["_root"].addChild(d["_mode_switch"])
+        d["_modes"] = {}
+
+    @property
+    def Proxy(self):
+        return self._proxy
+
+    @Proxy.setter
+    def Proxy(self, proxy):
+        self.__dict__["_proxy"] = proxy
+        if proxy is not None and hasattr(proxy, "attach"):
+            proxy.attach(self)
+            modes = list(self._modes)
+            if modes:
+                mode = modes[0]
+                if hasattr(proxy, "getDefaultDisplayMode"):
+                    mode = proxy.getDefaultDisplayMode()
+                self._set_mode(mode if mode in self._modes else modes[0])
+
+    @property
+    def Visibility(self):
+        return self._visibility
+
+    @Visibility.setter
+    def Visibility(self, visible):
+        visible = bool(visible)
+        if visible == self._visibility:
+            return
+        self.__dict__["_visibility"] = visible
+        self._update_switch()
+        proxy = self._proxy
+        if proxy is not None and hasattr(proxy, "onChanged"):
+            proxy.onChanged(self, "Visibility")
+
+    def show(self):
+        self.Visibility = True
+
+    def hide(self):
+        self.Visibility = False
+
+    def addDisplayMode(self, node, name):
+        self._modes[name] = self._mode_switch.getNumChildren()
+        self._mode_switch.addChild(node)
+        gui_document = _gui_documents.get(self.Object.Document.Name)
+        if gui_document is not None:
+            gui_document.roots[id(node)] = self.Object
+
+    def _set_mode(self, name):
+        self.__dict__["DisplayMode"] = name
+        self._update_switch()
+
+    def _update_switch(self):
+        index = self._modes.get(self.DisplayMode, coin.SO_SWITCH_NONE)
+        self._mode_switch.whichChild = index if self._visibility else coin.SO_SWITCH_NONE
+
+    def __setattr__(self, name, value):
+        if name in ("Proxy", "Visibility") or name in type(self).__dict__:
+            object.__setattr__(self, name, value)
+        else:
+            self.__dict__[name] = value
+
+
+class GuiDocument:
+    """GUI side of a document: view objects, shared scene group and views."""
+
+    def __init__(self, document):
+        self.Document = document
+        self.scene = coin.SoGroup()  # all view provider roots
+        self.roots = {}  # id(display mode root) -> object, for picking
+        self.views = []
+        self.ActiveView = None
+
+    def getObject(self, name):
+        obj = self.Document.getObject(name)
+        return obj.ViewObject if obj is not None else None
+
+    def mdiViewsOfType(self, type_name):
+        return list(self.views) if type_name == "Gui::View3DInventor" else []
+
+    def createView(self, type_name="Gui::View3DInventor"):
+        view = View3D(self)
+        self.views.append(view)
+        self.ActiveView = view
+        return view
+
+    def closeView(self, view):
+        self.views.remove(view)
+        if self.ActiveView is view:
+            self.ActiveView = self.views[0] if self.views else None
+
+
+# -- 3D views -------------------------------------------------------------------
+
+def _normalize(v):
+    length = math.sqrt(sum(c * c for c in v)) or 1.0
+    return [c / length for c in v]
+
+
+def _cross(a, b):
+    return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]
+
+
+def _dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class View3D:
+    """A 3D view: camera + the document's scene group, rendered on demand."""
+
+    def __init__(self, gui_document, size=(1280, 720)):
+        self.gui_document = gui_document
+        self.size = size
+        self.camera = coin.SoPerspectiveCamera()
+        # What getSceneGraph() returns; the camera lives above it, as in
+        # the viewer's super scene graph
+        self.scene_graph = coin.SoSeparator()
+        self.scene_graph.addChild(gui_document.scene)
+        self._root = coin.SoSeparator()
+        self._root.addChild(self.camera)
+        self._root.addChild(self.scene_graph)
+        self.look_at((0.0, 0.0, 1000.0), (0.0, 0.0, 0.0))
+
+    def getSceneGraph(self):
+        return self.scene_graph
+
+    def getViewer(self):
+        return self
+
+    def getSize(self):
+        return self.size
+
+    def getCameraType(self):
+        return "Orthographic" if self.camera.orthographic else "Perspective"
+
+    def setCameraType(self, kind):
+        self.camera.orthographic = kind == "Orthographic"
+        self._update_projection()
+
+    def look_at(self, eye, target, up=(0.0, 1.0, 0.0), height=None):
+        """Place the camera at eye looking at target."""
+        back = _normalize([e - t for e, t in zip(eye, target)])
+        right = _normalize(_cross(up, back))
+        up = _cross(back, right)
+        # Row-vector world-to-camera matrix, as SoViewingMatrixElement
+        self.camera.view_matrix = [
+            [right[0], up[0], back[0], 0.0],
+            [right[1], up[1], back[1], 0.0],
+            [right[2], up[2], back[2], 0.0],
+            [-_dot(eye, right), -_dot(eye, up), -_dot(eye, back), 1.0],
+        ]
+        self.camera.distance = math.sqrt(sum((e - t) ** 2 for e, t in zip(eye, target)))
+        if height is not None:
+            self.camera.height = height
+        self._update_projection()
+
+    def orbit(self, angle, distance=1000.0, target=(0.0, 0.0, 0.0)):
+        """Look at target from angle radians around the Y axis."""
+        eye = (target[0] + distance * math.sin(angle), target[1],
+               target[2] + distance * math.cos(angle))
+        self.look_at(eye, target)
+
+    def _update_projection(self):
+        width, height = self.size
+        aspect = width / float(height)
+        near, far = 1.0, 100000.0
+        if self.camera.orthographic:
+            h = self.camera.height
+            self.camera.projection_matrix = [
+                [2.0 / (h * aspect), 0.0, 0.0, 0.0],
+                [0.0, 2.0 / h, 0.0, 0.0],
+                [0.0, 0.0, -2.0 / (far - near), 0.0],
+                [0.0, 0.0, -(far + near) / (far - near), 1.0],
+            ]
+        else:
+            f = 1.0 / math.tan(self.camera.heightAngle / 2.0)
+            self.camera.projection_matrix = [
+                [f / aspect, 0.0, 0.0, 0.0],
+                [0.0, f, 0.0, 0.0],
+                [0.0, 0.0, (far + near) / (near - far), -1.0],
+                [0.0, 0.0, 2.0 * far * near / (near - far), 0.0],
+            ]
+
+    def getObjectInfo(self, position):
+        """Return a dict describing the object under a viewport point, or None.
+
+        Like the preselection of a mouse move: one ray pick of the scene.
+        """
+        action = coin.SoRayPickAction(coin.SbViewportRegion(*self.size))
+        action.setPoint(coin.SbVec2s(*position))
+        action.apply(self._root)
+        picked = action.getPickedPoint()
+        if picked is None:
+            return None
+        path = picked.getPath()
+        for i in range(path.getLength() - 1, -1, -1):
+            obj = self.gui_document.roots.get(id(path.getNode(i)))
+            if obj is not None:
+                x, y, z = picked.getPoint()
+                return {"Document": obj.Document.Name, "Object": obj.Name,
+                        "Component": "", "x": x, "y": y, "z": z,
+                        "Node": path.getTail()}
+        return None
+
+    def render(self):
+        """Traverse the scene with a render action, like one redraw."""
+        action = coin.SoGLRenderAction(coin.SbViewportRegion(*self.size))
+        action.apply(self._root)
+        return action
+
+
+# -- Document / object hooks called by the FreeCAD stand-in ---------------------
+
+def _document_added(document):
+    global ActiveDocument
+    gui_document = GuiDocument(document)
+    _gui_documents[document.Name] = gui_document
+    gui_document.createView()
+    ActiveDocument = gui_document
+
+
+def _document_closed(document):
+    global ActiveDocument
+    gui_document = _gui_documents.pop(document.Name, None)
+    if gui_document is None:
+        return
+    for obj in document.Objects:
+        _object_removed(obj)
+    gui_document.views.clear()
+    if ActiveDocument is gui_document:
+        ActiveDocument = next(iter(_gui_documents.values()), None)
+
+
+def _object_added(obj):
+    vobj = ViewObject(obj)
+    obj.__dict__["ViewObject"] = vobj
+    gui_document = _gui_documents.get(obj.Document.Name)
+    if gui_document is not None:
+        gui_document.scene.addChild(vobj._root)
+
+
+def _object_removed(obj):
+    vobj = obj.ViewObject
+    gui_document = _gui_documents.get(obj.Document.Name)
+    if vobj is None or gui_document is None:
+        return
+    index = gui_document.scene.findChild(vobj._root)
+    if index >= 0:
+        gui_document.scene.removeChild(index)
+
+
+# -- Module-level API -------------------------------------------------------
+
+def getDocument(name):
+    return _gui_documents.get(name)
+
+
+def activeDocument():
+    return ActiveDocument
+
+
+def getMainWindow():
+    return None
+
+
+def updateGui():
+    """Run pending sensors, like one idle turn of the event loop."""
+    coin.process_sensors()
+
+
+def addCommand(name, command):
+    _commands[name] = command
+
+
+def runCommand(name, arg=0):
+    command = _commands[name]
+    if arg and "Checkable" in command.GetResources():
+        command.Activated(bool(arg))
+    else:
+        command.Activated()
+
+
+class Workbench:
+    pass
+
+
+def addWorkbench(workbench):
+    pass
+
+
+class _Selection:
+    def __init__(self):
+        self._selected = []
+
+    def getSelection(self, doc_name=None):
+        return list(self._selected)
+
+    def addSelection(self, obj, sub=None):
+        if obj not in self._selected:
+            self._selected.append(obj)
+
+    def clearSelection(self, doc_name=None):
+        self._selected.clear()
+
+
+Selection = _Selection()
@@ -0,0 +1 @@
+"""Headless stand-in for the pivy package (see coin.py)."""
@@ -0,0 +1,1086 @@
+"""Headless stand-in for pivy.coin.
+
+Nodes are plain Python objects with fields (setValue/getValue, field
+connections, assignment through attributes like pivy). SoGLRenderAction
+traverses the graph honouring switches and calls SoCallback callbacks with
+a state holding the camera's viewing/projection matrices and the viewport,
+so the workbench's per-frame Python code runs as in FreeCAD. Sensors are
+queued and run by process_sensors() (FreeCADGui.updateGui()).
+
+SoGLRenderAction also models Coin's sorted transparency and delayed
+SoAnnotation subgraphs (see there), and which separators would keep a
+render cache: one whose renderCaching is not OFF keeps the cache built by
+its last render unless an SoCallback below it or SoCacheElement.invalidate()
+invalidated it meanwhile. Caches are not replayed; has_render_cache() tells
+whether one would be.
+
+SoGetBoundingBoxAction estimates text extents from character counts.
+SoRayPickAction tests faces and text triangle by triangle (see there).
+
+stats counts field writes (and those that would notify the scene),
+callbacks and the time spent in callbacks, and bounding box actions; use
+reset_stats() between measurements.
+
+Only for benchmarks/run_headless.py; not a general Coin replacement.
+"""
+
+import collections
+import math
+import time
+
+
+SO_SWITCH_NONE = -1
+SO_SWITCH_INHERIT = -2
+SO_SWITCH_ALL = -3
+
+stats = collections.Counter()
+
+
+def reset_stats():
+    """Clear field-write, callback and timing counters."""
+    stats.clear()
+
+
+# -- Basic types --------------------------------------------------------------
+
+class SbVec2s:
+    def __init__(self, x=0, y=0):
+        self._v = (x, y)
+
+    def __getitem__(self, index):
+        return self._v[index]
+
+    def getValue(self):
+        return self._v
+
+
+class SbVec3f:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, (tuple, list, SbVec3f)):
+            x, y, z = x
+        self._v = (float(x), float(y), float(z))
+
+    def __getitem__(self, index):
+        return self._v[index]
+
+    def __iter__(self):
+        return iter(self._v)
+
+    def __eq__(self, other):
+        return isinstance(other, SbVec3f) and self._v == other._v
+
+    def getValue(self):
+        return self._v
+
+    def setValue(self, *args):
+        self.__init__(*args)
+
+    def length(self):
+        return math.sqrt(sum(c * c for c in self._v))
+
+
+_IDENTITY = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0),
+             (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+
+
+def _mult(a, b):
+    """Product of two row-major 4x4 matrices (row vectors: v * a * b)."""
+    b0, b1, b2, b3 = b
+    return tuple(
+        (r[0] * b0[0] + r[1] * b1[0] + r[2] * b2[0] + r[3] * b3[0],
+         r[0] * b0[1] + r[1] * b1[1] + r[2] * b2[1] + r[3] * b3[1],
+         r[0] * b0[2] + r[1] * b1[2] + r[2] * b2[2] + r[3] * b3[2],
+         r[0] * b0[3] + r[1] * b1[3] + r[2] * b2[3] + r[3] * b3[3])
+        for r in a
+    )
+
+
+class SbMatrix:
+    def __init__(self, rows=None):
+        self._m = _IDENTITY if rows is None else tuple(tuple(float(v) for v in r) for r in rows)
+
+    @staticmethod
+    def identity():
+        return SbMatrix()
+
+    def getValue(self):
+        return [list(r) for r in self._m]
+
+    def setValue(self, rows):
+        self._m = rows._m if isinstance(rows, SbMatrix) else tuple(
+            tuple(float(v) for v in r) for r in rows)
+
+    def __getitem__(self, index):
+        return self._m[index]
+
+    def __eq__(self, other):
+        return isinstance(other, SbMatrix) and self._m == other._m
+
+    def equals(self, other, tolerance):
+        return all(abs(a - b) <= tolerance
+                   for ra, rb in zip(self._m, other._m) for a, b in zip(ra, rb))
+
+    def multRight(self, other):
+        self._m = _mult(self._m, other._m)
+        return self
+
+    def multVecMatrix(self, vec):
+        x, y, z = vec
+        m = self._m
+        w = x * m[0][3] + y * m[1][3] + z * m[2][3] + m[3][3]
+        return SbVec3f(
+            (x * m[0][0] + y * m[1][0] + z * m[2][0] + m[3][0]) / w,
+            (x * m[0][1] + y * m[1][1] + z * m[2][1] + m[3][1]) / w,
+            (x * m[0][2] + y * m[1][2] + z * m[2][2] + m[3][2]) / w,
+        )
+
+
+class SbTime:
+    def __init__(self, seconds=0.0):
+        self.seconds = seconds
+
+    def getValue(self):
+        return self.seconds
+
+
+class SbViewportRegion:
+    def __init__(self, width=100, height=100):
+        self._size = SbVec2s(width, height)
+
+    def getViewportSizePixels(self):
+        return self._size
+
+    def getWindowSize(self):
+        return self._size
+
+
+class SbBox3f:
+    def __init__(self):
+        self._min = None
+        self._max = None
+
+    def extendBy(self, point):
+        if self._min is None:
+            self._min, self._max = list(point), list(point)
+            return
+        for i in range(3):
+            self._min[i] = min(self._min[i], point[i])
+            self._max[i] = max(self._max[i], point[i])
+
+    def isEmpty(self):
+        return self._min is None
+
+    def getMin(self):
+        return SbVec3f(self._min)
+
+    def getMax(self):
+        return SbVec3f(self._max)
+
+
+# -- Fields -------------------------------------------------------------------
+
+class SoField:
+    """Single-value field.
+
+    Writes are counted in stats["field_writes"]; writes with notification
+    enabled, which in Coin would invalidate caches and schedule a redraw of
+    every view showing the field's node, also in stats["notifications"].
+    """
+
+    __slots__ = ("_value", "_source", "_notify")
+
+    def __init__(self, value=None):
+        self._value = value
+        self._source = None
+        self._notify = True
+
+    def _written(self):
+        stats["field_writes"] += 1
+        if self._notify and not _quiet_nodes:
+            stats["notifications"] += 1
+
+    def setValue(self, *args):
+        self._written()
+        self._value = args[0] if len(args) == 1 else args
+
+    def enableNotify(self, flag):
+        previous, self._notify = self._notify, bool(flag)
+        return previous
+
+    def isNotifyEnabled(self):
+        return self._notify
+
+    def getValue(self):
+        if self._source is not None:
+            return self._source.getValue()
+        return self._value
+
+    def connectFrom(self, field):
+        self._source = field
+
+    def disconnect(self, field=None):
+        self._source = None
+
+    def isConnected(self):
+        return self._source is not None
+
+
+class SoMField(SoField):
+    """Multiple-value field."""
+
+    __slots__ = ()
+
+    def __init__(self, values=()):
+        super().__init__(list(values))
+
+    def setValue(self, *args):
+        self._written()
+        self._value = [args[0] if len(args) == 1 else args]
+
+    def setValues(self, start, count, values=None):
+        self._written()
+        if values is None:  # setValues(start, values)
+            count, values = len(count), count
+        values = list(values)[:count]
+        if len(self._value) < start + count:
+            self._value.extend([None] * (start + count - len(self._value)))
+        self._value[start:start + count] = values
+
+    def setNum(self, count):
+        del self._value[count:]
+        self._value.extend([None] * (count - len(self._value)))
+
+    def getNum(self):
+        return len(self.getValue())
+
+    def getValues(self, start=0):
+        return list(self.getValue())[start:]
+
+    def __getitem__(self, index):
+        return self.getValue()[index]
+
+    def __len__(self):
+        return len(self.getValue())
+
+
+class SoSFMatrix(SoField):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(SbMatrix())
+
+    def setValue(self, *args):
+        self._written()
+        value = args[0]
+        # Copies, like Coin; callers may reuse their SbMatrix
+        self._value = SbMatrix(value._m if isinstance(value, SbMatrix) else value)
+
+
+# -- Nodes --------------------------------------------------------------------
+
+# Nodes with notification disabled. Nodes do not track their parents here, so
+# while any node is quiet, all field writes are treated as being beneath it;
+# callers only disable notification around a bounded update of one subgraph.
+_quiet_nodes = set()
+
+
+class SoNode:
+    """Base node: fields listed in _FIELDS can be assigned like attributes."""
+
+    _FIELDS = {}
+
+    def __init__(self):
+        d = self.__dict__
+        d["_name"] = ""
+        for name, factory in self._FIELDS.items():
+            d[name] = factory()
+
+    def __setattr__(self, name, value):
+        current = self.__dict__.get(name)
+        if isinstance(current, SoField) and not isinstance(value, SoField):
+            current.setValue(value)
+        else:
+            object.__setattr__(self, name, value)
+
+    @property
+    def this(self):
+        return id(self)
+
+    @classmethod
+    def getClassTypeId(cls):
+        return cls
+
+    def getTypeId(self):
+        return type(self)
+
+    def isOfType(self, type_id):
+        return isinstance(self, type_id)
+
+    def setName(self, name):
+        self.__dict__["_name"] = name
+
+    def getName(self):
+        return self._name
+
+    def enableNotify(self, flag):
+        previous = self not in _quiet_nodes
+        if flag:
+            _quiet_nodes.discard(self)
+        else:
+            _quiet_nodes.add(self)
+        return previous
+
+    def isNotifyEnabled(self):
+        return self not in _quiet_nodes
+
+    def touch(self):
+        stats["notifications"] += 1
+
+    def ref(self):
+        pass
+
+    def unref(self):
+        pass
+
+    def _traverse(self, action):
+        pass
+
+
+def _sf(value=None):
+    return lambda: SoField(value)
+
+
+def _mf(*values):
+    return lambda: SoMField(values)
+
+
+class SoGroup(SoNode):
+    def __init__(self):
+        super().__init__()
+        self.__dict__["_children"] = []
+
+    def addChild(self, node):
+        self._children.append(node)
+
+    def insertChild(self, node, index):
+        self._children.insert(index, node)
+
+    def removeChild(self, child):
+        if isinstance(child, int):
+            del self._children[child]
+        else:
+            self._children.remove(child)
+
+    def removeAllChildren(self):
+        self._children.clear()
+
+    def replaceChild(self, old, new):
+        index = old if isinstance(old, int) else self._children.index(old)
+        self._children[index] = new
+
+    def findChild(self, node):
+        for i, child in enumerate(self._children):
+            if child is node:
+                return i
+        return -1
+
+    def getChild(self, index):
+        return self._children[index]
+
+    def getNumChildren(self):
+        return len(self._children)
+
+    def getChildren(self):
+        return list(self._children)
+
+    def _traverse(self, action):
+        if action.tracks_path:
+            action._path.append(self)
+            for child in self._children:
+                child._traverse(action)
+            action._path.pop()
+        else:
+            for child in self._children:
+                child._traverse(action)
+
+
+class SoSeparator(SoGroup):
+    OFF, ON, AUTO = 0, 1, 2
+    _FIELDS = {"renderCaching": _sf(2), "boundingBoxCaching": _sf(2),
+               "pickCulling": _sf(2), "renderCulling": _sf(2)}
+
+    def _traverse(self, action):
+        state = action.getState()
+        saved = state.push()
+        caching = (isinstance(action, SoGLRenderAction) and not action._rendering_delayed
+                   and self.renderCaching.getValue() != SoSeparator.OFF)
+        if caching:
+            cache = [True]
+            state.caches.append(cache)
+        if action.tracks_path:
+            action._path.append(self)
+        for child in self._children:
+            child._traverse(action)
+        if action.tracks_path:
+            action._path.pop()
+        if caching:
+            state.caches.pop()
+            self.__dict__["_cached"] = cache[0]
+        state.pop(saved)
+
+
+class SoAnnotation(SoSeparator):
+    def _traverse(self, action):
+        if isinstance(action, SoGLRenderAction) and not action._rendering_delayed:
+            action._delayed.append(self)  # rendered after the scene
+            return
+        super()._traverse(action)
+
+
+class SoSwitch(SoGroup):
+    _FIELDS = {"whichChild": _sf(SO_SWITCH_NONE)}
+
+    def _traverse(self, action):
+        which = self.whichChild.getValue()
+        state = action.getState()
+        if which == SO_SWITCH_INHERIT:
+            which = state.switch
+        else:
+            state.switch = which
+        if which == SO_SWITCH_ALL:
+            children = self._children
+        elif 0 <= which < len(self._children):
+            children = (self._children[which],)
+        else:
+            return
+        if action.tracks_path:
+            action._path.append(self)
+        for child in children:
+            child._traverse(action)
+        if action.tracks_path:
+            action._path.pop()
+
+
+class SoTranslation(SoNode):
+    _FIELDS = {"translation": lambda: SoField((0.0, 0.0, 0.0))}
+
+    def _traverse(self, action):
+        if action.tracks_model:
+            x, y, z = self.translation.getValue()
+            state = action.getState()
+            r0, r1, r2, r3 = state.model
+            state.model = (r0, r1, r2, tuple(
+                x * a + y * b + z * c + d for a, b, c, d in zip(r0, r1, r2, r3)))
+
+
+class SoTransform(SoNode):
+    _FIELDS = {"translation": _sf((0.0, 0.0, 0.0)), "rotation": _sf(None),
+               "scaleFactor": _sf((1.0, 1.0, 1.0)), "center": _sf((0.0, 0.0, 0.0))}
+
+
+class SoScale(SoNode):
+    _FIELDS = {"scaleFactor": _sf((1.0, 1.0, 1.0))}
+
+    def _traverse(self, action):
+        if action.tracks_model:
+            x, y, z = self.scaleFactor.getValue()
+            action.getState().transform(((x, 0.0, 0.0, 0.0), (0.0, y, 0.0, 0.0),
+                                         (0.0, 0.0, z, 0.0), (0.0, 0.0, 0.0, 1.0)))
+
+
+class SoMatrixTransform(SoNode):
+    _FIELDS = {"matrix": SoSFMatrix}
+
+    def _traverse(self, action):
+        if action.tracks_model:
+            action.getState().transform(self.matrix.getValue()._m)
+
+
+class SoFont(SoNode):
+    _FIELDS = {"name": _sf("defaultFont"), "size": _sf(10.0)}
+
+    def _traverse(self, action):
+        state = action.getState()
+        state.font_size = self.size.getValue()
+
+
+class SoText3(SoNode):
+    FRONT, SIDES, BACK, ALL = 1, 2, 4, 7
+    LEFT, RIGHT, CENTER = 1, 2, 3
+    _FIELDS = {"string": _mf(), "justification": _sf(1), "parts": _sf(1),
+               "spacing": _sf(1.0)}
+
+    def _traverse(self, action):
+        if isinstance(action, SoGetBoundingBoxAction):
+            action._text(self)
+        elif action.tracks_model and action.getState().pickable():
+            action._pick_text(self)
+
+
+class SoText2(SoText3):
+    pass
+
+
+class SoMaterial(SoNode):
+    _FIELDS = {"diffuseColor": _mf(), "emissiveColor": _mf(), "ambientColor": _mf(),
+               "specularColor": _mf(), "shininess": _mf(), "transparency": _mf()}
+
+    def _traverse(self, action):
+        if not action.tracks_model:
+            values = self.transparency.getValues()
+            action.getState().transparent = bool(values) and values[0] > 0.0
+
+
+class SoBaseColor(SoNode):
+    _FIELDS = {"rgb": _mf()}
+
+
+class SoDrawStyle(SoNode):
+    FILLED, LINES, POINTS, INVISIBLE = 0, 1, 2, 3
+    _FIELDS = {"style": _sf(0), "lineWidth": _sf(0.0), "pointSize": _sf(0.0),
+               "linePattern": _sf(0xffff)}
+
+
+class SoLightModel(SoNode):
+    BASE_COLOR, PHONG = 0, 1
+    _FIELDS = {"model": _sf(1)}
+
+
+class SoPickStyle(SoNode):
+    SHAPE, BOUNDING_BOX, UNPICKABLE, SHAPE_ON_TOP = 0, 1, 2, 3
+    _FIELDS = {"style": _sf(0)}
+
+    def _traverse(self, action):
+        action.getState().pick_style = self.style.getValue()
+
+
+class SoDepthBuffer(SoNode):
+    NEVER, ALWAYS, LESS, LEQUAL, EQUAL, GEQUAL, GREATER, NOTEQUAL = range(8)
+    _FIELDS = {"test": _sf(True), "write": _sf(True), "function": _sf(2)}
+
+
+class SoTransparencyType(SoNode):
+    SCREEN_DOOR, ADD, DELAYED_ADD, SORTED_OBJECT_ADD, BLEND, DELAYED_BLEND = range(6)
+    _FIELDS = {"value": _sf(0)}
+
+
+class SoCoordinate3(SoNode):
+    _FIELDS = {"point": _mf()}
+
+    def _traverse(self, action):
+        if action.tracks_model:
+            action.getState().coordinates = self.point.getValues()
+
+
+class SoTextureCoordinate2(SoNode):
+    _FIELDS = {"point": _mf()}
+
+
+class SoTexture2(SoNode):
+    MODULATE, DECAL, BLEND, REPLACE = 0, 1, 2, 3
+    REPEAT, CLAMP = 0, 1
+    _FIELDS = {"image": _sf(None), "filename": _sf(""), "model": _sf(0),
+               "wrapS": _sf(0), "wrapT": _sf(0)}
+
+
+class SoFaceSet(SoNode):
+    _FIELDS = {"numVertices": _mf(), "startIndex": _sf(0)}
+
+    def _traverse(self, action):
+        state = action.getState()
+        if not action.tracks_model:
+            if state.transparent:
+                action._transparent_shape(self)
+            return
+        if not state.pickable():
+            return
+        triangles = []
+        start = self.startIndex.getValue()
+        for count in self.numVertices.getValues():
+            # Fan triangulation of each (convex) face
+            triangles.extend((start, start + i, start + i + 1) for i in range(1, count - 1))
+            start += count
+        action._pick_triangles(self, action.getState().coordinates, triangles)
+
+
+class SoLineSet(SoFaceSet):
+    def _traverse(self, action):
+        pass  # lines are not picked
+
+
+class SoPointSet(SoNode):
+    _FIELDS = {"numPoints": _sf(-1), "startIndex": _sf(0)}
+
+
+class SoMarkerSet(SoPointSet):
+    CIRCLE_FILLED_5_5, CIRCLE_FILLED_7_7, CIRCLE_FILLED_9_9 = 23, 52, 81
+    _FIELDS = {"numPoints": _sf(-1), "startIndex": _sf(0), "markerIndex": _mf()}
+
+
+class SoCube(SoNode):
+    _FIELDS = {"width": _sf(2.0), "height": _sf(2.0), "depth": _sf(2.0)}
+
+
+class SoSphere(SoNode):
+    _FIELDS = {"radius": _sf(1.0)}
+
+
+class SoCallback(SoNode):
+    def __init__(self):
+        super().__init__()
+        self.__dict__["_callback"] = None
+        self.__dict__["_data"] = None
+
+    def setCallback(self, callback, data=None):
+        self.__dict__["_callback"] = callback
+        self.__dict__["_data"] = data
+
+    def _traverse(self, action):
+        # As in Coin, a callback may draw anything, so no cache may hold it
+        SoCacheElement.invalidate(action.getState())
+        callback = self._callback
+        if callback is not None:
+            stats["callbacks"] += 1
+            start = time.perf_counter()
+            callback(self._data, action)
+            stats["callback_ns"] += int((time.perf_counter() - start) * 1e9)
+
+
+class SoCamera(SoNode):
+    """Camera; FreeCADGui.View3D sets view_matrix and projection_matrix."""
+
+    def __init__(self):
+        super().__init__()
+        d = self.__dict__
+        d["view_matrix"] = [list(r) for r in _IDENTITY]
+        d["projection_matrix"] = [list(r) for r in _IDENTITY]
+        d["orthographic"] = False
+        d["heightAngle"] = math.pi / 4.0
+        d["height"] = 1000.0
+        d["distance"] = 1000.0
+
+    def _traverse(self, action):
+        state = action.getState()
+        state.view = SbMatrix(self.view_matrix)
+        state.projection = SbMatrix(self.projection_matrix)
+        state.camera = self
+
+
+class SoPerspectiveCamera(SoCamera):
+    pass
+
+
+class SoOrthographicCamera(SoCamera):
+    def __init__(self):
+        super().__init__()
+        self.__dict__["orthographic"] = True
+
+
+class SoDirectionalLight(SoNode):
+    pass
+
+
+# -- Actions and elements ---------------------------------------------------------
+
+class SoState:
+    """Traversal state with the elements the workbench reads.
+
+    The model matrix and coordinates are only tracked for actions with
+    tracks_model set (picking).
+    """
+
+    def __init__(self, viewport):
+        self.viewport = viewport
+        self.view = SbMatrix()
+        self.projection = SbMatrix()
+        self.camera = None
+        self.switch = SO_SWITCH_NONE
+        self.font_size = 10.0
+        self.model = _IDENTITY
+        self.coordinates = ()
+        self.pick_style = SoPickStyle.SHAPE
+        self.transparent = False
+        self.caches = []  # render caches being built, innermost last
+
+    def push(self):
+        return (self.switch, self.font_size, self.model, self.coordinates, self.pick_style,
+                self.transparent)
+
+    def pop(self, saved):
+        (self.switch, self.font_size, self.model, self.coordinates, self.pick_style,
+         self.transparent) = saved
+
+    def transform(self, matrix):
+        """Apply a local transformation (row-major) before the current model matrix."""
+        self.model = _mult(matrix, self.model)
+
+    def pickable(self):
+        return self.pick_style != SoPickStyle.UNPICKABLE
+
+
+class SoAction:
+    tracks_model = False
+    tracks_path = False
+
+    def __init__(self, viewport=None):
+        self._viewport = viewport or SbViewportRegion()
+        self._state = None
+
+    @classmethod
+    def getClassTypeId(cls):
+        return cls
+
+    def isOfType(self, type_id):
+        return isinstance(self, type_id)
+
+    def getState(self):
+        return self._state
+
+    def getViewportRegion(self):
+        return self._viewport
+
+    def apply(self, node):
+        self._state = SoState(self._viewport)
+        node._traverse(self)
+
+    def _transparent_shape(self, node):
+        pass
+
+
+class SoGLRenderAction(SoAction):
+    """Render traversal with sorted transparency and delayed annotations.
+
+    As in FreeCAD's viewer, shapes drawn with a transparent material are
+    collected with their paths, sorted and rendered after the opaque scene
+    by re-traversing each path: the state nodes (and callbacks) before every
+    node on the path, then the shape. stats counts them in "sorted_shapes".
+    SoAnnotation subgraphs are traversed after that, once each
+    ("delayed_paths"), without sorting the transparent shapes in them.
+    """
+
+    (SCREEN_DOOR, ADD, DELAYED_ADD, SORTED_OBJECT_ADD, BLEND, DELAYED_BLEND,
+     SORTED_OBJECT_BLEND) = range(7)
+
+    tracks_path = True
+
+    def __init__(self, viewport=None):
+        super().__init__(viewport)
+        self._transparency_type = self.SORTED_OBJECT_BLEND
+        self._path = []
+
+    def setTransparencyType(self, kind):
+        self._transparency_type = kind
+
+    def getTransparencyType(self):
+        return self._transparency_type
+
+    def apply(self, node):
+        stats["frames"] += 1
+        self._sorted = []
+        self._delayed = []
+        self._rendering_delayed = False
+        super().apply(node)
+        # Coin sorts by each shape's bounding box depth; the order is the cost here
+        self._sorted.sort(key=lambda path: id(path[-1]))
+        stats["sorted_shapes"] += len(self._sorted)
+        self._rendering_delayed = True
+        for path in self._sorted:
+            self._render_path(path)
+        for annotation in self._delayed:
+            stats["delayed_paths"] += 1
+            annotation._traverse(self)
+
+    def _transparent_shape(self, node):
+        if (not self._rendering_delayed
+                and self._transparency_type in (self.SORTED_OBJECT_ADD, self.SORTED_OBJECT_BLEND)):
+            self._sorted.append(tuple(self._path) + (node,))
+
+    def _render_path(self, path):
+        """Render one delayed path from the root down to its shape."""
+        state = self._state
+        saved = state.push()
+        for parent, child in zip(path, path[1:]):
+            # Switches and the document's group of object roots hold no
+            # state nodes; elsewhere, the children before the path's
+            if type(parent) is SoGroup or isinstance(parent, SoSwitch):
+                continue
+            for sibling in parent._children:
+                if sibling is child:
+                    break
+                if not isinstance(sibling, SoGroup):
+                    sibling._traverse(self)
+        path[-1]._traverse(self)
+        state.pop(saved)
+
+
+class SoGetBoundingBoxAction(SoAction):
+    """Estimates text boxes: 0.6 x size per character, one size per line."""
+
+    def apply(self, node):
+        stats["bounding_boxes"] += 1
+        self._box = SbBox3f()
+        super().apply(node)
+
+    def getBoundingBox(self):
+        return self._box
+
+    def _text(self, text_node):
+        lines = [str(s) for s in text_node.string.getValues() if s]
+        if not lines:
+            return
+        size = self._state.font_size
+        width = max(len(line) for line in lines) * size * 0.6
+        justification = text_node.justification.getValue()
+        left = {SoText3.LEFT: 0.0, SoText3.RIGHT: -width}.get(justification, -width / 2.0)
+        step = size * text_node.spacing.getValue()
+        self._box.extendBy((left, -0.2 * size - (len(lines) - 1) * step, 0.0))
+        self._box.extendBy((left + width, 0.8 * size, 0.0))
+
+
+class SoPath:
+    def __init__(self, nodes):
+        self._nodes = nodes
+
+    def getTail(self):
+        return self._nodes[-1]
+
+    def getLength(self):
+        return len(self._nodes)
+
+    def getNode(self, index):
+        return self._nodes[index]
+
+    def containsNode(self, node):
+        return any(n is node for n in self._nodes)
+
+
+class SoPickedPoint:
+    def __init__(self, path, point):
+        self._path = path
+        self._point = point
+
+    def getPath(self):
+        return self._path
+
+    def getPoint(self):
+        return self._point
+
+
+class SoRayPickAction(SoAction):
+    """Picks the nearest face under a viewport point.
+
+    Every pickable face set and text is tested triangle by triangle in
+    normalized device coordinates, without pick culling. SoText3 is
+    tessellated into TEXT_TRIANGLES_PER_GLYPH triangles per character and
+    rendered face, a low estimate of real glyph outlines, so the cost of
+    picking text is understated rather than exaggerated. stats counts picks
+    and triangles tested.
+    """
+
+    tracks_model = True
+    tracks_path = True
+    TEXT_TRIANGLES_PER_GLYPH = 4
+
+    def __init__(self, viewport=None):
+        super().__init__(viewport)
+        self._ndc = (0.0, 0.0)
+        self._picked = None
+        self._depth = None
+        self._path = []
+
+    def setPoint(self, point):
+        width, height = self._viewport.getViewportSizePixels()
+        x, y = point
+        self._ndc = (2.0 * x / width - 1.0, 2.0 * y / height - 1.0)
+
+    def setRadius(self, radius):
+        pass
+
+    def apply(self, node):
+        stats["picks"] += 1
+        self._picked = None
+        self._depth = None
+        self._path = [node]
+        self._view_projection = (None, None, None)
+        super().apply(node)
+
+    def getPickedPoint(self, index=0):
+        return self._picked if index == 0 else None
+
+    def _pick_text(self, node):
+        """Test the glyph triangles of a text node."""
+        lines = [str(s) for s in node.string.getValues() if s]
+        faces = bin(node.parts.getValue() & (SoText3.FRONT | SoText3.BACK)).count("1")
+        if not lines or not faces:
+            return
+        size = self._state.font_size
+        advance = 0.6 * size
+        strips = max(1, self.TEXT_TRIANGLES_PER_GLYPH // 2)
+        justification = node.justification.getValue()
+        step = size * node.spacing.getValue()
+        vertices, triangles = [], []
+        for row, line in enumerate(lines):
+            width = len(line) * advance
+            left = {SoText3.LEFT: 0.0, SoText3.RIGHT: -width}.get(justification, -width / 2.0)
+            bottom = -0.2 * size - row * step
+            for column in range(len(line)):
+                x0 = left + column * advance
+                first = len(vertices)
+                for i in range(strips + 1):
+                    x = x0 + advance * i / strips
+                    vertices.append((x, bottom, 0.0))
+                    vertices.append((x, bottom + size, 0.0))
+                for i in range(strips):
+                    a = first + 2 * i
+                    triangles.append((a, a + 2, a + 3))
+                    triangles.append((a, a + 3, a + 1))
+        self._pick_triangles(node, vertices, triangles * faces)
+
+    def _pick_triangles(self, node, vertices, triangles):
+        """Test triangles (index triples into vertices) against the pick point."""
+        state = self._state
+        view, projection, view_projection = self._view_projection
+        if view is not state.view or projection is not state.projection:
+            view_projection = _mult(state.view._m, state.projection._m)
+            self._view_projection = (state.view, state.projection, view_projection)
+        m = _mult(state.model, view_projection)
+        projected = []
+        for vertex in vertices:
+            x, y, z = vertex[0], vertex[1], vertex[2]
+            w = x * m[0][3] + y * m[1][3] + z * m[2][3] + m[3][3]
+            if w <= 0.0:
+                projected.append(None)  # behind the camera
+                continue
+            projected.append((
+                (x * m[0][0] + y * m[1][0] + z * m[2][0] + m[3][0]) / w,
+                (x * m[0][1] + y * m[1][1] + z * m[2][1] + m[3][1]) / w,
+                (x * m[0][2] + y * m[1][2] + z * m[2][2] + m[3][2]) / w,
+            ))
+        stats["pick_triangles"] += len(triangles)
+        px, py = self._ndc
+        for ia, ib, ic in triangles:
+            a, b, c = projected[ia], projected[ib], projected[ic]
+            if a is None or b is None or c is None:
+                continue
+            det = (b[1] - c[1]) * (a[0] - c[0]) + (c[0] - b[0]) * (a[1] - c[1])
+            if det == 0.0:
+                continue
+            u = ((b[1] - c[1]) * (px - c[0]) + (c[0] - b[0]) * (py - c[1])) / det
+            v = ((c[1] - a[1]) * (px - c[0]) + (a[0] - c[0]) * (py - c[1])) / det
+            if u < 0.0 or v < 0.0 or u + v > 1.0:
+                continue
+            depth = u * a[2] + v * b[2] + (1.0 - u - v) * c[2]
+            if self._depth is None or depth < self._depth:
+                self._depth = depth
+                self._picked = SoPickedPoint(SoPath(self._path + [node]), (px, py, depth))
+
+
+class SoCacheElement:
+    @staticmethod
+    def invalidate(state):
+        """Invalidate every render cache being built."""
+        for cache in state.caches:
+            cache[0] = False
+
+
+def has_render_cache(separator):
+    """Return True if a separator kept the render cache built by its last render."""
+    return separator.__dict__.get("_cached", False)
+
+
+class SoViewingMatrixElement:
+    @staticmethod
+    def get(state):
+        return state.view
+
+
+class SoProjectionMatrixElement:
+    @staticmethod
+    def get(state):
+        return state.projection
+
+
+class SoViewportRegionElement:
+    @staticmethod
+    def get(state):
+        return state.viewport
+
+
+# -- Sensors --------------------------------------------------------------------
+
+_queue = collections.deque()
+_timers = []
+
+
+class SoSensor:
+    def __init__(self, callback=None, data=None):
+        self._callback = callback
+        self._data = data
+        self._scheduled = False
+
+    def setFunction(self, callback):
+        self._callback = callback
+
+    def setData(self, data):
+        self._data = data
+
+    def isScheduled(self):
+        return self._scheduled
+
+    def _trigger(self):
+        if self._callback is not None:
+            self._callback(self._data, self)
+
+
+class SoOneShotSensor(SoSensor):
+    def schedule(self):
+        if not self._scheduled:
+            self._scheduled = True
+            _queue.append(self)
+
+    def unschedule(self):
+        if self._scheduled:
+            self._scheduled = False
+            try:
+                _queue.remove(self)
+            except ValueError:
+                pass
+
+
+class SoIdleSensor(SoOneShotSensor):
+    pass
+
+
+class SoTimerSensor(SoSensor):
+    def __init__(self, callback=None, data=None):
+        super().__init__(callback, data)
+        self._interval = SbTime(1.0 / 30.0)
+
+    def setInterval(self, interval):
+        self._interval = interval
+
+    def schedule(self):
+        if not self._scheduled:
+            self._scheduled = True
+            _timers.append(self)
+
+    def unschedule(self):
+        if self._scheduled:
+            self._scheduled = False
+            _timers.remove(self)
+
+
+def process_sensors(limit=10 ** 7):
+    """Run queued one-shot sensors (and those they schedule), then timers once."""
+    while _queue and limit > 0:
+        sensor = _queue.popleft()
+        sensor._scheduled = False
+        sensor._trigger()
+        limit -= 1
+    for timer in list(_timers):
+        timer._trigger()
+
+
+def pending_sensors():
+    """Return the number of queued one-shot sensors."""
+    return len(_queue)
@@ -0,0 +1,1500 @@
+"""Headless benchmark and regression suite.
+
+Runs the workbench against the stand-in FreeCAD, FreeCADGui and pivy.coin
+modules in benchmarks/headless, so it needs neither FreeCAD nor a display:
+
+    python benchmarks/run_headless.py                  # 10 .. 50k billboards
+    python benchmarks/run_headless.py --quick          # 10 .. 1k
+    python benchmarks/run_headless.py -o results.json
+    python benchmarks/run_headless.py --baseline old.json --tolerance 1.5
+
+Scenarios:
+
+* create - TextBillboard.__init__ on new document objects
+* attach - ViewProviderTextBillboard.attach, then the deferred build
+* create_many - bulk creation with view providers, then the deferred build
+* update - per-property edits on every billboard (updateData + flush)
+* frames - simulated redraws while orbiting the camera, with and without
+  culling/declutter screen passes, and with an idle camera
+* frames_scale - orbiting redraws of ScaleMode "Screen" billboards under an
+  orthographic and a perspective camera, checking their pixel size
+* two_views - two views of one document with different cameras, one
+  orbiting, redrawn alternately; checks that each view renders with its own
+  rotation and that neither view's writes notify (dirty) the scene
+* two_views_screen - two views of one document looking at opposite corners
+  of ScaleMode "Screen" labels from different distances, with culling on,
+  redrawn alternately; checks that each view renders the labels culled for
+  its own camera, at their depth in that view, without notifying the scene
+* anchors - billboards anchored to one part each; moving a few parts must
+  only move their own labels, at a cost independent of the label count
+* templates - billboards with a TextTemplate reading a shared sensor and
+  their own part; checks that only affected labels re-render and that a
+  change not visible in the formatted text re-lays out nothing
+* bulk_edit - restyling every billboard with per-object edits and with
+  edit_many(); checks that the bulk edit notifies the scene once per
+  billboard, that a misspelled property name edits nothing and that the
+  values the edit dialog prefills read back unchanged
+* screen_passes - edits of live billboards with the screen passes on;
+  checks that a Priority change reorders decluttering and that LOD threshold
+  edits swap a label for its marker, which then no longer declutters, and
+  that instrumentation counts the billboards and hides of each pass
+* pick - preselection (one ray pick per mouse move) over a grid of labels,
+  testing the text glyphs and the bounds pick proxies; checks that the
+  pointed-at label is picked, in a view other than the one rendered last
+* overlay - labels with transparent backgrounds drawn in the scene, then in
+  the overlay layer; checks that the overlay sorts no transparent shapes,
+  is drawn in one delayed traversal, and that picking, edits, visibility
+  (of one label and of many) and new views keep working
+* layout - word-wrapped multi-line descriptions with backgrounds; checks
+  that lines fit MaxWidth, backgrounds cover every line and that each
+  distinct text is laid out once, and again only when MaxWidth changes
+* clusters - clustering with the whole grid in view, small orbit and dolly steps,
+  zooming in and editing; checks that aggregates replace most labels, that
+  the incremental cut matches one selected from the root, that small moves
+  change only a few cut nodes, and that only moving a billboard rebuilds
+  the octree
+* export - streaming all billboards to JSON Lines, CSV and SVG; checks
+  that the SVG top view draws every label, with the lines its view shows
+  after wrapping to MaxWidth, that a label at the camera's target projects
+  to the viewport center, that memory stays bounded by one
+  batch and that the JSON Lines file imports back to the same billboards
+* save_restore - saving, reopening and building a document
+* compact - saving and reopening (without the GUI) billboards linked to one
+  style, then the clouds from_billboards() turns them into, with texts saved
+  as a string list and packed; checks that billboards using fields a cloud
+  cannot hold are only converted when asked to, that the clouds keep every
+  label and show multi-line texts line by line,
+  that their files are far smaller and faster to open than the per-object
+  one, that restored texts stay packed until read, filling in without
+  touching the document, and that edits of restored clouds keep every text
+
+Results are printed (or written with -o) as JSON. Timings cover the
+workbench's Python code plus stand-in overhead, so compare them between
+releases on the same machine rather than with FreeCAD. Each scenario also
+runs sanity checks; the exit status is 1 if a check fails or, with
+--baseline, a timing got slower than tolerance times the baseline.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ElementTree
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [os.path.join(HERE, "headless"), ROOT]
+
+import FreeCAD  # noqa: E402 - stand-ins must come first on sys.path
+import FreeCADGui  # noqa: E402
+from pivy import coin  # noqa: E402
+
+import BillboardCloud  # noqa: E402
+import BillboardCluster  # noqa: E402
+import BillboardExport  # noqa: E402
+import BillboardImport  # noqa: E402
+import BillboardInstrumentation  # noqa: E402
+import BillboardMetrics  # noqa: E402
+import BillboardObject  # noqa: E402
+import BillboardOrientation  # noqa: E402
+import BillboardOverlay  # noqa: E402
+import BillboardScreen  # noqa: E402
+import BillboardShared  # noqa: E402
+import BillboardStyle  # noqa: E402
+import BillboardViewProvider  # noqa: E402
+
+
+SCALES = (10, 100, 1000, 10000, 50000)
+QUICK_SCALES = (10, 100, 1000)
+
+# Property edits applied to every billboard by the update scenario
+UPDATES = (
+    ("Text", lambda i: f"Edited {i}"),
+    ("FontSize", lambda i: 12.0 + i % 8),
+    ("TextColor", lambda i: (1.0, 0.5, 0.0)),
+    ("Placement", lambda i: FreeCAD.Placement(FreeCAD.Vector(i, -i, 1.0))),
+    ("ShowBackground", lambda i: True),
+    ("ShowFrame", lambda i: True),
+)
+
+# Timings below this many milliseconds are too noisy to flag as regressions
+MIN_COMPARE_MS = 1.0
+
+
+# -- Helpers -------------------------------------------------------------------
+
+def _ms(seconds):
+    return round(1000.0 * seconds, 3)
+
+
+def _items(count):
+    """Yield create_many items laid out on a grid."""
+    side = max(1, int(count ** 0.5))
+    for i in range(count):
+        yield {
+            "Text": f"Label {i}",
+            "Position": ((i % side) * 50.0, (i // side) * 50.0, 0.0),
+        }
+
+
+def _idle():
+    """Run one idle event loop turn; return seconds taken."""
+    start = time.perf_counter()
+    FreeCADGui.updateGui()
+    return time.perf_counter() - start
+
+
+def _fresh_document():
+    for name in list(FreeCAD.listDocuments()):
+        FreeCAD.closeDocument(name)
+    BillboardMetrics.clear_cache()
+    FreeCADGui.updateGui()
+    gc.collect()  # drop view providers of closed documents
+    return FreeCAD.newDocument("Bench")
+
+
+def _populated_document(count, **properties):
+    doc = _fresh_document()
+    BillboardObject.create_many((dict(item, **properties) for item in _items(count)), doc=doc)
+    FreeCADGui.updateGui()
+    return doc
+
+
+def _built(doc):
+    return sum(1 for obj in doc.Objects if obj.ViewObject.Proxy.is_built())
+
+
+def _view(doc):
+    return FreeCADGui.getDocument(doc.Name).mdiViewsOfType("Gui::View3DInventor")[0]
+
+
+# -- Scenarios -------------------------------------------------------------------
+
+def scenario_create(count):
+    """TextBillboard.__init__ on count new objects."""
+    doc = _fresh_document()
+    objects = [doc.addObject("App::FeaturePython", "TextBillboard") for _ in range(count)]
+    start = time.perf_counter()
+    for obj in objects:
+        BillboardObject.TextBillboard(obj)
+    elapsed = time.perf_counter() - start
+    metrics = {"create_ms": _ms(elapsed), "per_object_us": round(1e6 * elapsed / count, 2)}
+    return metrics, {"objects": len(doc.Objects) == count}
+
+
+def scenario_attach(count):
+    """Attach view providers to count objects, then build them."""
+    doc = _fresh_document()
+    objects = []
+    for _ in range(count):
+        obj = doc.addObject("App::FeaturePython", "TextBillboard")
+        BillboardObject.TextBillboard(obj)
+        objects.append(obj)
+    start = time.perf_counter()
+    for obj in objects:
+        BillboardViewProvider.ViewProviderTextBillboard(obj.ViewObject)
+    attach = time.perf_counter() - start
+    build = _idle()
+    metrics = {
+        "attach_ms": _ms(attach),
+        "per_attach_us": round(1e6 * attach / count, 2),
+        "build_ms": _ms(build),
+    }
+    return metrics, {"all_built": _built(doc) == count}
+
+
+def scenario_create_many(count):
+    """BillboardObject.create_many with view providers, then build."""
+    doc = _fresh_document()
+    start = time.perf_counter()
+    created = BillboardObject.create_many(_items(count), doc=doc)
+    create = time.perf_counter() - start
+    build = _idle()
+    metrics = {"create_many_ms": _ms(create), "build_ms": _ms(build)}
+    checks = {"created": created == count, "all_built": _built(doc) == count}
+
+    # Keys that are not properties are listed once, in one warning
+    before = len(FreeCAD.Console.messages)
+    BillboardObject.create_many(
+        ({"Text": "x", "Notes": "n", "Colour": "red"} for _ in range(3)), doc=doc
+    )
+    warnings = [text for kind, text in FreeCAD.Console.messages[before:] if kind == "warning"]
+    checks["unknown_keys_warned"] = warnings == [
+        "Ignored keys that are not TextBillboard properties: Colour, Notes\n"
+    ]
+    return metrics, checks
+
+
+def scenario_update(count):
+    """Change each property in UPDATES on every billboard, then flush."""
+    doc = _populated_document(count)
+    objects = doc.Objects
+    metrics, checks = {}, {}
+    for prop, value in UPDATES:
+        start = time.perf_counter()
+        for i, obj in enumerate(objects):
+            setattr(obj, prop, value(i))
+        metrics[f"{prop}_set_ms"] = _ms(time.perf_counter() - start)
+        metrics[f"{prop}_flush_ms"] = _ms(_idle())
+    checks["no_pending_sensors"] = coin.pending_sensors() == 0
+    sample = objects[-1].ViewObject.Proxy
+    checks["text_applied"] = sample.text.string.getValues() == [objects[-1].Text]
+    # Many edits on one billboard between idles coalesce into one flush and rebuild
+    obj = objects[0]
+    sample = obj.ViewObject.Proxy
+    sample.reset_update_counters()
+    for i in range(len(UPDATES)):
+        for prop, value in UPDATES:
+            setattr(obj, prop, value(i + 1))
+    _idle()
+    checks["edits_coalesced"] = sample.get_update_counters() == {"flushes": 1, "rebuilds": 1}
+    return metrics, checks
+
+
+def _frames(count, frames, screen_passes, moving=True, camera=None, **properties):
+    doc = _populated_document(count, **properties)
+    view = _view(doc)
+    if camera is not None:
+        view.setCameraType(camera)
+    if screen_passes:
+        BillboardScreen.set_culling(True)
+        BillboardScreen.set_declutter(True)
+    try:
+        FreeCADGui.updateGui()  # installs the orientation callback
+        view.render()  # first frame runs the screen passes for this camera
+        FreeCADGui.updateGui()
+        coin.reset_stats()
+        BillboardOrientation.reset_counters()
+        render = idle = 0.0
+        for frame in range(frames):
+            if moving:
+                view.orbit(2.0 * math.pi * frame / frames, distance=2000.0)
+            start = time.perf_counter()
+            view.render()
+            render += time.perf_counter() - start
+            idle += _idle()
+        stats = dict(coin.stats)
+    finally:
+        if screen_passes:
+            BillboardScreen.set_culling(False)
+            BillboardScreen.set_declutter(False)
+    metrics = {
+        "frames": frames,
+        "frame_ms": _ms(render / frames),
+        "callback_ms": _ms(stats.get("callback_ns", 0) / 1e9 / frames),
+        "idle_ms": _ms(idle / frames),
+        "field_writes_per_frame": round(stats.get("field_writes", 0) / frames, 1),
+        "orientation_writes": BillboardOrientation.get_counters()["writes"],
+    }
+    checks = {"orientation_installed": stats.get("callbacks", 0) >= frames}
+    if not moving:
+        # An idle camera must not write fields (and trigger redraws)
+        checks["idle_no_writes"] = stats.get("field_writes", 0) == 0
+    if properties.get("ScaleMode") == "Screen":
+        # Depth scales are written silently during the frame that needs them
+        checks["depth_scale_silent"] = stats.get("notifications", 0) == 0
+        checks["constant_pixel_size"] = _pixel_size_ok(doc, view)
+    return metrics, checks
+
+
+def _pixel_size_ok(doc, view):
+    """Check that one unit of every Screen-mode billboard spans one pixel.
+
+    The check follows a render without running the deferred screen passes,
+    so a depth scale lagging behind the camera fails it.
+    """
+    view.orbit(1.0, distance=1500.0)
+    view.render()
+    snapshot = BillboardScreen.CameraSnapshot(
+        view.camera.view_matrix, view.camera.projection_matrix, view.getSize()
+    )
+    vps = [obj.ViewObject.Proxy for obj in doc.Objects]
+    _x, _y, ws, _kx, kys = BillboardScreen.project([vp.screen_anchor() for vp in vps], snapshot)
+    row = BillboardOrientation.get_screen_rotation().matrix.getValue()[0]
+    scale = math.sqrt(sum(v * v for v in row[:3]))
+    return all(
+        abs(scale * vp.depth_scale.scaleFactor.getValue()[0] * ky - 1.0) < 1e-6
+        for vp, w, ky in zip(vps, ws, kys) if w > 0.0
+    )
+
+
+def scenario_frames(count):
+    """Simulated redraws while orbiting the camera."""
+    return _frames(count, _frame_count(count), screen_passes=False)
+
+
+def scenario_frames_screen(count):
+    """Simulated redraws with culling and declutter enabled."""
+    return _frames(count, _frame_count(count), screen_passes=True)
+
+
+def scenario_frames_idle(count):
+    """Redraws without camera movement, which should do no work."""
+    return _frames(count, _frame_count(count), screen_passes=True, moving=False)
+
+
+def scenario_frames_scale(count):
+    """Orbiting redraws of pixel-sized billboards, orthographic then perspective."""
+    metrics, checks = {}, {}
+    for camera in ("Orthographic", "Perspective"):
+        result, ok = _frames(count, _frame_count(count), screen_passes=False,
+                             camera=camera, ScaleMode="Screen")
+        prefix = camera.lower()
+        metrics.update((f"{prefix}_{key}", value) for key, value in result.items())
+        checks.update((f"{prefix}_{key}", value) for key, value in ok.items())
+    return metrics, checks
+
+
+class _RotationProbe:
+    """Records the rotation a billboard sees while a view is rendered."""
+
+    def __init__(self, vp):
+        self.vp = vp
+        self.seen = None
+        self.node = coin.SoCallback()
+        self.node.setCallback(self._callback)
+        # Right after the rotation node, inside the billboard's content
+        content = vp.billboard_content
+        content.insertChild(self.node, content.findChild(vp.rotation) + 1)
+
+    def _callback(self, user_data, action):
+        self.seen = self.vp.rotation.matrix.getValue()
+
+    def matches(self, view):
+        """Return True if the last render saw view's inverse view rotation."""
+        m = view.camera.view_matrix
+        return self.seen is not None and all(
+            abs(self.seen[i][j] - m[j][i]) < 1e-9 for i in range(3) for j in range(3)
+        )
+
+
+def scenario_two_views(count):
+    """Two views with different cameras, one orbiting, redrawn alternately."""
+    doc = _populated_document(count)
+    orbiting = _view(doc)
+    still = FreeCADGui.getDocument(doc.Name).createView()
+    still.setCameraType("Orthographic")
+    still.look_at((2000.0, 500.0, 0.0), (0.0, 0.0, 0.0))
+    BillboardOrientation.install()  # what activating the new MDI window does
+    probe = _RotationProbe(doc.Objects[0].ViewObject.Proxy)
+
+    frames = _frame_count(count)
+    orbiting.render()
+    still.render()
+    FreeCADGui.updateGui()
+    coin.reset_stats()
+    BillboardOrientation.reset_counters()
+    correct = True
+    render = 0.0
+    for frame in range(frames):
+        orbiting.orbit(2.0 * math.pi * frame / frames, distance=2000.0)
+        for view in (orbiting, still):
+            start = time.perf_counter()
+            view.render()
+            render += time.perf_counter() - start
+            correct = correct and probe.matches(view)
+        _idle()
+    stats = dict(coin.stats)
+
+    metrics = {
+        "frames": 2 * frames,
+        "frame_ms": _ms(render / (2 * frames)),
+        "field_writes_per_frame": round(stats.get("field_writes", 0) / (2 * frames), 1),
+        "orientation_writes": BillboardOrientation.get_counters()["writes"],
+    }
+    checks = {
+        "each_view_own_rotation": correct,
+        "no_notifications": stats.get("notifications", 0) == 0,
+    }
+    return metrics, checks
+
+
+class _ContentProbe:
+    """Records a billboard's content switch and depth scale while a view is rendered."""
+
+    def __init__(self, vp):
+        self.vp = vp
+        self.seen = self.depth = None
+        self.node = coin.SoCallback()
+        self.node.setCallback(self._callback)
+        # After the view's orientation callback, before the content switch
+        vp.root.insertChild(self.node, 0)
+
+    def _callback(self, user_data, action):
+        self.seen = self.vp.content_switch.whichChild.getValue()
+        self.depth = self.vp.depth_scale.scaleFactor.getValue()[0]
+
+    def remove(self):
+        self.vp.root.removeChild(self.node)
+
+
+def _cached_above(root, nodes):
+    """Return True if a separator above one of nodes kept a render cache.
+
+    Such a cache would be replayed in another view, with the values the
+    nodes held when it was built.
+    """
+    nodes = {id(node) for node in nodes}
+
+    def walk(node, cached):
+        if isinstance(node, coin.SoSeparator):
+            cached = cached or coin.has_render_cache(node)
+        if id(node) in nodes and cached:
+            return True
+        return isinstance(node, coin.SoGroup) and any(
+            walk(child, cached) for child in node.getChildren()
+        )
+
+    return walk(root, False)
+
+
+def _on_screen(doc, view):
+    """Return {view provider: (on screen, depth)} for a view's current camera."""
+    snapshot = BillboardScreen.CameraSnapshot(
+        view.camera.view_matrix, view.camera.projection_matrix, view.getSize()
+    )
+    anchors = BillboardScreen._get_anchors(doc.Name)
+    boxes = BillboardScreen.screen_boxes(anchors, snapshot)
+    return dict(zip(anchors.billboards, zip(boxes.on_screen, boxes.depth)))
+
+
+def scenario_two_views_screen(count):
+    """Two views culling different pixel-sized labels of one document, redrawn alternately."""
+    doc = _populated_document(count, ScaleMode="Screen")
+    extent = 50.0 * max(1, int(count ** 0.5))
+    # Each view looks at another corner of the grid, from another distance
+    first = _view(doc)
+    first.look_at((0.0, 0.0, 300.0), (0.0, 0.0, 0.0))
+    second = FreeCADGui.getDocument(doc.Name).createView()
+    second.look_at((extent, extent, 600.0), (extent, extent, 0.0))
+    BillboardOrientation.install()
+    probes = [_ContentProbe(obj.ViewObject.Proxy) for obj in doc.Objects]
+
+    BillboardScreen.set_culling(True)
+    try:
+        _redraw(first)
+        _redraw(second)  # both views ran their passes
+        expected = {view: _on_screen(doc, view) for view in (first, second)}
+        frames = _frame_count(count)
+        coin.reset_stats()
+        culled = scaled = True
+        render = 0.0
+        for _frame in range(frames):
+            for view in (first, second):
+                start = time.perf_counter()
+                view.render()
+                render += time.perf_counter() - start
+                shown = expected[view]
+                culled = culled and all(
+                    (probe.seen == 0) == shown[probe.vp][0] for probe in probes
+                )
+                # Labels shown in the view are scaled by their depth in it
+                scaled = scaled and all(
+                    abs(probe.depth - shown[probe.vp][1]) < 1e-9
+                    for probe in probes if probe.seen == 0
+                )
+            _idle()
+        stats = dict(coin.stats)
+
+        # The probes are callbacks, which keep caches off by themselves
+        for probe in probes:
+            probe.remove()
+        per_view = [BillboardOrientation.get_shared_rotation(),
+                    BillboardOrientation.get_screen_rotation()]
+        for probe in probes:
+            per_view += [probe.vp.content_switch, probe.vp.depth_scale]
+        uncached = True
+        for view in (first, second):
+            view.render()
+            uncached = uncached and not _cached_above(view.getSceneGraph(), per_view)
+    finally:
+        BillboardScreen.set_culling(False)
+
+    metrics = {
+        "frames": 2 * frames,
+        "frame_ms": _ms(render / (2 * frames)),
+        "field_writes_per_frame": round(stats.get("field_writes", 0) / (2 * frames), 1),
+    }
+    checks = {
+        "views_differ": expected[first] != expected[second],
+        "no_cache_holds_view_nodes": uncached,
+        "each_view_own_culling": culled,
+        "each_view_own_depth": scaled,
+        "no_notifications": stats.get("notifications", 0) == 0,
+        "disable_shows_all": all(probe.vp.content_switch.whichChild.getValue() == 0
+                                 for probe in probes),
+    }
+    return metrics, checks
+
+
+def _redraw(view):
+    """Render view, then run the screen passes it scheduled."""
+    view.render()
+    FreeCADGui.updateGui()
+
+
+def scenario_screen_passes(count):
+    """Edits of live billboards reaching the culling/LOD/declutter passes."""
+    doc = _populated_document(count)
+    view = _view(doc)
+    FreeCADGui.updateGui()  # installs the orientation callback
+    # Two labels on top of each other, one always hiding the other, apart
+    # from the grid and looked at from close by
+    first, second = doc.Objects[:2]
+    first.Placement = second.Placement = FreeCAD.Placement(FreeCAD.Vector(0.0, -500.0, 0.0))
+    view.look_at((0.0, -500.0, 300.0), (0.0, -500.0, 0.0))
+    low, high = first.ViewObject.Proxy, second.ViewObject.Proxy
+    BillboardScreen.set_declutter(True)
+    checks = {}
+    try:
+        _redraw(view)
+        start = time.perf_counter()
+        second.Priority = -10
+        _redraw(view)
+        elapsed = time.perf_counter() - start
+        checks["priority_lowered"] = (
+            "declutter" not in low._hidden and "declutter" in high._hidden
+        )
+        second.Priority = 10
+        _redraw(view)
+        checks["priority_raised"] = (
+            "declutter" in low._hidden and "declutter" not in high._hidden
+        )
+        # A label swapped for its marker leaves decluttering
+        first.LodMinPixelHeight = 1e6
+        _redraw(view)
+        checks["lod_threshold_applied"] = low._marker and low._hidden == set()
+        first.LodFallback = "Hide"
+        _redraw(view)
+        checks["lod_fallback_applied"] = not low._marker and low._hidden == {"lod"}
+        first.LodMinPixelHeight = 0.0
+        _redraw(view)
+        checks["lod_threshold_cleared"] = not low._marker and low._hidden == {"declutter"}
+        # Instrumentation counts the billboards and hides of each pass
+        BillboardInstrumentation.reset()
+        BillboardInstrumentation.enable(level="debug")
+        try:
+            second.Priority = 0
+            _redraw(view)
+            stats = BillboardInstrumentation.stats()
+        finally:
+            BillboardInstrumentation.disable()
+        # Toggling lasts for the session only, and keeps the level
+        checks["instrumentation_session_only"] = (
+            not BillboardShared.params().GetBool("InstrumentationOnStartup", False)
+            and BillboardInstrumentation.level == BillboardInstrumentation.LEVELS["debug"]
+        )
+        BillboardInstrumentation.enable(False)
+        checks["passes_counted"] = (
+            stats.get("screen_passes.billboards", {}).get("count") == count
+            and stats.get("declutter.hidden", {}).get("count", 0) >= 1
+            and stats.get("flush.screen", {}).get("count") == 1
+        )
+    finally:
+        BillboardScreen.set_declutter(False)
+    return {"priority_edit_ms": _ms(elapsed)}, checks
+
+
+def _pick_targets(view, objects, picks):
+    """Return up to picks (object, pixel) pairs inside labels shown in view."""
+    # Labels shown in the view, picked inside their first glyph row
+    snapshot = BillboardScreen.CameraSnapshot(
+        view.camera.view_matrix, view.camera.projection_matrix, view.getSize()
+    )
+    xs, ys, ws, _kx, kys = BillboardScreen.project(
+        [obj.ViewObject.Proxy.screen_anchor() for obj in objects], snapshot
+    )
+    width, height = view.getSize()
+    shown = [
+        (obj, (int(round(x)), int(round(y + 0.5 * obj.FontSize * ky))))
+        for obj, x, y, w, ky in zip(objects, xs, ys, ws, kys)
+        if w > 0.0 and 0.0 <= x < width and 0.0 <= y < height
+    ]
+    return shown[::max(1, len(shown) // picks)][:picks]
+
+
+def _pick_latency(count, proxies, picks=5):
+    """Preselection picks over count labels; return (metrics, checks)."""
+    BillboardViewProvider.PICK_PROXIES = proxies
+    try:
+        # Small enough that neighbouring labels do not overlap
+        doc = _populated_document(count, FontSize=8.0)
+    finally:
+        BillboardViewProvider.PICK_PROXIES = True
+    view = _view(doc)
+    extent = 50.0 * max(1, int(count ** 0.5))
+    center = (extent / 2.0, extent / 2.0, 0.0)
+    view.look_at((center[0], center[1], 1000.0), center)
+    other = FreeCADGui.getDocument(doc.Name).createView()
+    other.look_at((2000.0, 0.0, 0.0), center)
+    BillboardOrientation.install()
+    FreeCADGui.updateGui()
+    view.render()
+    other.render()  # the shared rotation now holds the other view's values
+
+    targets = _pick_targets(view, doc.Objects, picks)
+    coin.reset_stats()
+    hits, on_proxy, elapsed = 0, 0, 0.0
+    for obj, point in targets:
+        start = time.perf_counter()
+        info = view.getObjectInfo(point)
+        elapsed += time.perf_counter() - start
+        if info is not None and info["Object"] == obj.Name:
+            hits += 1
+            on_proxy += info["Node"] is getattr(obj.ViewObject.Proxy, "pick_face", None)
+    metrics = {
+        "pick_ms": _ms(elapsed / len(targets)),
+        "triangles_per_pick": coin.stats["pick_triangles"] // len(targets),
+    }
+    checks = {"hits": hits == len(targets)}
+    if proxies:
+        checks["picks_proxy"] = on_proxy == len(targets)
+    return metrics, checks
+
+
+def scenario_pick(count):
+    """Preselection latency picking text glyphs vs. the bounds pick proxies."""
+    metrics, checks = {}, {}
+    for label, proxies in (("text", False), ("proxy", True)):
+        m, c = _pick_latency(count, proxies)
+        metrics.update({f"{label}_{k}": v for k, v in m.items()})
+        checks.update({f"{label}_{k}": v for k, v in c.items()})
+    if metrics["proxy_pick_ms"] > 0.0:
+        metrics["speedup"] = round(metrics["text_pick_ms"] / metrics["proxy_pick_ms"], 1)
+    return metrics, checks
+
+
+def _overlay_frames(view, frames):
+    """Render frames of a still view; return (ms per frame, coin stats)."""
+    view.render()
+    FreeCADGui.updateGui()
+    coin.reset_stats()
+    start = time.perf_counter()
+    for _frame in range(frames):
+        view.render()
+    elapsed = time.perf_counter() - start
+    return _ms(elapsed / frames), dict(coin.stats)
+
+
+def scenario_overlay(count):
+    """Labels with transparent backgrounds in the scene, then in the overlay layer."""
+    doc = _populated_document(count, FontSize=8.0, ShowBackground=True)
+    view = _view(doc)
+    extent = 50.0 * max(1, int(count ** 0.5))
+    center = (extent / 2.0, extent / 2.0, 0.0)
+    view.look_at((center[0], center[1], 1000.0), center)
+    FreeCADGui.updateGui()
+    frames = _frame_count(count)
+    scene_ms, scene_stats = _overlay_frames(view, frames)
+
+    vps = [obj.ViewObject.Proxy for obj in doc.Objects]
+    BillboardOverlay.set_enabled(True)
+    try:
+        layer = BillboardOverlay.layer(doc.Name)
+        overlay_ms, overlay_stats = _overlay_frames(view, frames)
+        in_layer = layer.getNumChildren() == count + 1 and all(
+            layer.findChild(vp.overlay_sep) >= 0 for vp in vps[::max(1, count // 20)]
+        )
+
+        # Picks still resolve to the billboard, through its in-scene quad
+        targets = _pick_targets(view, doc.Objects, 5)
+        hits = sum(
+            (view.getObjectInfo(point) or {}).get("Object") == obj.Name
+            for obj, point in targets
+        )
+
+        # Edits reach the moved visuals; hiding takes a label out of the layer
+        doc.Objects[0].Text = "Edited"
+        FreeCADGui.updateGui()
+        edited = vps[0].text.string.getValues() == ["Edited"]
+        doc.Objects[0].ViewObject.Visibility = False
+        hidden = layer.findChild(vps[0].overlay_sep) < 0
+        doc.Objects[0].ViewObject.Visibility = True
+        hidden = hidden and layer.findChild(vps[0].overlay_sep) >= 0
+
+        # Hiding many labels leaves exactly the visible ones in the layer
+        start = time.perf_counter()
+        for obj in doc.Objects[::2]:
+            obj.ViewObject.Visibility = False
+        hide_ms = _ms(time.perf_counter() - start)
+        drawn = {id(layer.getChild(i)) for i in range(1, layer.getNumChildren())}
+        hidden_many = drawn == {id(vp.overlay_sep) for vp in vps[1::2]}
+        for obj in doc.Objects[::2]:
+            obj.ViewObject.Visibility = True
+        hidden_many = hidden_many and layer.getNumChildren() == count + 1
+
+        # A view opened later draws the layer too
+        other = FreeCADGui.getDocument(doc.Name).createView()
+        BillboardOrientation.install()
+        new_view = other.getSceneGraph().findChild(layer) >= 0
+    finally:
+        BillboardOverlay.set_enabled(False)
+    restored = layer.getNumChildren() == 1 and all(
+        vp.overlay_sep is None and vp.root.findChild(vp.content_switch) >= 0 for vp in vps
+    )
+
+    metrics = {
+        "scene_frame_ms": scene_ms,
+        "overlay_frame_ms": overlay_ms,
+        "scene_sorted_per_frame": scene_stats.get("sorted_shapes", 0) // frames,
+        "overlay_sorted_per_frame": overlay_stats.get("sorted_shapes", 0) // frames,
+        "hide_half_ms": hide_ms,
+    }
+    checks = {
+        "scene_sorts_backgrounds": metrics["scene_sorted_per_frame"] == count,
+        "overlay_no_sorting": overlay_stats.get("sorted_shapes", 0) == 0,
+        "overlay_one_traversal": overlay_stats.get("delayed_paths", 0) == frames,
+        "all_in_layer": in_layer,
+        "picks_hit": bool(targets) and hits == len(targets),
+        "edit_applied": edited,
+        "visibility_followed": hidden,
+        "many_hidden": hidden_many,
+        "new_view_has_layer": new_view,
+        "disable_restores_scene": restored,
+    }
+    return metrics, checks
+
+
+def _frame_count(count):
+    return max(3, min(30, 100000 // count))
+
+
+def scenario_anchors(count):
+    """Move a few of count parts, each carrying one anchored billboard."""
+    doc = _fresh_document()
+    parts = []
+    for item in _items(count):
+        part = doc.addObject("App::FeaturePython", "Part")
+        part.addProperty("App::PropertyPlacement", "Placement", "Base")
+        part.Placement = FreeCAD.Placement(FreeCAD.Vector(*item["Position"]))
+        parts.append(part)
+    offset = FreeCAD.Vector(0.0, 0.0, 10.0)
+    start = time.perf_counter()
+    BillboardObject.create_many(
+        {"Text": part.Name, "Anchor": part.Name, "AnchorOffset": offset} for part in parts
+    )
+    create = time.perf_counter() - start
+    FreeCADGui.updateGui()
+
+    billboards = [obj for obj in doc.Objects if hasattr(obj, "Anchor")]
+    before = [obj.Placement.Base for obj in billboards]
+    moved = parts[::max(1, count // 10)]
+    start = time.perf_counter()
+    for part in moved:
+        placement = part.Placement
+        placement.Base = placement.Base + FreeCAD.Vector(5.0, 0.0, 0.0)
+        part.Placement = placement
+    move = time.perf_counter() - start
+    start = time.perf_counter()
+    doc.recompute()
+    recompute = time.perf_counter() - start
+    flush = _idle()
+
+    changed = {obj.Anchor[0].Name for obj, base in zip(billboards, before)
+               if obj.Placement.Base != base}
+    metrics = {
+        "create_ms": _ms(create),
+        "moved_parts": len(moved),
+        "move_ms_per_part": _ms(move / len(moved)),
+        "recompute_ms": _ms(recompute),
+        "flush_ms": _ms(flush),
+    }
+    checks = {
+        "only_moved_labels": changed == {part.Name for part in moved},
+        "at_anchor": all(obj.Placement.Base == obj.Anchor[0].Placement.Base + offset
+                         for obj in billboards),
+    }
+    return metrics, checks
+
+
+def scenario_templates(count):
+    """count templated billboards reading a shared sensor and one part each."""
+    doc = _fresh_document()
+    sensor = doc.addObject("App::FeaturePython", "Sensor")
+    sensor.addProperty("App::PropertyFloat", "Reading", "Data")
+    sensor.Reading = 1.0
+    parts = []
+    for i in range(count):
+        part = doc.addObject("App::FeaturePython", "Part")
+        part.addProperty("App::PropertyFloat", "Mass", "Data")
+        part.Mass = float(i)
+        parts.append(part)
+    start = time.perf_counter()
+    BillboardObject.create_many(
+        {"TextTemplate": f"{{{part.Name}.Mass:.1f}} kg, {{Sensor.Reading:.1f}} bar"}
+        for part in parts
+    )
+    create = time.perf_counter() - start
+    FreeCADGui.updateGui()
+    vps = [obj.ViewObject.Proxy for obj in doc.Objects if hasattr(obj, "TextTemplate")]
+    texts_ok = all(
+        vp.ViewObject.Object.Text == f"{i:.1f} kg, 1.0 bar" for i, vp in enumerate(vps)
+    )
+
+    def rebuilds():
+        FreeCADGui.updateGui()
+        total = sum(vp.get_update_counters()["rebuilds"] for vp in vps)
+        for vp in vps:
+            vp.reset_update_counters()
+        return total
+
+    rebuilds()
+    # Changes every value, but not the formatted text
+    start = time.perf_counter()
+    sensor.Reading = 1.01
+    hidden = time.perf_counter() - start
+    hidden_rebuilds = rebuilds()
+
+    # Changes every label
+    start = time.perf_counter()
+    sensor.Reading = 2.0
+    shown = time.perf_counter() - start
+    shown_rebuilds = rebuilds()
+
+    # Changes one label per edited part; other properties are not read
+    edited = parts[::max(1, count // 10)]
+    start = time.perf_counter()
+    for part in edited:
+        part.Mass = part.Mass + 0.5
+        part.Label = part.Label + "*"
+    part_edits = time.perf_counter() - start
+    part_rebuilds = rebuilds()
+
+    metrics = {
+        "create_ms": _ms(create),
+        "unchanged_text_ms": _ms(hidden),
+        "all_labels_ms": _ms(shown),
+        "part_edit_ms": _ms(part_edits / len(edited)),
+    }
+    checks = {
+        "texts": texts_ok,
+        "unchanged_text_no_relayout": hidden_rebuilds == 0,
+        "all_labels_relayout": shown_rebuilds == count,
+        "only_dependent_relayout": part_rebuilds == len(edited),
+    }
+    return metrics, checks
+
+
+def scenario_bulk_edit(count):
+    """Restyle every billboard one by one, then all at once with edit_many()."""
+    doc = _populated_document(count)
+    objects = doc.Objects
+    values = {"TextColor": "0,0.5,1", "FontSize": "14", "ShowFrame": "true"}
+
+    coin.reset_stats()
+    start = time.perf_counter()
+    for obj in objects:
+        for prop, value in values.items():
+            BillboardObject._set_property(obj, prop, value)
+    single = time.perf_counter() - start + _idle()
+    single_notifications = coin.stats["notifications"]
+
+    values = {"TextColor": (1.0, 0.0, 0.0), "FontSize": 16.0, "ShowFrame": False}
+    coin.reset_stats()
+    start = time.perf_counter()
+    result = BillboardObject.edit_many(lambda obj: True, values, doc=doc)
+    bulk = time.perf_counter() - start + _idle()
+    bulk_notifications = coin.stats["notifications"]
+
+    sample = objects[-1]
+    try:
+        BillboardObject.edit_many(objects, {"FontSize": 20.0, "FontSzie": 20.0})
+    except ValueError:
+        rejected = sample.FontSize == 16.0
+    else:
+        rejected = False
+    # What the edit dialog prefills reads back as the same value
+    sample.AnchorOffset = FreeCAD.Vector(1.5, -2.25, 1234.5678)
+    names = BillboardObject.editable_properties(sample)
+    before = {name: getattr(sample, name) for name in names}
+    BillboardObject.edit_many(
+        [sample], {name: BillboardObject.property_text(sample, name) for name in names}
+    )
+    round_trip = all(getattr(sample, name) == before[name] for name in names if
+                     sample.getTypeIdOfProperty(name) != "App::PropertyColor")
+    metrics = {
+        "single_ms": _ms(single),
+        "bulk_ms": _ms(bulk),
+        "single_notifications": single_notifications,
+        "bulk_notifications": bulk_notifications,
+    }
+    checks = {
+        "edited": result.count == count,
+        "applied": sample.FontSize == 16.0 and not sample.ShowFrame,
+        "one_notification_per_billboard": bulk_notifications <= count,
+        "unknown_property_rejected": rejected,
+        "dialog_text_round_trips": round_trip and "AnchorOffset" in names
+        and not any("Link" in sample.getTypeIdOfProperty(name) for name in names),
+        "no_pending_sensors": coin.pending_sensors() == 0,
+    }
+    return metrics, checks
+
+
+def scenario_clusters(count):
+    """Clustering while zoomed out, orbiting slightly, zooming in and editing."""
+    doc = _populated_document(count)
+    view = _view(doc)
+    extent = 50.0 * max(1, int(count ** 0.5))
+    center = (extent / 2.0, extent / 2.0, 0.0)
+    far = 1.5 * extent + 500.0
+    BillboardScreen.set_clustering(True)
+    try:
+        FreeCADGui.updateGui()
+        BillboardCluster.reset_counters()
+        view.look_at((center[0], center[1] - far / 4.0, far), center)
+        view.render()
+        start = time.perf_counter()
+        FreeCADGui.updateGui()
+        first = time.perf_counter() - start
+        aggregates, clustered = BillboardCluster.summary(doc.Name)
+        hidden = sum(1 for obj in doc.Objects if "cluster" in obj.ViewObject.Proxy._hidden)
+        state = BillboardCluster.cluster_state(doc.Name)
+        replaced = sum(node.count for node, aggregated in state.cut.items() if aggregated)
+
+        # Small orbit and dolly steps: incremental cut vs. selecting from the root
+        frames = 10
+        incremental = full = 0.0
+        incremental_tests = full_tests = changed = 0
+        for frame in range(1, frames + 1):
+            angle = 0.01 * frame
+            distance = far * (1.0 - 0.03 * frame)
+            eye = (center[0] + distance * math.sin(angle), center[1] - distance / 4.0,
+                   distance * math.cos(angle))
+            view.look_at(eye, center)
+            view.render()
+            BillboardCluster.reset_counters()
+            start = time.perf_counter()
+            FreeCADGui.updateGui()
+            incremental += time.perf_counter() - start
+            counters = BillboardCluster.get_counters()
+            incremental_tests += counters["tests"]
+            changed += counters["changed"]
+
+            snapshot = BillboardScreen.CameraSnapshot(
+                view.camera.view_matrix, view.camera.projection_matrix, view.getSize()
+            )
+            BillboardCluster.reset_counters()
+            start = time.perf_counter()
+            cut = BillboardCluster.select(
+                state.tree.root, {}, BillboardCluster._size_test(snapshot)
+            )
+            full += time.perf_counter() - start
+            full_tests += BillboardCluster.get_counters()["tests"]
+        same_cut = cut == state.cut
+
+        # Zoomed in on one corner, most labels are shown again
+        view.look_at((0.0, 0.0, 400.0), (0.0, 0.0, 0.0))
+        view.render()
+        FreeCADGui.updateGui()
+        _aggregates, zoomed_clustered = BillboardCluster.summary(doc.Name)
+
+        # Resizing or reprioritizing a label keeps the tree; moving one rebuilds it
+        BillboardCluster.reset_counters()
+        doc.Objects[0].Text = "Renamed"
+        doc.Objects[-1].Priority = 10
+        FreeCADGui.updateGui()
+        resize_builds = BillboardCluster.get_counters()["builds"]
+        _aggregates, reordered = BillboardCluster.summary(doc.Name)
+        reordered_hidden = sum(
+            1 for obj in doc.Objects if "cluster" in obj.ViewObject.Proxy._hidden
+        )
+        doc.Objects[0].Placement = FreeCAD.Placement(
+            FreeCAD.Vector(-100.0, -100.0, 0.0), FreeCAD.Rotation()
+        )
+        FreeCADGui.updateGui()
+        move_builds = BillboardCluster.get_counters()["builds"]
+    finally:
+        BillboardScreen.set_clustering(False)
+    unhidden = all("cluster" not in obj.ViewObject.Proxy._hidden for obj in doc.Objects)
+
+    metrics = {
+        "first_pass_ms": _ms(first),
+        "aggregates": aggregates,
+        "clustered": clustered,
+        "orbit_passes_ms": _ms(incremental / frames),
+        "full_select_ms": _ms(full / frames),
+        "incremental_tests": incremental_tests // frames,
+        "full_tests": full_tests // frames,
+        "changed_nodes": changed / frames,
+    }
+    checks = {
+        "partition": hidden == clustered == replaced,
+        "fewer_labels": count < 1000 or (count - clustered) + aggregates <= count // 10,
+        "incremental_matches_full": same_cut,
+        "incremental_tests_bounded": incremental_tests <= full_tests,
+        # A small move touches a few cut nodes, not every clustered billboard
+        "few_nodes_changed": changed <= frames * max(1, aggregates // 2),
+        "zoom_in_expands": zoomed_clustered < clustered or clustered == 0,
+        "rebuild_only_on_move": resize_builds == 0 and move_builds == 1,
+        "reordered_partition": reordered == reordered_hidden,
+        "disable_shows_all": unhidden,
+    }
+    return metrics, checks
+
+
+# Long descriptions for the layout scenario; billboards repeat them
+DESCRIPTIONS = tuple(
+    f"Bracket {i}: stainless steel, laser cut and bent, "
+    f"{2 + i % 5} mm thick\nInspect welds after {100 * (i + 1)} cycles"
+    for i in range(20)
+)
+
+
+def scenario_layout(count):
+    """Wrapped multi-line descriptions with backgrounds, then restyled and rewrapped."""
+    doc = _fresh_document()
+    start = time.perf_counter()
+    BillboardObject.create_many(
+        dict(item, Text=DESCRIPTIONS[i % len(DESCRIPTIONS)], MaxWidth=300.0,
+             LineSpacing=1.2, ShowBackground=True)
+        for i, item in enumerate(_items(count))
+    )
+    FreeCADGui.updateGui()
+    build = time.perf_counter() - start
+    vps = [obj.ViewObject.Proxy for obj in doc.Objects]
+
+    def fits(width):
+        """Every line fits the width and the background covers all lines."""
+        for vp in vps:
+            obj = vp.ViewObject.Object
+            layout = BillboardMetrics.layout(
+                obj.FontName, obj.FontSize, obj.Text, obj.MaxWidth, obj.LineSpacing,
+                obj.Alignment
+            )
+            lines = vp.text.string.getValues()
+            left, right, bottom, top = vp.bounds
+            if (lines != list(layout.lines) or len(lines) < 3
+                    or any(e.right > width and " " in line
+                           for e, line in zip(layout.extents, lines))
+                    or right - left < layout.extent.right - layout.extent.left
+                    or top - bottom < (len(lines) - 1) * obj.LineSpacing * obj.FontSize):
+                return False
+        return True
+
+    wrapped = fits(300.0)
+    built = BillboardMetrics.cache_info()
+
+    # Not layout changes: bounds are rebuilt from the cached layout
+    start = time.perf_counter()
+    for obj in doc.Objects:
+        obj.TextColor = (1.0, 1.0, 0.0)
+        obj.BackgroundPadding = 8.0
+    FreeCADGui.updateGui()
+    restyle = time.perf_counter() - start
+    restyled = BillboardMetrics.cache_info()
+
+    start = time.perf_counter()
+    for obj in doc.Objects:
+        obj.MaxWidth = 200.0
+    FreeCADGui.updateGui()
+    rewrap = time.perf_counter() - start
+    rewrapped = BillboardMetrics.cache_info()
+
+    distinct = min(count, len(DESCRIPTIONS))
+    metrics = {
+        "build_ms": _ms(build),
+        "restyle_ms": _ms(restyle),
+        "rewrap_ms": _ms(rewrap),
+        "layouts": built["layout_misses"],
+        "layout_hits": built["layout_hits"],
+    }
+    checks = {
+        "wrapped": wrapped,
+        "laid_out_once_per_text": built["layout_misses"] == distinct,
+        "restyle_no_relayout": restyled["layout_misses"] == built["layout_misses"],
+        "rewrapped": fits(200.0)
+        and rewrapped["layout_misses"] == built["layout_misses"] + distinct,
+    }
+    return metrics, checks
+
+
+def scenario_export(count):
+    """Stream count billboards to JSON Lines, CSV and SVG, then import the JSON back."""
+    doc = _populated_document(count, Text="Label <&> 1\nsecond line", ShowFrame=True)
+    # The last label wraps its first line
+    wrapped = doc.Objects[-1]
+    wrapped.MaxWidth = wrapped.FontSize
+    _idle()
+    folder = tempfile.mkdtemp(prefix="billboard_bench_")
+    paths = {ext: os.path.join(folder, "labels" + ext) for ext in (".jsonl", ".csv", ".svg")}
+    metrics, written = {}, {}
+    for ext, path in paths.items():
+        start = time.perf_counter()
+        written[ext] = BillboardExport.export_file(path, doc)
+        metrics[ext[1:] + "_ms"] = _ms(time.perf_counter() - start)
+        metrics[ext[1:] + "_bytes"] = os.path.getsize(path)
+
+    # Projected through a camera looking straight at the first label
+    anchor = doc.Objects[0].Placement.Base
+    camera = BillboardExport.look_at((anchor.x, anchor.y, anchor.z + 500.0),
+                                     (anchor.x, anchor.y, anchor.z), up=(0.0, 1.0, 0.0))
+    first = next(BillboardExport.iter_batches(doc, camera, batch_size=1))[0]
+    width, height = camera.viewport
+    centered = (abs(first["ScreenX"] - width / 2.0) < 1e-6
+                and abs(first["ScreenY"] - height / 2.0) < 1e-6 and first["OnScreen"])
+
+    # Memory stays bounded by one batch, not the document
+    streamed = True
+    if count > 2 * BillboardExport.BATCH_SIZE:
+        tracemalloc.start()
+        BillboardExport.export_file(paths[".jsonl"], doc)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics["jsonl_peak_kb"] = peak // 1024
+        # Records of one batch take well under 2 kB each
+        streamed = peak < BillboardExport.BATCH_SIZE * 2048
+
+    svg = ElementTree.parse(paths[".svg"]).getroot()
+    texts = svg.findall("{http://www.w3.org/2000/svg}text")
+    shown = list(wrapped.ViewObject.Proxy.text.string.getValues())
+    wraps = len(shown) > 2 and [span.text for span in texts[-1]] == shown
+
+    # Without the GUI (FreeCADCmd), extents are estimated, not measured by Coin
+    FreeCAD.GuiUp = False
+    BillboardMetrics.clear_cache()
+    coin.reset_stats()
+    try:
+        BillboardExport.export_file(paths[".svg"], doc)
+    finally:
+        FreeCAD.GuiUp = True
+        BillboardMetrics.clear_cache()
+    texts_cmd = ElementTree.parse(paths[".svg"]).getroot().findall(
+        "{http://www.w3.org/2000/svg}text"
+    )
+    headless = (coin.stats.get("bounding_boxes", 0) == 0 and len(texts_cmd) == count
+                and len(texts_cmd[-1]) > 2)
+
+    copy = _fresh_document()
+    imported = BillboardImport.import_file(paths[".jsonl"], doc=copy)
+    same = all(
+        a.Text == b.Text and a.Placement.Base == b.Placement.Base and a.ShowFrame == b.ShowFrame
+        for a, b in zip(doc.Objects, copy.Objects)
+    )
+    for path in paths.values():
+        os.remove(path)
+
+    checks = {
+        "all_written": written[".jsonl"] == written[".csv"] == count,
+        "svg_top_view_draws_all": written[".svg"] == len(texts) == count,
+        "svg_lines": all(len(text) == 2 for text in texts[:min(10, count - 1)]),
+        "svg_wraps_like_view": wraps,
+        "svg_without_gui": headless,
+        "projection_centered": centered,
+        "streamed": streamed,
+        "round_trip": imported == count and same,
+    }
+    return metrics, checks
+
+
+def scenario_save_restore(count):
+    """Save, close, reopen and build a document with count billboards."""
+    doc = _populated_document(count)
+    path = os.path.join(tempfile.mkdtemp(prefix="billboard_bench_"), "bench.FCStd")
+    start = time.perf_counter()
+    doc.saveAs(path)
+    save = time.perf_counter() - start
+    FreeCAD.closeDocument(doc.Name)
+
+    start = time.perf_counter()
+    doc = FreeCAD.openDocument(path)
+    restore = time.perf_counter() - start
+    build = _idle()
+    metrics = {
+        "save_ms": _ms(save),
+        "restore_ms": _ms(restore),
+        "build_ms": _ms(build),
+        "file_bytes": os.path.getsize(path),
+    }
+    checks = {"objects": len(doc.Objects) == count, "all_built": _built(doc) == count}
+    os.remove(path)
+    return metrics, checks
+
+
+def _save_and_open(doc, path, compact):
+    """Save doc with or without compact saving and reopen it without the GUI.
+
+    Returns the save and open times in seconds, the file size and the
+    reopened document.
+    """
+    BillboardCloud.set_compact_enabled(compact)
+    start = time.perf_counter()
+    doc.saveAs(path)
+    save = time.perf_counter() - start
+    FreeCAD.GuiUp = False  # as FreeCADCmd
+    try:
+        start = time.perf_counter()
+        copy = FreeCAD.openDocument(path)
+        load = time.perf_counter() - start
+    finally:
+        FreeCAD.GuiUp = True
+    return save, load, os.path.getsize(path), copy
+
+
+def scenario_compact(count):
+    """Save and reopen styled billboards, then the clouds they convert to, per format."""
+    doc = _fresh_document()
+    style = BillboardStyle.create("Style")
+    # Every tenth billboard has its own, smaller font instead of the style,
+    # and a frame a cloud cannot draw
+    BillboardObject.create_many(
+        (dict(item, FontSize=12.0, ShowFrame=True) if i % 10 == 0
+         else dict(item, Style=style.Name)
+         for i, item in enumerate(_items(count))),
+        doc=doc,
+    )
+    hidden = BillboardObject.billboards(doc)[1:2]
+    for obj in hidden:
+        obj.ViewObject.Visibility = False
+    FreeCADGui.updateGui()
+    expected = sorted((b.Text, tuple(b.Placement.Base)) for b in BillboardObject.billboards(doc))
+    folder = tempfile.mkdtemp(prefix="billboard_bench_")
+    metrics = {}
+
+    def measure(name, compact):
+        path = os.path.join(folder, name + ".FCStd")
+        save, load, size, copy = _save_and_open(doc, path, compact)
+        metrics.update({f"{name}_save_ms": _ms(save), f"{name}_load_ms": _ms(load),
+                        f"{name}_bytes": size})
+        os.remove(path)
+        return copy
+
+    measure("objects", False)
+
+    start = time.perf_counter()
+    # Billboards with a frame or hidden are kept, unless converted lossy;
+    # those linked to the style convert to clouds linking it
+    clouds = BillboardCloud.from_billboards(BillboardObject.billboards(doc), doc=doc)
+    left = BillboardObject.billboards(doc)
+    kept = len(left) == (count + 9) // 10 + len(hidden) and all(
+        BillboardCloud.lost_fields(obj) == (["Visibility"] if obj in hidden else ["ShowFrame"])
+        for obj in left
+    )
+    clouds += BillboardCloud.from_billboards(left, doc=doc, lossy=True)
+    linked = [cloud for cloud in clouds if cloud.Style is not None]
+    styled = count < 2 or (bool(linked) and all(cloud.Style == style for cloud in linked))
+    metrics["convert_ms"] = _ms(time.perf_counter() - start)
+    converted = sorted(
+        (text, tuple(pos)) for cloud in clouds for text, pos in zip(cloud.Texts, cloud.Positions)
+    )
+    fonts = sorted({cloud.FontSize for cloud in clouds})
+
+    # A multi-line text is shown as one string per line
+    clouds[0].Proxy.set_item(clouds[0], 0, text="first\nsecond")
+    vp = clouds[0].ViewObject.Proxy
+    vp.flush()
+    lines = vp._item_nodes[0][3].string.getValues() == ["first", "second"]
+
+    # Font and text color edits of the style reach the cloud linking it
+    if linked:
+        style.FontSize = 30.0
+        style.TextColor = (0.0, 1.0, 0.0)
+        vp = linked[0].ViewObject.Proxy
+        FreeCADGui.updateGui()
+        styled = styled and vp.font.size.getValue() == 30.0 and all(
+            tuple(nodes[2].rgb.getValues()[0])[:3] == (0.0, 1.0, 0.0)
+            for nodes in vp._item_nodes
+        )
+        style.FontSize = 24.0
+
+    lists = measure("cloud_lists", False)
+    packed = measure("cloud_packed", True)
+    restored = [obj for obj in packed.Objects if BillboardCloud.is_cloud(obj)]
+    lazy = all(obj.Proxy.is_packed() and not obj.Texts for obj in restored)
+    start = time.perf_counter()
+    unpacked = [BillboardCloud.texts(obj) for obj in restored]
+    metrics["cloud_unpack_ms"] = _ms(time.perf_counter() - start)
+    untouched = unpacked == [c.Texts for c in clouds] and not packed.isTouched()
+
+    # Opened with the GUI, texts are shown at once without touching the document
+    path = os.path.join(folder, "cloud_gui.FCStd")
+    doc.saveAs(path)
+    shown = FreeCAD.openDocument(path)
+    os.remove(path)
+    shown_clouds = [obj for obj in shown.Objects if BillboardCloud.is_cloud(obj)]
+    untouched = untouched and not shown.isTouched() and all(
+        obj.Texts == c.Texts and len(obj.ViewObject.Proxy._item_nodes) == len(c.Texts)
+        for obj, c in zip(shown_clouds, clouds)
+    )
+    same = all(
+        [(c.Texts, c.Positions) for c in copy.Objects if BillboardCloud.is_cloud(c)]
+        == [(c.Texts, c.Positions) for c in clouds]
+        for copy in (lists, packed)
+    )
+
+    # Edits of clouds still packed after a restore keep or replace every text,
+    # and survive a save with compact saving off
+    original = clouds[0].Texts
+    replaced = ["x"] * len(original)
+    path = os.path.join(folder, "cloud_edit.FCStd")
+    first = _save_and_open(doc, path, True)[3]
+    cloud = next(obj for obj in first.Objects if BillboardCloud.is_cloud(obj))
+    cloud.Texts = replaced
+    edits = BillboardCloud.texts(cloud) == replaced
+    second = _save_and_open(doc, path, True)[3]
+    cloud = next(obj for obj in second.Objects if BillboardCloud.is_cloud(obj))
+    cloud.Proxy.add_items(cloud, [(0.0, 0.0, 0.0)], ["added"])
+    edits = edits and BillboardCloud.texts(cloud) == original + ["added"]
+    reopened = _save_and_open(first, path, False)[3]
+    cloud = next(obj for obj in reopened.Objects if BillboardCloud.is_cloud(obj))
+    edits = edits and BillboardCloud.texts(cloud) == replaced
+    os.remove(path)
+    statuses = not any(
+        cloud.getPropertyStatus("Texts") for cloud in clouds + restored + shown_clouds
+    )
+    BillboardCloud.set_compact_enabled(True)
+
+    large = count >= 100
+    checks = {
+        "lossy_fields_kept": kept,
+        "style_link_kept": styled,
+        "multi_line_texts": lines,
+        "converted_all": converted == expected and fonts == ([12.0, 24.0] if count > 1 else [12.0]),
+        "cloud_smaller_than_objects": not large
+        or metrics["cloud_packed_bytes"] * 10 < metrics["objects_bytes"],
+        "cloud_loads_faster_than_objects": not large
+        or metrics["cloud_packed_load_ms"] * 10 < metrics["objects_load_ms"],
+        "packed_smaller": not large or metrics["cloud_packed_bytes"] < metrics["cloud_lists_bytes"],
+        "lazy_until_unpacked": lazy,
+        "unpack_leaves_document_untouched": untouched,
+        "edits_after_restore": edits,
+        "round_trip": same,
+        "statuses_reset": statuses,
+    }
+    return metrics, checks
+
+
+SCENARIOS = {
+    "create": scenario_create,
+    "attach": scenario_attach,
+    "create_many": scenario_create_many,
+    "update": scenario_update,
+    "frames": scenario_frames,
+    "frames_screen": scenario_frames_screen,
+    "frames_idle": scenario_frames_idle,
+    "frames_scale": scenario_frames_scale,
+    "two_views": scenario_two_views,
+    "two_views_screen": scenario_two_views_screen,
+    "anchors": scenario_anchors,
+    "templates": scenario_templates,
+    "bulk_edit": scenario_bulk_edit,
+    "screen_passes": scenario_screen_passes,
+    "pick": scenario_pick,
+    "overlay": scenario_overlay,
+    "layout": scenario_layout,
+    "clusters": scenario_clusters,
+    "export": scenario_export,
+    "save_restore": scenario_save_restore,
+    "compact": scenario_compact,
+}
+
+
+# -- Runner ---------------------------------------------------------------------
+
+def _version():
+    with open(os.path.join(ROOT, "__init__.py"), encoding="utf-8") as f:
+        match = re.search(r'__version__\s*=\s*"([^"]+)"', f.read())
+    return match.group(1) if match else None
+
+
+def _revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales=SCALES, scenarios=tuple(SCENARIOS)):
+    """Run scenarios at every scale; return the report dict."""
+    report = {
+        "meta": {
+            "version": _version(),
+            "revision": _revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": BillboardScreen.numpy is not None,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [],
+    }
+    for name in scenarios:
+        for count in scales:
+            errors_before = len(FreeCAD.Console.errors())
+            metrics, checks = SCENARIOS[name](count)
+            checks["no_console_errors"] = len(FreeCAD.Console.errors()) == errors_before
+            report["results"].append(
+                {"scenario": name, "count": count, "metrics": metrics, "checks": checks}
+            )
+            sys.stderr.write(f"{name:>14} {count:>6}  {metrics}\n")
+    return report
+
+
+def failed_checks(report):
+    """Return "scenario[count]: check" for every failed check."""
+    return [
+        f"{r['scenario']}[{r['count']}]: {name}"
+        for r in report["results"]
+        for name, ok in r["checks"].items() if not ok
+    ]
+
+
+def regressions(report, baseline, tolerance):
+    """Return descriptions of *_ms metrics slower than tolerance x baseline."""
+    old = {(r["scenario"], r["count"]): r["metrics"] for r in baseline["results"]}
+    found = []
+    for r in report["results"]:
+        before = old.get((r["scenario"], r["count"]), {})
+        for key, value in r["metrics"].items():
+            reference = before.get(key)
+            if (key.endswith("_ms") and reference is not None
+                    and reference >= MIN_COMPARE_MS and value > reference * tolerance):
+                found.append(
+                    f"{r['scenario']}[{r['count']}].{key}: {reference} -> {value} ms"
+                )
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="only run 10 .. 1k billboards")
+    parser.add_argument("--scales", type=int, nargs="+", help="billboard counts to run")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare timings against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="allowed slowdown factor against --baseline (default 1.5)")
+    args = parser.parse_args(argv)
+
+    scales = args.scales or (QUICK_SCALES if args.quick else SCALES)
+    report = run(scales, args.scenario or tuple(SCENARIOS))
+
+    problems = failed_checks(report)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems += regressions(report, json.load(f), args.tolerance)
+    report["problems"] = problems
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    for problem in problems:
+        sys.stderr.write(f"FAIL {problem}\n")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())